@@ -30,7 +30,7 @@
 #
 #              THIS SCRIPT WILL FAIL TO RUN UNLESS THE ABOVE OPTIONS ARE GIVEN.
 #
-#     VERSION: 1.0
+#     VERSION: 1.1
 #       NOTES: This script uses AdminTask methods to export the entire
 #              configuration of an app server (--server) to a properties file.
 #              It then modifies properties in this file according 
@@ -44,6 +44,10 @@
 #              (i.e. port values) of an app server, but could be modified to
 #              change other properties, if desired.
 #
+#              The changed ports are recorded as a pending topology change,
+#              for pluginConfig_J27.py to regenerate the web server plug-in
+#              configuration once after a batch of changes.
+#
 #
 #              CHANGES FOR JYTHON 2.7:
 #              -----------------------
@@ -66,6 +70,8 @@ import shutil
 
 # Global constants used in this script:
 cellName = AdminControl.getCell()
+# Marker file of pending topology changes, read by pluginConfig_J27.py.
+pluginMarker = '/var/tmp/was-plugin.pending'
 
 
 # Parameters used by functions such as createUnixTempDir().
@@ -242,6 +248,20 @@ def syncActiveNodes():
 #endDef
 
 
+# Record a topology change in the plug-in marker file, for pluginConfig_J27.py
+# to regenerate the plug-in configuration once for the whole batch:
+def markPluginPending( reason ):
+    try:
+        f = open( pluginMarker, 'a' )
+        f.write( time.strftime( '%Y-%m-%d %H:%M:%S' ) + ' ' + reason + '\n' )
+        f.close()
+        print "PLUG-IN REGENERATION MARKED PENDING."
+    except:
+        print "WARNING: could not write " + pluginMarker + ", RUN pluginConfig_J27.py --force."
+    #endTry
+#endDef
+
+
 # Simple function to restart app server (svr) on node (nde) so changes can take effect.
 # TO-DO: this function might be improved with some exception handling.
 def restartAppSvr( svr, nde ):
@@ -321,6 +341,9 @@ def main() :
     # Sync any active nodes:
     syncActiveNodes()
 
+    # Mark the plug-in configuration for regeneration:
+    markPluginPending( 'AppServerPortsProps ' + nodeName + ' ' + serverName )
+
     # Restart app server for changes to take effect:
     restartAppSvr( serverName, nodeName ) 
 
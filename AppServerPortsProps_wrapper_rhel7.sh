@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         AppServerPortsProps_wrapper_rhel7.sh
-# VERSION:      1.00
+# VERSION:      1.02
 # DESCRIPTION:  This script changes the ports (aka "End Points") of a WebSphere
 #               Application Server instance. It calls a Jython 2.7-compatible  
 #               script called "AppServerPortsProps_J27.py" to make the actual 
@@ -28,6 +28,12 @@
 #               inbound according to the new port values. Currently, this
 #               script only configures firewalld-based firewalls as found
 #               on RHEL7-based platforms.
+#
+#               A copy of the ports file is kept as PROBE_PORTS_FILE, naming
+#               the host of WAS_NODE (WAS_NODE_HOST) in a '# HOST=' line, so 
+#               that once the app server has been restarted with its new 
+#               ports, they can be checked in parallel with was-probe.py, 
+#               e.g.: was-probe.py --host ${WAS_NODE_HOST} --timeout 5 ${PROBE_PORTS_FILE}
 #                
 #               Before running this script, please set the constant and 
 #               variable assignments according to your environment:
@@ -39,18 +45,21 @@
 #               JYTHON_SCRIPT = Path to AppServerPortsProps_J27.py script.
 #               WAS_APPSVR = WAS app server for which ports will be changed.
 #               WAS_NODE = Node that WAS_APPSVR resides on.
+#               WAS_NODE_HOST = Host name of WAS_NODE, probed by was-probe.py.
 #               PROFILE_PATH = Path to WAS profile used for admin functions.
-#               WAS_ADMIN_USER = WAS admin user with full privileges.
-#               WAS_ADMIN_PASSWORD = Password for WAS_ADMIN_USER.
+#               WSADMIN_SCRIPT = Path to was-wsadmin.sh, which logs in as the
+#               WAS admin user with the cached client configuration of
+#               PROFILE_NAME (see was-soapclient-update.sh).
 #               APPSVR_PORTS_FILE = Specify where to create temp ports file.
 #               PORT_OFFSET = Positive integer value for offsetting port values.
 #               WAS_NIC = Network interface used by WAS. NOT REQUIRED.
 #               LOG = Log file created by script; set to /dev/null if not
 #               required.
 #
-#               IMPORTANT: For security reasons, some above the above values
-#               (such as WAS_ADMIN_PASSWORD) should ideally be defined 
-#               externally before running this script. 
+#               IMPORTANT: No WAS admin password is held by this script, or
+#               passed on the wsadmin command line; create the profile's
+#               cached client configuration with was-soapclient-update.sh
+#               first.
 #
 #               NOTE:  The initial port values (defined under PROFILE PORT 
 #               DEFINITIONS below) are based on those of the default WAS app
@@ -69,10 +78,11 @@ PROFILE_NAME=${PROFILE_NAME:=Dmgr01}
 JYTHON_SCRIPT=${JYTHON_SCRIPT:=/scripts/was9/AppServerPortsProps_J27.py}
 WAS_APPSVR=${WAS_APPSVR:=server1}
 WAS_NODE=${WAS_NODE:=centos70Node01}
+WAS_NODE_HOST=${WAS_NODE_HOST:=centos70}
 PROFILE_PATH=${WAS_ROOT}/profiles/${PROFILE_NAME}
-WAS_ADMIN_USER=${WAS_ADMIN_USER:=wasadmin}
-WAS_ADMIN_PASSWORD=${WAS_ADMIN_PASSWORD:=12345678}
+WSADMIN_SCRIPT=${WSADMIN_SCRIPT:=/scripts/was9/was-wsadmin.sh}
 APPSVR_PORTS_FILE=/tmp/${WAS_APPSVR}.portdef.props
+PROBE_PORTS_FILE=${PROBE_PORTS_FILE:=/var/tmp/${WAS_APPSVR}.portdef.props}
 PORT_OFFSET=${PORT_OFFSET:=0}
 WAS_NIC=${WAS_NIC:=enp0s3}
 SCRIPTNAME=`basename $0`
@@ -248,10 +258,19 @@ firewalld_service_port() {
 }
 
 
+# Keep a copy of the ports file for was-probe.py, naming the host to probe
+# (the app server's node, not this Deployment Manager host).
+keep_probe_ports_file() {
+  ${SUDO} cp -p "${APPSVR_PORTS_FILE}" "${PROBE_PORTS_FILE}"
+  echo "# HOST=${WAS_NODE_HOST}" | ${SUDO} tee -a "${PROBE_PORTS_FILE}" > /dev/null
+  printf "\n=> Ports file kept for was-probe.py as ${PROBE_PORTS_FILE}.\n" | tee -a ${LOG}
+}
+
+
 # Post-install cleanup function.
 cleanup() {
-  if [ -f "${NODE_PORTS_FILE}" ] ; then
-    ${SUDO} rm -f "${NODE_PORTS_FILE}"
+  if [ -f "${APPSVR_PORTS_FILE}" ] ; then
+    ${SUDO} rm -f "${APPSVR_PORTS_FILE}"
   fi
 }
 
@@ -282,7 +301,7 @@ populate_appsvr_ports_file
 # Run Jython script to make changes to WAS configuration:
 printf "\nBEGIN EXECUTION OF JYTHON SCRIPT ${JYTHON_SCRIPT}: \n\n" | tee -a ${LOG}
 
-${SUDO} su - ${WAS_USER} -c "${PROFILE_PATH}/bin/wsadmin.sh -lang jython -profileName ${PROFILE_NAME} -username ${WAS_ADMIN_USER} -password ${WAS_ADMIN_PASSWORD} -f "${JYTHON_SCRIPT}" --server ${WAS_APPSVR} --node ${WAS_NODE} --newprops "${APPSVR_PORTS_FILE}""  | tee -a ${LOG}
+WAS_USER=${WAS_USER} PROFILE_NAME=${PROFILE_NAME} PROFILE_PATH=${PROFILE_PATH} ${WSADMIN_SCRIPT} -f "${JYTHON_SCRIPT}" --server ${WAS_APPSVR} --node ${WAS_NODE} --newprops "${APPSVR_PORTS_FILE}" | tee -a ${LOG}
 
 printf "\nENDED EXECUTION OF JYTHON SCRIPT ${JYTHON_SCRIPT}. \n\n" | tee -a ${LOG}
 
@@ -324,7 +343,8 @@ ${SUDO} firewall-cmd --reload
 ################################################################################
 
 
-# Remove temporary files used for profile creation:
+# Keep the new ports for was-probe.py, then remove temporary files:
+keep_probe_ports_file
 cleanup
 
 
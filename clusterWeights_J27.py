@@ -0,0 +1,420 @@
+#------------------------------------------------------------------------------
+#    NAME: clusterWeights_J27.py
+# PURPOSE: Manages the routing weights and preferLocal setting of an existing
+#          WAS cluster, and reports the resulting traffic share per host.
+# VERSION: 1.0
+#   NOTES: Every member created by createCluster_J27.py and
+#          createClusterMember_J27.py gets the same default weight, so each
+#          member receives an equal share of the traffic regardless of the
+#          host it runs on.  This script rebalances the member weights of a
+#          cluster in proportion to the capacity of each host, so that mixed
+#          generations of hardware in the same cluster are loaded according
+#          to what they can handle.
+#
+#          This script must be run with the following option:
+#
+#          --cluster cluster_name
+#              Specify the name of the existing cluster.
+#
+#          The following options are optional:
+#
+#          --capacityMap capacity_file
+#              Full path to a file giving the relative capacity of each host
+#              (or node) running cluster members.  Entries must have the
+#              format:
+#
+#              HOST_OR_NODE_NAME=capacity
+#
+#              e.g. "centos70=4" and "centos702Node01=8".  Capacity is any
+#              positive whole number (e.g. cores); a capacity of 0 drains the
+#              host.  Where a host runs several members, its capacity is
+#              shared between them.  The member(s) with the largest share
+#              get the maximum weight (see # Global constants below), the
+#              others a proportionally smaller one.  Members on hosts not
+#              listed in the file keep their current weight.
+#
+#          --preferLocal true|false
+#              Switches the preferLocal routing setting of the cluster.
+#
+#          If neither of the above options is given, no changes are made and
+#          only the report of the current weights is produced.
+#
+#          The report lists the weight of each member and the effective
+#          traffic share of each host (the sum of the weights of its members
+#          as a percentage of the total weight of the cluster).
+#
+#          After changes are made, the configuration is saved and nodes are
+#          synchronised.  The changes are then recorded as a pending
+#          topology change, for pluginConfig_J27.py to regenerate the web
+#          server plug-in configuration (and so pass the new weights to the
+#          plug-in) once after a batch of changes.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import re
+import time
+
+# Global constants used in this script:
+# Marker file of pending topology changes, read by pluginConfig_J27.py.
+pluginMarker = '/var/tmp/was-plugin.pending'
+# Range of member weights allowed by WAS.
+maxweight = 20
+minweight = 0
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    clusterWeights_J27.py --cluster cluster_name [--capacityMap capacity_file] [--preferLocal true|false]
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global c1, capfile, plocal
+    # Some parameters require initial defaults:
+    c1 = ''
+    capfile = ''
+    plocal = ''
+    try:
+        shortForm = ""
+        longForm = ["cluster=", "capacityMap=", "preferLocal="]
+        argCount = len( sys.argv[0:])
+        if ( argCount < 2 ):
+            print "ERROR - Minimum no. of required command-line options have not been specified."
+            usage()
+            os._exit(2)
+        #endIf
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--cluster':
+            c1 = val
+        elif flag == '--capacityMap':
+            capfile = val
+        elif flag == '--preferLocal':
+            if val not in ('true', 'false'):
+                print "ERROR - --preferLocal must be either true or false."
+                usage()
+                os._exit(2)
+            #endIf
+            plocal = val
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+    if not c1:
+        print "ERROR - --cluster must be specified."
+        usage()
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Function to check file exists.
+def pathCheck( p1 ) :
+    if not os.path.isfile( p1 ) :
+        print "FILE NOT FOUND: "+p1
+        print "EXITING..."
+        os._exit(1)
+    #endif
+#endDef
+
+
+# Function to read the capacity map file (f1) into a dictionary keyed by
+# host or node name.  Blank lines and comments are ignored.
+def readCapacityMap( f1 ):
+    capacities = {}
+    regex1 = re.compile( '^\s*([^#=\s]+)\s*=\s*(\d+)\s*$' )
+    file1 = open( f1, 'r' )
+    for line in file1.readlines():
+        match = regex1.search( line )
+        if match:
+            capacities[ match.group(1) ] = int( match.group(2) )
+        elif line.strip() and not line.strip().startswith( '#' ):
+            print "IGNORING INVALID CAPACITY ENTRY: " + line.strip()
+        #endIf
+    #endFor
+    file1.close()
+    return capacities
+#endDef
+
+
+# Function to look up the cluster (clstr) config ID, exiting if not found.
+def getCluster( clstr ):
+    clusterID = AdminConfig.getid( '/ServerCluster:' + clstr + '/' )
+    if not clusterID:
+        print "CLUSTER " + clstr + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    return clusterID
+#endDef
+
+
+# Function returns the host name of node (nde) as recorded in its server index.
+def nodeHost( nde ):
+    nodeID = AdminConfig.getid( '/Node:' + nde + '/' )
+    indexes = AdminConfig.list( 'ServerIndex', nodeID ).splitlines()
+    if indexes:
+        return AdminConfig.showAttribute( indexes[0], 'hostName' )
+    #endIf
+    return nde
+#endDef
+
+
+# Function returns a list of [memberID, server, node, host, weight] entries
+# for each member of the cluster (clusterID).
+def clusterMembers( clusterID ):
+    members = []
+    hosts = {}
+    for memberID in AdminConfig.list( 'ClusterMember', clusterID ).splitlines():
+        svr = AdminConfig.showAttribute( memberID, 'memberName' )
+        nde = AdminConfig.showAttribute( memberID, 'nodeName' )
+        if not hosts.has_key( nde ):
+            hosts[ nde ] = nodeHost( nde )
+        #endIf
+        wgt = int( AdminConfig.showAttribute( memberID, 'weight' ) )
+        members.append( [ memberID, svr, nde, hosts[ nde ], wgt ] )
+    #endFor
+    return members
+#endDef
+
+
+# Function calculates new member weights from the capacity map (capacities).
+# Each host's capacity is shared between the members it runs, and the shares
+# are scaled so that the largest share gets the maximum weight.  Returns a
+# dictionary of new weights keyed by member config ID.
+def calcWeights( members, capacities ):
+    shares = {}
+    perHost = {}
+    for memberID, svr, nde, host, wgt in members:
+        perHost[ host ] = perHost.get( host, 0 ) + 1
+    #endFor
+    for memberID, svr, nde, host, wgt in members:
+        if capacities.has_key( host ):
+            capacity = capacities[ host ]
+        elif capacities.has_key( nde ):
+            capacity = capacities[ nde ]
+        else:
+            print "NO CAPACITY GIVEN FOR " + svr + " ON " + host + ", WEIGHT LEFT UNCHANGED."
+            continue
+        #endIf
+        shares[ memberID ] = float( capacity ) / perHost[ host ]
+    #endFor
+    newWeights = {}
+    if not shares:
+        return newWeights
+    #endIf
+    maxshare = max( shares.values() )
+    for memberID, share in shares.items():
+        if maxshare == 0 or share == 0:
+            newWeights[ memberID ] = minweight
+        else:
+            # Never round a host with some capacity down to a drained member:
+            newWeights[ memberID ] = max( 1, int( round( share / maxshare * maxweight ) ) )
+        #endIf
+    #endFor
+    return newWeights
+#endDef
+
+
+# Function to apply the new weights (newWeights) to the cluster members.
+# Only members whose weight actually changes are modified.
+def applyWeights( members, newWeights ):
+    changes = 0
+    for member in members:
+        memberID, svr, nde, host, wgt = member
+        if not newWeights.has_key( memberID ):
+            continue
+        #endIf
+        newwgt = newWeights[ memberID ]
+        if newwgt == wgt:
+            print "WEIGHT OF " + svr + " ON " + nde + " ALREADY " + str( wgt ) + ", NO CHANGES MADE."
+            continue
+        #endIf
+        print "CHANGING WEIGHT OF " + svr + " ON " + nde + " FROM " + str( wgt ) + " TO " + str( newwgt ) + "...",
+        try:
+            AdminConfig.modify( memberID, [['weight', newwgt]] )
+        except:
+            # Report exception type and exception message if exception raised:
+            print
+            print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+            os._exit(1)
+        else:
+            print "DONE."
+            member[4] = newwgt
+            changes = changes + 1
+        #endTry
+    #endFor
+    return changes
+#endDef
+
+
+# Function to switch the preferLocal setting (plc) of the cluster (clusterID).
+# Returns 1 if the setting was changed, otherwise 0.
+def setPreferLocal( clusterID, clstr, plc ):
+    current = AdminConfig.showAttribute( clusterID, 'preferLocal' )
+    if current == plc:
+        print "preferLocal ALREADY " + plc + " ON CLUSTER " + clstr + ", NO CHANGES MADE."
+        return 0
+    #endIf
+    print "CHANGING preferLocal ON CLUSTER " + clstr + " FROM " + current + " TO " + plc + "...",
+    try:
+        AdminConfig.modify( clusterID, [['preferLocal', plc]] )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return 1
+#endDef
+
+
+# Function to report member weights and the effective traffic share per host.
+def weightReport( clusterID, clstr, members ):
+    total = 0
+    hostWeights = {}
+    hostOrder = []
+    for memberID, svr, nde, host, wgt in members:
+        total = total + wgt
+        if not hostWeights.has_key( host ):
+            hostWeights[ host ] = 0
+            hostOrder.append( host )
+        #endIf
+        hostWeights[ host ] = hostWeights[ host ] + wgt
+    #endFor
+    print
+    print "WEIGHT REPORT FOR CLUSTER " + clstr + " (preferLocal=" + AdminConfig.showAttribute( clusterID, 'preferLocal' ) + "):"
+    print "  %-20s %-24s %-24s %6s" % ( 'MEMBER', 'NODE', 'HOST', 'WEIGHT' )
+    for memberID, svr, nde, host, wgt in members:
+        print "  %-20s %-24s %-24s %6d" % ( svr, nde, host, wgt )
+    #endFor
+    print
+    print "  %-24s %6s %8s" % ( 'HOST', 'WEIGHT', 'SHARE' )
+    for host in hostOrder:
+        if total:
+            share = 100.0 * hostWeights[ host ] / total
+        else:
+            share = 0.0
+        #endIf
+        print "  %-24s %6d %7.1f%%" % ( host, hostWeights[ host ], share )
+    #endFor
+    if not total:
+        print "  WARNING: ALL MEMBERS HAVE A WEIGHT OF 0, THE CLUSTER RECEIVES NO TRAFFIC."
+    #endIf
+    print
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Sync active nodes:
+def syncActiveNodes():
+    dmgrMB = AdminControl.queryNames("type=DeploymentManager,*")
+    print "SYNCING ACTIVE NODES ...",
+    syncResult = AdminControl.invoke(dmgrMB, 'syncActiveNodes', 'true')
+    if syncResult:
+        print "DONE."
+    else:
+        print "NO NODES SYNC'D."
+    #endIf
+#endDef
+
+
+# Record a topology change in the plug-in marker file, for pluginConfig_J27.py
+# to regenerate the plug-in configuration once for the whole batch:
+def markPluginPending( reason ):
+    try:
+        f = open( pluginMarker, 'a' )
+        f.write( time.strftime( '%Y-%m-%d %H:%M:%S' ) + ' ' + reason + '\n' )
+        f.close()
+        print "PLUG-IN REGENERATION MARKED PENDING."
+    except:
+        print "WARNING: could not write " + pluginMarker + ", RUN pluginConfig_J27.py --force."
+    #endTry
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+
+    clusterID = getCluster( c1 )
+    members = clusterMembers( clusterID )
+    changes = 0
+
+    # Rebalance weights from capacity map, if specified on command-line:
+    if capfile:
+        pathCheck( capfile )
+        newWeights = calcWeights( members, readCapacityMap( capfile ) )
+        changes = changes + applyWeights( members, newWeights )
+    #endIf
+
+    # preferLocal setting, if specified on command-line:
+    if plocal:
+        changes = changes + setPreferLocal( clusterID, c1, plocal )
+    #endIf
+
+    # Only save and sync if something actually changed:
+    if changes:
+        saveConfig()
+        syncActiveNodes()
+        markPluginPending( 'clusterWeights ' + c1 )
+    #endIf
+
+    # Report resulting weights and traffic share:
+    weightReport( clusterID, c1, members )
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
+
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/clusterWeights_J27.py --cluster Cluster01 --capacityMap /scripts/was9/Cluster01.capacity.props --preferLocal true
+
@@ -0,0 +1,668 @@
+#------------------------------------------------------------------------------
+#    NAME: coreGroups_J27.py
+# PURPOSE: Analyses the core group membership of a WAS cell and partitions
+#          it into several core groups when it grows too large.
+# VERSION: 1.0
+#   NOTES: Every server created by createAppServer_J27.py and
+#          createClusterMember_J27.py joins the DefaultCoreGroup.  The HA
+#          manager's discovery and heartbeat traffic (over each JVM's
+#          DCS_UNICAST_ADDRESS) grows roughly with the square of the number
+#          of core group members, so beyond a few dozen JVMs it costs CPU on
+#          every member and slows down startup.  IBM recommend keeping core
+#          groups to no more than about 50 members.
+#
+#          This script can be run with one of the following options:
+#
+#          --analyze
+#              Reports each core group, its members (node agents, clusters,
+#              unclustered app servers), its preferred coordinators and the
+#              number of member pairs exchanging heartbeats.
+#
+#          --propose proposal_file
+#              Proposes a partition of the cell into core groups of no more
+#              than --maxMembers members each and writes it to proposal_file
+#              for review (and editing, if required).  Clusters are always
+#              kept intact within one core group.  Each node agent is placed
+#              in the core group holding most of its node's servers, and
+#              becomes the preferred coordinator and core group bridge
+#              interface of that core group.  The Deployment Manager stays
+#              in the DefaultCoreGroup.
+#
+#          --apply proposal_file
+#              Applies a (reviewed) proposal: creates any missing core
+#              groups, moves clusters and servers, sets the preferred
+#              coordinators and configures the core group bridge so that
+#              the core groups can still exchange routing information.
+#              Only differences from the current configuration are applied.
+#
+#          --maxMembers number
+#              Maximum number of members per core group used by --propose
+#              and --analyze (see # Global constants below for the default).
+#
+#          The proposal file has one entry per line, in the format:
+#
+#              CLUSTER.cluster_name=core_group
+#              SERVER.node_name/server_name=core_group
+#              NODEAGENT.node_name=core_group
+#              COORDINATOR.core_group=node_name/server_name
+#              BRIDGE.core_group=node_name/server_name
+#
+#          New members are placed automatically: cluster members created by
+#          createClusterMember_J27.py join the core group of their cluster,
+#          while createAppServer_J27.py places new servers in the core group
+#          of their node agent (see its --coreGroup option).
+#
+#          After changes are made, the configuration is saved and nodes are
+#          synchronised.  All moved processes must be restarted for the new
+#          core group membership to take effect.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import re
+import time
+
+# Global constants used in this script:
+defaultcg = 'DefaultCoreGroup'
+cgprefix = 'CoreGroup'
+maxmembers = 50
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    coreGroups_J27.py --analyze [--maxMembers number]
+    coreGroups_J27.py --propose proposal_file [--maxMembers number]
+    coreGroups_J27.py --apply proposal_file
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global mode, pfile, maxmembers
+    # Some parameters require initial defaults:
+    mode = ''
+    pfile = ''
+    try:
+        shortForm = ""
+        longForm = ["analyze", "propose=", "apply=", "maxMembers="]
+        argCount = len( sys.argv[0:])
+        if ( argCount < 1 ):
+            print "ERROR - Minimum no. of required command-line options have not been specified."
+            usage()
+            os._exit(2)
+        #endIf
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--analyze':
+            mode = 'analyze'
+        elif flag == '--propose':
+            mode = 'propose'
+            pfile = val
+        elif flag == '--apply':
+            mode = 'apply'
+            pfile = val
+        elif flag == '--maxMembers':
+            if not val.isdigit() or int( val ) < 2:
+                print "ERROR - --maxMembers must be a whole number of at least 2."
+                usage()
+                os._exit(2)
+            #endIf
+            maxmembers = int( val )
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+    if not mode:
+        print "ERROR - One of --analyze, --propose or --apply must be specified."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function to check file exists.
+def pathCheck( p1 ) :
+    if not os.path.isfile( p1 ) :
+        print "FILE NOT FOUND: "+p1
+        print "EXITING..."
+        os._exit(1)
+    #endif
+#endDef
+
+
+# Function returns the config ID of core group (cg), or '' if not found.
+def getCoreGroup( cg ):
+    return AdminConfig.getid( '/CoreGroup:' + cg + '/' )
+#endDef
+
+
+# Function returns a dictionary mapping 'node/server' to the name of the
+# core group that the server currently belongs to.
+def coreGroupMembership():
+    membership = {}
+    for cgID in AdminConfig.list( 'CoreGroup' ).splitlines():
+        cg = AdminConfig.showAttribute( cgID, 'name' )
+        for cgsID in AdminConfig.list( 'CoreGroupServer', cgID ).splitlines():
+            nde = AdminConfig.showAttribute( cgsID, 'nodeName' )
+            svr = AdminConfig.showAttribute( cgsID, 'serverName' )
+            membership[ nde + '/' + svr ] = cg
+        #endFor
+    #endFor
+    return membership
+#endDef
+
+
+# Function returns a list of [node, server, serverType, clusterName] entries
+# for every process of the cell that can be a core group member.
+def cellProcesses():
+    processes = []
+    for nodeID in AdminConfig.list( 'Node' ).splitlines():
+        nde = AdminConfig.showAttribute( nodeID, 'name' )
+        for serverID in AdminConfig.list( 'Server', nodeID ).splitlines():
+            svr = AdminConfig.showAttribute( serverID, 'name' )
+            stype = AdminConfig.showAttribute( serverID, 'serverType' )
+            if stype not in ( 'APPLICATION_SERVER', 'NODE_AGENT', 'DEPLOYMENT_MANAGER' ):
+                continue
+            #endIf
+            clstr = AdminConfig.showAttribute( serverID, 'clusterName' )
+            if not clstr or clstr == 'null':
+                clstr = ''
+            #endIf
+            processes.append( [ nde, svr, stype, clstr ] )
+        #endFor
+    #endFor
+    return processes
+#endDef
+
+
+# Function returns the 'node/server' names of the preferred coordinators of
+# core group (cgID).
+def preferredCoordinators( cgID ):
+    coordinators = []
+    cgsIDs = AdminConfig.showAttribute( cgID, 'preferredCoordinatorServers' )[1:-1].split()
+    for cgsID in cgsIDs:
+        coordinators.append( AdminConfig.showAttribute( cgsID, 'nodeName' ) + '/' + AdminConfig.showAttribute( cgsID, 'serverName' ) )
+    #endFor
+    return coordinators
+#endDef
+
+
+# Function to report the current core group membership.
+def analyze():
+    membership = coreGroupMembership()
+    processes = cellProcesses()
+    total = 0
+    print
+    print "CORE GROUP ANALYSIS:"
+    for cgID in AdminConfig.list( 'CoreGroup' ).splitlines():
+        cg = AdminConfig.showAttribute( cgID, 'name' )
+        admins = []
+        clusters = {}
+        servers = []
+        for nde, svr, stype, clstr in processes:
+            if membership.get( nde + '/' + svr ) != cg:
+                continue
+            #endIf
+            if stype != 'APPLICATION_SERVER':
+                admins.append( nde + '/' + svr )
+            elif clstr:
+                clusters[ clstr ] = clusters.get( clstr, 0 ) + 1
+            else:
+                servers.append( nde + '/' + svr )
+            #endIf
+        #endFor
+        count = len( admins ) + len( servers )
+        for clstr in clusters.keys():
+            count = count + clusters[ clstr ]
+        #endFor
+        total = total + count
+        print
+        print "  " + cg + ": " + str( count ) + " MEMBERS, " + str( count * ( count - 1 ) / 2 ) + " HEARTBEAT PAIRS"
+        print "    ADMIN PROCESSES:   " + ' '.join( admins )
+        clusterList = []
+        for clstr in clusters.keys():
+            clusterList.append( clstr + '(' + str( clusters[ clstr ] ) + ')' )
+        #endFor
+        print "    CLUSTERS:          " + ' '.join( clusterList )
+        print "    UNCLUSTERED:       " + ' '.join( servers )
+        print "    COORDINATORS:      " + AdminConfig.showAttribute( cgID, 'numCoordinators' ) + \
+              ", PREFERRED: " + ' '.join( preferredCoordinators( cgID ) )
+        if count > maxmembers:
+            print "    WARNING: MORE THAN " + str( maxmembers ) + " MEMBERS, CONSIDER PARTITIONING."
+        #endIf
+        if not admins:
+            print "    WARNING: NO NODE AGENT OR DEPLOYMENT MANAGER IN THIS CORE GROUP."
+        #endIf
+    #endFor
+    print
+    print "TOTAL CORE GROUP MEMBERS IN CELL: " + str( total )
+    print
+#endDef
+
+
+# Function to propose a partition of the cell into core groups of at most
+# maxmembers members, written to file (f1).  Clusters and the unclustered
+# servers of a node are kept together as units, and units are placed in the
+# least loaded core group, largest first.
+def propose( f1 ):
+    processes = cellProcesses()
+    units = {}
+    nodeagents = []
+    dmgr = ''
+    for nde, svr, stype, clstr in processes:
+        if stype == 'DEPLOYMENT_MANAGER':
+            dmgr = nde + '/' + svr
+        elif stype == 'NODE_AGENT':
+            nodeagents.append( [ nde, svr ] )
+        elif clstr:
+            units.setdefault( 'CLUSTER.' + clstr, [] ).append( [ nde, svr ] )
+        else:
+            units.setdefault( 'NODE.' + nde, [] ).append( [ nde, svr ] )
+        #endIf
+    #endFor
+    members = len( processes )
+    numgroups = ( members + maxmembers - 1 ) / maxmembers
+    if numgroups < 2:
+        print "CELL HAS " + str( members ) + " CORE GROUP MEMBERS, NO PARTITION REQUIRED."
+        numgroups = 1
+    #endIf
+    groups = [ defaultcg ]
+    for n in range( 1, numgroups ):
+        groups.append( cgprefix + '%02d' % n )
+    #endFor
+    # The Deployment Manager always stays in the DefaultCoreGroup:
+    sizes = {}
+    for cg in groups:
+        sizes[ cg ] = 0
+    #endFor
+    if dmgr:
+        sizes[ defaultcg ] = 1
+    #endIf
+    # Node agents are counted against the groups as they are placed below,
+    # so reserve room for one per node up front:
+    reserve = float( len( nodeagents ) ) / len( groups )
+    placement = {}
+    unitNames = units.keys()
+    unitNames.sort( lambda a, b: cmp( len( units[b] ), len( units[a] ) ) )
+    for unit in unitNames:
+        target = groups[0]
+        for cg in groups:
+            if sizes[ cg ] < sizes[ target ]:
+                target = cg
+            #endIf
+        #endFor
+        if sizes[ target ] + len( units[ unit ] ) + reserve > maxmembers and len( units[ unit ] ) <= maxmembers:
+            print "WARNING: " + unit + " TAKES CORE GROUP " + target + " OVER " + str( maxmembers ) + " MEMBERS."
+        #endIf
+        placement[ unit ] = target
+        sizes[ target ] = sizes[ target ] + len( units[ unit ] )
+    #endFor
+    # Place each node agent with the majority of its node's servers:
+    agentPlacement = {}
+    for nde, svr in nodeagents:
+        counts = {}
+        for unit in unitNames:
+            for mnde, msvr in units[ unit ]:
+                if mnde == nde:
+                    counts[ placement[ unit ] ] = counts.get( placement[ unit ], 0 ) + 1
+                #endIf
+            #endFor
+        #endFor
+        target = defaultcg
+        for cg in counts.keys():
+            if counts[ cg ] > counts.get( target, 0 ):
+                target = cg
+            #endIf
+        #endFor
+        agentPlacement[ nde ] = [ svr, target ]
+        sizes[ target ] = sizes[ target ] + 1
+    #endFor
+    # Every core group needs at least one administrative process; move a
+    # spare node agent into any group that has none:
+    for cg in groups:
+        hasAdmin = ( cg == defaultcg and dmgr )
+        for nde in agentPlacement.keys():
+            if agentPlacement[ nde ][1] == cg:
+                hasAdmin = 1
+            #endIf
+        #endFor
+        if hasAdmin:
+            continue
+        #endIf
+        for nde in agentPlacement.keys():
+            source = agentPlacement[ nde ][1]
+            others = 0
+            for onde in agentPlacement.keys():
+                if onde != nde and agentPlacement[ onde ][1] == source:
+                    others = others + 1
+                #endIf
+            #endFor
+            if others or ( source == defaultcg and dmgr ):
+                agentPlacement[ nde ][1] = cg
+                hasAdmin = 1
+                break
+            #endIf
+        #endFor
+        if not hasAdmin:
+            print "WARNING: NO NODE AGENT AVAILABLE FOR CORE GROUP " + cg + "."
+        #endIf
+    #endFor
+    # Write the proposal:
+    file1 = open( f1, 'w' )
+    file1.write( '# Core group partition proposed by coreGroups_J27.py on ' + time.ctime() + '\n' )
+    file1.write( '# ' + str( members ) + ' members, at most ' + str( maxmembers ) + ' per core group.\n' )
+    for unit in unitNames:
+        if unit.startswith( 'CLUSTER.' ):
+            file1.write( unit + '=' + placement[ unit ] + '\n' )
+        else:
+            for nde, svr in units[ unit ]:
+                file1.write( 'SERVER.' + nde + '/' + svr + '=' + placement[ unit ] + '\n' )
+            #endFor
+        #endIf
+    #endFor
+    nodes = agentPlacement.keys()
+    nodes.sort()
+    for nde in nodes:
+        file1.write( 'NODEAGENT.' + nde + '=' + agentPlacement[ nde ][1] + '\n' )
+    #endFor
+    for cg in groups:
+        coordinator = ''
+        for nde in nodes:
+            if agentPlacement[ nde ][1] == cg:
+                coordinator = nde + '/' + agentPlacement[ nde ][0]
+                break
+            #endIf
+        #endFor
+        if cg == defaultcg and dmgr:
+            coordinator = dmgr
+        #endIf
+        if coordinator:
+            file1.write( 'COORDINATOR.' + cg + '=' + coordinator + '\n' )
+            if numgroups > 1:
+                file1.write( 'BRIDGE.' + cg + '=' + coordinator + '\n' )
+            #endIf
+        #endIf
+    #endFor
+    file1.close()
+    print "PROPOSED PARTITION INTO " + str( numgroups ) + " CORE GROUP(S) WRITTEN TO: " + f1
+    for cg in groups:
+        print "  " + cg + ": " + str( sizes[ cg ] ) + " MEMBERS"
+    #endFor
+#endDef
+
+
+# Function to read a proposal file (f1) into a list of [type, name, value].
+def readProposal( f1 ):
+    entries = []
+    regex1 = re.compile( '^\s*(CLUSTER|SERVER|NODEAGENT|COORDINATOR|BRIDGE)\.([^=\s]+)\s*=\s*(\S+)\s*$' )
+    file1 = open( f1, 'r' )
+    for line in file1.readlines():
+        match = regex1.search( line )
+        if match:
+            entries.append( [ match.group(1), match.group(2), match.group(3) ] )
+        elif line.strip() and not line.strip().startswith( '#' ):
+            print "IGNORING INVALID PROPOSAL ENTRY: " + line.strip()
+        #endIf
+    #endFor
+    file1.close()
+    return entries
+#endDef
+
+
+# Function to create core group (cg) if it does not already exist.
+# Returns 1 if the core group was created, otherwise 0.
+def createCoreGroup( cg ):
+    if getCoreGroup( cg ):
+        return 0
+    #endIf
+    print "CREATING CORE GROUP " + cg + "...",
+    try:
+        AdminTask.createCoreGroup( '[-coreGroupName ' + cg + ']' )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return 1
+#endDef
+
+
+# Function to move a cluster (clstr) or server (nde/svr) from core group
+# (source) to core group (target).
+def moveToCoreGroup( source, target, clstr = '', nde = '', svr = '' ):
+    try:
+        if clstr:
+            print "MOVING CLUSTER " + clstr + " FROM " + source + " TO " + target + "...",
+            AdminTask.moveClusterToCoreGroup( '[-source ' + source + ' -target ' + target + ' -clusterName ' + clstr + ']' )
+        else:
+            print "MOVING SERVER " + nde + "/" + svr + " FROM " + source + " TO " + target + "...",
+            AdminTask.moveServerToCoreGroup( '[-source ' + source + ' -target ' + target + ' -nodeName ' + nde + ' -serverName ' + svr + ']' )
+        #endIf
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+#endDef
+
+
+# Function returns the CoreGroupServer config ID of (process) 'node/server'
+# within core group (cgID), or '' if it is not a member.
+def findCoreGroupServer( cgID, process ):
+    for cgsID in AdminConfig.list( 'CoreGroupServer', cgID ).splitlines():
+        if AdminConfig.showAttribute( cgsID, 'nodeName' ) + '/' + AdminConfig.showAttribute( cgsID, 'serverName' ) == process:
+            return cgsID
+        #endIf
+    #endFor
+    return ''
+#endDef
+
+
+# Function to make (process) the single preferred coordinator of core group (cg).
+# Returns 1 if the configuration was changed, otherwise 0.
+def setCoordinator( cg, process ):
+    cgID = getCoreGroup( cg )
+    if preferredCoordinators( cgID ) == [ process ]:
+        print "PREFERRED COORDINATOR OF " + cg + " ALREADY " + process + ", NO CHANGES MADE."
+        return 0
+    #endIf
+    cgsID = findCoreGroupServer( cgID, process )
+    if not cgsID:
+        print "WARNING: " + process + " IS NOT A MEMBER OF " + cg + ", COORDINATOR NOT SET."
+        return 0
+    #endIf
+    print "SETTING PREFERRED COORDINATOR OF " + cg + " TO " + process + "...",
+    # List attributes are appended to by modify(), so clear them first:
+    AdminConfig.modify( cgID, [['preferredCoordinatorServers', []]] )
+    AdminConfig.modify( cgID, [['preferredCoordinatorServers', [cgsID]], ['numCoordinators', 1]] )
+    print "DONE."
+    return 1
+#endDef
+
+
+# Function to make (process) the core group bridge interface of core group
+# (cg) in the default access point group.  Returns 1 if the configuration
+# was changed, otherwise 0.
+def setBridge( cg, process ):
+    nde, svr = process.split( '/' )
+    changes = 0
+    bridgeSettings = AdminConfig.list( 'CoreGroupBridgeSettings' ).splitlines()[0]
+    cgapID = ''
+    for apID in AdminConfig.list( 'CoreGroupAccessPoint', bridgeSettings ).splitlines():
+        if AdminConfig.showAttribute( apID, 'coreGroup' ) == cg:
+            cgapID = apID
+        #endIf
+    #endFor
+    if not cgapID:
+        print "CREATING CORE GROUP ACCESS POINT FOR " + cg + "...",
+        cgapID = AdminConfig.create( 'CoreGroupAccessPoint', bridgeSettings, [['name', 'CGAP_' + cg], ['coreGroup', cg]] )
+        for apgID in AdminConfig.list( 'AccessPointGroup', bridgeSettings ).splitlines():
+            if AdminConfig.showAttribute( apgID, 'name' ) == 'DefaultAccessPointGroup':
+                AdminConfig.modify( apgID, [['coreGroupAccessPointRefs', [cgapID]]] )
+            #endIf
+        #endFor
+        print "DONE."
+        changes = 1
+    #endIf
+    for biID in AdminConfig.list( 'BridgeInterface', cgapID ).splitlines():
+        if AdminConfig.showAttribute( biID, 'node' ) == nde and AdminConfig.showAttribute( biID, 'server' ) == svr:
+            print "BRIDGE INTERFACE OF " + cg + " ALREADY " + process + ", NO CHANGES MADE."
+            return changes
+        #endIf
+    #endFor
+    print "ADDING BRIDGE INTERFACE " + process + " TO " + cg + "...",
+    AdminConfig.create( 'BridgeInterface', cgapID, [['node', nde], ['server', svr], ['chain', 'DCS']] )
+    print "DONE."
+    return 1
+#endDef
+
+
+# Function to apply the proposal in file (f1).  Returns the number of changes.
+def apply( f1 ):
+    entries = readProposal( f1 )
+    changes = 0
+    # Create core groups first:
+    for etype, name, value in entries:
+        if etype in ( 'CLUSTER', 'SERVER', 'NODEAGENT' ):
+            changes = changes + createCoreGroup( value )
+        #endIf
+    #endFor
+    # Then move clusters and servers:
+    membership = coreGroupMembership()
+    processes = cellProcesses()
+    for etype, name, value in entries:
+        if etype == 'CLUSTER':
+            for nde, svr, stype, clstr in processes:
+                if clstr == name:
+                    source = membership.get( nde + '/' + svr )
+                    break
+                #endIf
+            else:
+                print "WARNING: CLUSTER " + name + " NOT FOUND, IGNORING."
+                continue
+            #endFor
+            if not source:
+                print "WARNING: CLUSTER " + name + " NOT FOUND IN ANY CORE GROUP, IGNORING."
+            elif source != value:
+                moveToCoreGroup( source, value, clstr = name )
+                changes = changes + 1
+            #endIf
+        elif etype in ( 'SERVER', 'NODEAGENT' ):
+            if etype == 'NODEAGENT':
+                process = name + '/nodeagent'
+            else:
+                process = name
+            #endIf
+            source = membership.get( process )
+            if not source:
+                print "WARNING: SERVER " + process + " NOT FOUND IN ANY CORE GROUP, IGNORING."
+            elif source != value:
+                nde, svr = process.split( '/' )
+                moveToCoreGroup( source, value, nde = nde, svr = svr )
+                changes = changes + 1
+            #endIf
+        #endIf
+    #endFor
+    # Finally coordinators and bridge interfaces:
+    for etype, name, value in entries:
+        if etype == 'COORDINATOR':
+            changes = changes + setCoordinator( name, value )
+        elif etype == 'BRIDGE':
+            changes = changes + setBridge( name, value )
+        #endIf
+    #endFor
+    return changes
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Sync active nodes:
+def syncActiveNodes():
+    dmgrMB = AdminControl.queryNames("type=DeploymentManager,*")
+    print "SYNCING ACTIVE NODES ...",
+    syncResult = AdminControl.invoke(dmgrMB, 'syncActiveNodes', 'true')
+    if syncResult:
+        print "DONE."
+    else:
+        print "NO NODES SYNC'D."
+    #endIf
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+
+    if mode == 'analyze':
+        analyze()
+    elif mode == 'propose':
+        propose( pfile )
+    elif mode == 'apply':
+        pathCheck( pfile )
+        if apply( pfile ):
+            saveConfig()
+            syncActiveNodes()
+            print "RESTART ALL MOVED PROCESSES FOR THE NEW CORE GROUP MEMBERSHIP TO TAKE EFFECT."
+        else:
+            print "CORE GROUP CONFIGURATION ALREADY MATCHES " + pfile + ", NO CHANGES MADE."
+        #endIf
+    #endIf
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Run wsadmin Jython script (use --analyze, --propose or --apply), logged in
+# by was-wsadmin.sh with the cached client configuration of the Dmgr01 profile:
+
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/coreGroups_J27.py --propose /scripts/was9/coregroups.proposal.props --maxMembers 50
+
@@ -1,13 +1,21 @@
 #------------------------------------------------------------------------------
 #    NAME: createAppServer.py
 # PURPOSE: To create WebSphere Application Server instance on a specified node. 
-# VERSION: 1.0
+# VERSION: 1.2
 #   NOTES: Specify the name of the new app server to be created using the
 #          --serverName option, the node on which each should be created using  
 #          the --nodeName option, and the template to use for creating the app
 #          server using the --templateName option.  The latter usually takes
 #          the value "default".
 #
+#          Optionally, the --coreGroup option places the new app server in
+#          a specific core group rather than the DefaultCoreGroup.  Use the
+#          value "auto" to place it in the same core group as the node agent
+#          of its node, which suits cells partitioned by coreGroups_J27.py.
+#          Once a cell has been partitioned (i.e. it has core groups other
+#          than the DefaultCoreGroup), "auto" is the default; give
+#          --coreGroup DefaultCoreGroup to override it.
+#
 #
 #          CHANGES FOR JYTHON 2.7:
 #          -----------------------
@@ -28,7 +36,7 @@ def usage():
     print
     print """This script must be used with command-line syntax: 
   
-    createAppServer.py --nodeName node --serverName server --templateName template
+    createAppServer.py --nodeName node --serverName server --templateName template [--coreGroup core_group|auto]
 
     """
 #endDef
@@ -37,10 +45,12 @@ def usage():
 # Function gets required command-line arguments:
 def get_args():
     # Make these args global for use outside of this function:
-    global n1, s1, t1
+    global n1, s1, t1, cg1
+    # Some parameters require initial defaults:
+    cg1 = ''
     try:
         shortForm = ""
-        longForm = ["nodeName=", "serverName=", "templateName="]
+        longForm = ["nodeName=", "serverName=", "templateName=", "coreGroup="]
         argCount = len( sys.argv[0:])
         if ( argCount < 6 ) :
             print "ERROR - Minimum no. of required command-line options have not been specified."
@@ -63,6 +73,8 @@ def get_args():
             s1 = val
         elif flag == '--templateName' :
             t1 = val
+        elif flag == '--coreGroup' :
+            cg1 = val
         else :
             usage()
             os._exit(2)
@@ -89,6 +101,57 @@ def create_server( node, server, template = 'default' ):
 #endDef
 
 
+# Function returns the name of the core group that server (server) on node
+# (node) belongs to, or '' if it is not a member of any core group.
+def server_coregroup( node, server ):
+    for cgID in AdminConfig.list( 'CoreGroup' ).splitlines():
+        for cgsID in AdminConfig.list( 'CoreGroupServer', cgID ).splitlines():
+            if AdminConfig.showAttribute( cgsID, 'nodeName' ) == node and AdminConfig.showAttribute( cgsID, 'serverName' ) == server:
+                return AdminConfig.showAttribute( cgID, 'name' )
+            #endIf
+        #endFor
+    #endFor
+    return ''
+#endDef
+
+
+# Function returns 1 if the cell has been partitioned into several core
+# groups, i.e. has core groups other than the DefaultCoreGroup.
+def cell_partitioned():
+    for cgID in AdminConfig.list( 'CoreGroup' ).splitlines():
+        if AdminConfig.showAttribute( cgID, 'name' ) != 'DefaultCoreGroup':
+            return 1
+        #endIf
+    #endFor
+    return 0
+#endDef
+
+
+# Function to move the new app server into core group (coregroup).  A value
+# of 'auto' selects the core group of the node agent on the same node.
+def place_coregroup( node, server, coregroup ):
+    if coregroup == 'auto':
+        coregroup = server_coregroup( node, 'nodeagent' )
+    #endIf
+    current = server_coregroup( node, server )
+    if not coregroup or coregroup == current:
+        print "SERVER", server, "REMAINS IN CORE GROUP", current
+        return
+    #endIf
+    try:
+        print "MOVING SERVER", server, "FROM CORE GROUP", current, "TO", coregroup, "...",
+        AdminTask.moveServerToCoreGroup( '[-source ' + current + ' -target ' + coregroup + ' -nodeName ' + node + ' -serverName ' + server + ']' )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "UNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else :
+        print "DONE."
+    #endTry
+#endDef
+
+
 # Save WAS Configuration:
 def saveConfig():
     print "SAVING CONFIGURATION ...",
@@ -117,12 +180,23 @@ def syncActiveNodes():
 
 # Main function:
 def main():
+    global cg1
     # First get command-line parameters:
     get_args()
 
     # Then create new app server:
     create_server( n1, s1, t1 )
 
+    # Place new app server in the required core group, if specified, or in
+    # the core group of its node agent if the cell has been partitioned:
+    if not cg1 and cell_partitioned():
+        print "CELL HAS SEVERAL CORE GROUPS, USING --coreGroup auto."
+        cg1 = 'auto'
+    #endIf
+    if cg1:
+        place_coregroup( n1, s1, cg1 )
+    #endIf
+
     # Save configuration:
     saveConfig()
 
@@ -1,7 +1,7 @@
 #------------------------------------------------------------------------------
 #    NAME: createClusterMember_J27.py
 # PURPOSE: Creates a new WAS app server cluster member.
-# VERSION: 1.0
+# VERSION: 1.2
 #   NOTES: This script uses the AdminTask.createClusterMember() method to 
 #          add a new application server member to an existing 
 #          APPLICATION_SERVER cluster.
@@ -22,9 +22,25 @@
 #          --node node_name
 #              Specify the node on which the new app server member is created.
 #
+#          The following option is optional:
+#
+#          --weight number
+#              Sets the routing weight (0-20) of the new member, e.g. in
+#              proportion to the capacity of the host it runs on.  If not
+#              given, the WAS default weight of 2 is used.
+#
+#          New members automatically join the core group of their cluster,
+#          so clusters moved out of the DefaultCoreGroup by coreGroups_J27.py
+#          stay intact as they grow.  New members also copy the session
+#          management settings of the first member, so run
+#          sessionConfig_J27.py --cluster again after adding members to
+#          check that every member has the cluster's session settings.
+#
 # 
 #          After changes are made, the configuration is saved and nodes are
-#          synchronised.
+#          synchronised.  The new member is then recorded as a pending
+#          topology change, for pluginConfig_J27.py to regenerate the web
+#          server plug-in configuration once after a batch of changes.
 #
 #
 #          CHANGES FOR JYTHON 2.7:
@@ -39,14 +55,18 @@
 import os
 import sys
 import getopt
+import time
 
+# Global constants used in this script:
+# Marker file of pending topology changes, read by pluginConfig_J27.py.
+pluginMarker = '/var/tmp/was-plugin.pending'
 
 # Function specifies correct script usage:
 def usage():
       print
       print """This script must be used with the command-line syntax: 
   
-      createClusterMember.py --cluster cluster_name --server server_name --node node_name
+      createClusterMember.py --cluster cluster_name --server server_name --node node_name [--weight number]
 
       """
 #endDef
@@ -55,11 +75,12 @@ def usage():
 # Function gets required command-line arguments & processes accordingly:
 def get_args():
     # Make args parameters global for use outside of this function:
-    global c1, s1, n1
+    global c1, s1, n1, w1
     # Some parameters require initial defaults:
+    w1 = ''
     try:
         shortForm = ""
-        longForm = ["cluster=", "server=", "node="]
+        longForm = ["cluster=", "server=", "node=", "weight="]
         argCount = len( sys.argv[0:])
         if ( argCount < 6 ) :
             print "ERROR - Minimum no. of required command-line options have not been specified."
@@ -82,6 +103,13 @@ def get_args():
             s1 = val
         elif flag == '--node':
             n1 = val
+        elif flag == '--weight':
+            if not val.isdigit() or int( val ) > 20:
+                print "ERROR - --weight must be a whole number between 0 and 20."
+                usage()
+                os._exit(2)
+            #endIf
+            w1 = val
         else :
             usage()
             os._exit(2)
@@ -91,10 +119,14 @@ def get_args():
 
 
 # Function to create new app server (svr) residing on node (nde) as a member
-# of an existing cluster (clstr).
-def cluster_newmember( clstr, srvr, nde ):
+# of an existing cluster (clstr), with an optional routing weight (wgt).
+def cluster_newmember( clstr, srvr, nde, wgt = '' ):
     # First construct that string specifies the desired cluster member configuration:
-    config = '[-clusterName ' + clstr + ' -memberConfig ' + ' [-memberNode ' + n1 + ' -memberName ' + s1 + ']]'
+    memberConfig = ' [-memberNode ' + nde + ' -memberName ' + srvr
+    if wgt:
+        memberConfig = memberConfig + ' -memberWeight ' + wgt
+    #endIf
+    config = '[-clusterName ' + clstr + ' -memberConfig ' + memberConfig + ']]'
     try:
         print "CREATING NEW CLUSTER MEMBER", srvr , "ON CLUSTER", clstr, "..."
         newmember = AdminTask.createClusterMember( config ) 
@@ -136,6 +168,20 @@ def syncActiveNodes():
 #endDef
 
 
+# Record a topology change in the plug-in marker file, for pluginConfig_J27.py
+# to regenerate the plug-in configuration once for the whole batch:
+def markPluginPending( reason ):
+    try:
+        f = open( pluginMarker, 'a' )
+        f.write( time.strftime( '%Y-%m-%d %H:%M:%S' ) + ' ' + reason + '\n' )
+        f.close()
+        print "PLUG-IN REGENERATION MARKED PENDING."
+    except:
+        print "WARNING: could not write " + pluginMarker + ", RUN pluginConfig_J27.py --force."
+    #endTry
+#endDef
+
+
 # Main function:
 def main():
 
@@ -143,13 +189,16 @@ def main():
     get_args()
 
     # Create new cluster member:
-    cluster_newmember( c1, s1, n1 )
+    cluster_newmember( c1, s1, n1, w1 )
 
     # Save configuration:
     saveConfig()
 
     # Sync any active nodes:
     syncActiveNodes()
+
+    # Mark the plug-in configuration for regeneration:
+    markPluginPending( 'createClusterMember ' + c1 + ' ' + n1 + ' ' + s1 )
  
     # Exit from Jython with a specific exit code:
     os._exit(0)
@@ -2,8 +2,8 @@
 #
 ################################################################################
 #
-# NAME:         AppServerPortsProps_wrapper_rhel7.sh
-# VERSION:      1.00
+# NAME:         createClusterMember_fw_rules.sh
+# VERSION:      1.01
 # DESCRIPTION:  This script extracts the configuration of a WAS app server to a
 #               properties file and reads it to determine the ports used by the 
 #               app server.  It then uses these values to open the firewall 
@@ -19,6 +19,10 @@
 #               This script must be run on the machine hosting the WAS app 
 #               server (WAS_SERVER), even though it connects to the 
 #               Deployment Manager server to get the configuration info.
+#               It connects with was-wsadmin.sh (WSADMIN_SCRIPT), which logs
+#               in with the cached client configuration of the local profile
+#               PROFILE_NAME (see was-soapclient-update.sh), so no WAS admin
+#               password is held here or passed on the command line.
 #
 ################################################################################
 #
@@ -29,8 +33,8 @@ WAS_ROOT=${WAS_ROOT:=/apps/IBM/WebSphere/AppServer}
 DMGR_HOSTNAME=${DMGR_HOSTNAME:=centos70}
 DMGR_IPADDRESS=${DMGR_IPADDRESS:=192.168.99.19}
 DMGR_PORT=${DMGR_PORT:=8879}
-DMGR_ADMIN_USER=${DMGR_ADMIN_USER:=wasadmin}
-DMGR_ADMIN_PASSWORD=${DMGR_ADMIN_PASSWORD:=12345678}
+PROFILE_NAME=${PROFILE_NAME:=AppSrv01}
+WSADMIN_SCRIPT=${WSADMIN_SCRIPT:=/scripts/was9/was-wsadmin.sh}
 JYTHON_SCRIPT=${JYTHON_SCRIPT:=/scripts/was9/AppServerProps_J27.py}
 WAS_SERVER=${WAS_SERVER:=server2}
 FW_SERVICE=WAS-${WAS_SERVER}
@@ -148,15 +152,9 @@ fi
 
 
 # Extract WAS_SERVER properties to file:
-${SUDO} su - ${WAS_USER} \
-  -c "${WAS_ROOT}/bin/wsadmin.sh \
-  -lang jython \
-  -connType SOAP \
-  -host ${DMGR_HOSTNAME} \
-  -port ${DMGR_PORT} \
-  -username ${DMGR_ADMIN_USER} \
-  -password ${DMGR_ADMIN_PASSWORD} \
-  -f ${JYTHON_SCRIPT} --server ${WAS_SERVER} --propsFile ${PROPS_FILE}"
+WAS_USER=${WAS_USER} WAS_ROOT=${WAS_ROOT} PROFILE_NAME=${PROFILE_NAME} \
+WSADMIN_HOST=${DMGR_HOSTNAME} WSADMIN_PORT=${DMGR_PORT} \
+  ${WSADMIN_SCRIPT} -f ${JYTHON_SCRIPT} --server ${WAS_SERVER} --propsFile ${PROPS_FILE}
 if [ ! -f "${PROPS_FILE}" ] ; then
   abort "Props file not found, aborting!"
 fi
@@ -1,6 +1,7 @@
 #!/bin/bash
 
-# Run wsadmin Jython script as user that owns WAS:
+# Run wsadmin Jython script as user that owns WAS (logged in by was-wsadmin.sh
+# with the cached client configuration of the local AppSrv01 profile):
 
-su - wbsadm -c "/apps/IBM/WebSphere/AppServer/bin/wsadmin.sh -lang jython -connType SOAP -host centos70 -port 8879 -username wasadmin -password 12345678 -f /scripts/was9/createClusterMember_J27.py --cluster Cluster01 --server server2 --node centos702Node01"
+PROFILE_NAME=AppSrv01 WSADMIN_HOST=centos70 WSADMIN_PORT=8879 /scripts/was9/was-wsadmin.sh -f /scripts/was9/createClusterMember_J27.py --cluster Cluster01 --server server2 --node centos702Node01
 
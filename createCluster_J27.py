@@ -1,7 +1,7 @@
 #------------------------------------------------------------------------------
 #    NAME: createCluster_J27.py
 # PURPOSE: Creates a new WAS cluster based on an existing app server. 
-# VERSION: 1.0
+# VERSION: 1.1
 #   NOTES: This script uses the AdminTask.createCluster() method to create
 #          an APPLICATION_SERVER type cluster using having certain default
 #          values (see # Cluster Default Values below).  The cluster is 
@@ -19,6 +19,18 @@
 #
 #          --node node_name
 #              Specify the node on which the app server exists.
+#
+#          The following options are optional:
+#
+#          --preferLocal true|false
+#              Overrides the default preferLocal routing setting of the
+#              cluster (see # Cluster Default Values below).
+#
+#          --weight number
+#              Sets the routing weight (0-20) of the first cluster member.
+#              If not given, the WAS default weight of 2 is used.  Weights
+#              of an existing cluster can be rebalanced later using the
+#              clusterWeights_J27.py script.
 # 
 #          After changes are made, the configuration is saved and nodes are
 #          synchronised.
@@ -47,7 +59,7 @@ def usage():
     print
     print """This script must be used with the command-line syntax: 
   
-    createCluster_J27.py --cluster cluster_name --server server_name --node node_name
+    createCluster_J27.py --cluster cluster_name --server server_name --node node_name [--preferLocal true|false] [--weight number]
 
     """
 #endDef
@@ -56,11 +68,12 @@ def usage():
 # Function gets required command-line arguments & processes accordingly:
 def get_args():
     # Make args parameters global for use outside of this function:
-    global c1, s1, n1
+    global c1, s1, n1, preferlocal, w1
     # Some parameters require initial defaults:
+    w1 = ''
     try:
         shortForm = ""
-        longForm = ["cluster=", "server=", "node="]
+        longForm = ["cluster=", "server=", "node=", "preferLocal=", "weight="]
         argCount = len( sys.argv[0:])
         if ( argCount < 6 ):
             print "ERROR - Minimum no. of required command-line options have not been specified."
@@ -83,6 +96,20 @@ def get_args():
             s1 = val
         elif flag == '--node':
             n1 = val
+        elif flag == '--preferLocal':
+            if val not in ('true', 'false'):
+                print "ERROR - --preferLocal must be either true or false."
+                usage()
+                os._exit(2)
+            #endIf
+            preferlocal = val
+        elif flag == '--weight':
+            if not val.isdigit() or int( val ) > 20:
+                print "ERROR - --weight must be a whole number between 0 and 20."
+                usage()
+                os._exit(2)
+            #endIf
+            w1 = val
         else:
             usage()
             os._exit(2)
@@ -92,11 +119,17 @@ def get_args():
 
 
 # Function to create cluster (clstr) based on a server (svr) residing on node (nde).
-# Uses certain default values (see above) for creating the cluster.
-def cluster_create( clstr, srvr, nde ):
+# Uses certain default values (see above) for creating the cluster.  The
+# converted server is given a routing weight (wgt) if one is specified.
+def cluster_create( clstr, srvr, nde, wgt = '' ):
     # First construct that specifies the desired cluster config & server to convert:
+    memberConfig = '[-serverNode ' + nde + ' -serverName ' + srvr
+    if wgt:
+        memberConfig = memberConfig + ' -memberWeight ' + wgt
+    #endIf
+    memberConfig = memberConfig + ']'
     config = '[-clusterConfig [-clusterName ' + clstr + ' -preferLocal ' + preferlocal + ' -clusterType ' + clustertype + ']' + \
-    ' -convertServer ' + '[-serverNode ' + n1 + ' -serverName ' + s1 + ']]'
+    ' -convertServer ' + memberConfig + ']'
     try:
         print "CREATING NEW CLUSTER ", clstr, "..."
         newcluster = AdminTask.createCluster( config ) 
@@ -145,7 +178,7 @@ def main():
     get_args()
 
     # Create cluster:
-    cluster_create( c1, s1, n1 )
+    cluster_create( c1, s1, n1, w1 )
 
     # Save configuration:
     saveConfig()
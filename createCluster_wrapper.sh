@@ -1,7 +1,8 @@
 #!/bin/bash
 
-# Run wsadmin Jython script:
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
 
-/apps/IBM/WebSphere/AppServer/profiles/Dmgr01/bin/wsadmin.sh -lang jython -profileName Dmgr01 -username wasadmin -password 12345678 -f /scripts/was9/createCluster.py --cluster Cluster01 --server server1 --node centosNode01
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/createCluster.py --cluster Cluster01 --server server1 --node centosNode01
 
 
@@ -0,0 +1,377 @@
+#------------------------------------------------------------------------------
+#    NAME: dataSources_J27.py
+# PURPOSE: Creates or updates JDBC data sources and sizes their connection
+#          pools and statement caches from a declarative definitions file.
+# VERSION: 1.0
+#   NOTES: This script reads data source definitions from a file (--file)
+#          and, for each definition, creates the JDBC provider and data
+#          source at the given cluster or server scope if they do not exist
+#          yet.  It then compares the connection pool and statement cache
+#          settings of the data source with the definition and applies only
+#          the settings that differ, reporting each one as CHANGED (with its
+#          old and new value) or UNCHANGED.
+#
+#          This script must be run with the following option:
+#
+#          --file definitions_file
+#              Full path to the data source definitions file (see below).
+#
+#          The following options are optional:
+#
+#          --dataSource name
+#              Only process the definition of the named data source.
+#
+#          --check
+#              Only report the differences, do not change anything.
+#
+#          The definitions file has one section per data source, named
+#          after the data source, e.g.:
+#
+#          [OrdersDS]
+#          scope = Cluster=Cluster01
+#          jndiName = jdbc/OrdersDS
+#          provider = DB2 Universal JDBC Driver Provider
+#          databaseType = DB2
+#          providerType = DB2 Universal JDBC Driver Provider
+#          implementationType = Connection pool data source
+#          dataStoreHelperClassName = com.ibm.websphere.rsadapter.DB2UniversalDataStoreHelper
+#          authAlias = OrdersDBAlias
+#          property.databaseName = java.lang.String ORDERS
+#          property.serverName = java.lang.String db01.example.com
+#          property.portNumber = java.lang.Integer 50000
+#          property.driverType = java.lang.Integer 4
+#          minConnections = 10
+#          maxConnections = 50
+#          connectionTimeout = 180
+#          reapTime = 180
+#          unusedTimeout = 1800
+#          agedTimeout = 0
+#          purgePolicy = EntirePool
+#          statementCacheSize = 100
+#
+#          'scope' is either Cluster=cluster_name or Node=node_name,Server=
+#          server_name.  The provider, database type, helper class, alias
+#          and property.* entries are only used when the JDBC provider or
+#          data source has to be created.  Any of the pool settings
+#          (minConnections ... purgePolicy) and statementCacheSize may be
+#          omitted, in which case the current value is left as it is.
+#
+#          After changes are made, the configuration is saved once and nodes
+#          are synchronised.  The data sources' JVMs must be restarted for
+#          pool and cache changes to take effect.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import ConfigParser
+
+# Global constants used in this script:
+cellName = AdminControl.getCell()
+
+# Connection pool attributes that may be set from a definition:
+poolAttrs = [ 'minConnections', 'maxConnections', 'connectionTimeout', 'reapTime',
+              'unusedTimeout', 'agedTimeout', 'purgePolicy' ]
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    dataSources_J27.py --file definitions_file [--dataSource name] [--check]
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global dfile, dsname, checkonly
+    # Some parameters require initial defaults:
+    dsname = ''
+    checkonly = 'no'
+    try:
+        shortForm = ""
+        longForm = ["file=", "dataSource=", "check"]
+        argCount = len( sys.argv[0:])
+        if ( argCount < 2 ):
+            print "ERROR - Minimum no. of required command-line options have not been specified."
+            usage()
+            os._exit(2)
+        #endIf
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--file':
+            dfile = val
+        elif flag == '--dataSource':
+            dsname = val
+        elif flag == '--check':
+            checkonly = 'yes'
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+#endDef
+
+
+# Function to check file exists.
+def pathCheck( p1 ) :
+    if not os.path.isfile( p1 ) :
+        print "FILE NOT FOUND: "+p1
+        print "EXITING..."
+        os._exit(1)
+    #endif
+#endDef
+
+
+# Function to read the definitions file (f1).  Returns a list of
+# [name, settings] pairs in file order.
+def readDefinitions( f1 ):
+    parser = ConfigParser.RawConfigParser()
+    # Keep the case of setting names, e.g. minConnections:
+    parser.optionxform = str
+    parser.read( f1 )
+    definitions = []
+    for section in parser.sections():
+        settings = {}
+        for key, val in parser.items( section ):
+            settings[ key ] = val
+        #endFor
+        definitions.append( [ section, settings ] )
+    #endFor
+    return definitions
+#endDef
+
+
+# Function converts a scope (Cluster=c or Node=n,Server=s) to a containment
+# path, exiting if the scope does not exist.
+def scopePath( scope ):
+    parts = {}
+    for part in scope.split( ',' ):
+        key, val = part.split( '=' )
+        parts[ key.strip() ] = val.strip()
+    #endFor
+    if parts.has_key( 'Cluster' ):
+        path = '/ServerCluster:' + parts[ 'Cluster' ] + '/'
+    elif parts.has_key( 'Node' ) and parts.has_key( 'Server' ):
+        path = '/Node:' + parts[ 'Node' ] + '/Server:' + parts[ 'Server' ] + '/'
+    else:
+        print "INVALID SCOPE " + scope + ", EXITING."
+        os._exit(1)
+    #endIf
+    if not AdminConfig.getid( path ):
+        print "SCOPE " + scope + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    return path
+#endDef
+
+
+# Function returns the config ID of JDBC provider (prov) at the scope of
+# (ds), creating it from the definition (settings) if required.
+def getProvider( ds, settings, path ):
+    provID = AdminConfig.getid( path + 'JDBCProvider:' + settings[ 'provider' ] + '/' )
+    if provID:
+        return provID
+    #endIf
+    if checkonly == 'yes':
+        print "  JDBC PROVIDER " + settings[ 'provider' ] + " WOULD BE CREATED."
+        return ''
+    #endIf
+    print "CREATING JDBC PROVIDER " + settings[ 'provider' ] + " AT SCOPE " + settings[ 'scope' ] + "...",
+    try:
+        provID = AdminTask.createJDBCProvider( [ '-scope', settings[ 'scope' ],
+                                                 '-databaseType', settings[ 'databaseType' ],
+                                                 '-providerType', settings[ 'providerType' ],
+                                                 '-implementationType', settings[ 'implementationType' ],
+                                                 '-name', settings[ 'provider' ] ] )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return provID
+#endDef
+
+
+# Function returns [dsID, created] for data source (ds) at the scope (path),
+# creating it from the definition (settings) if required.
+def getDataSource( ds, settings, path ):
+    scopeID = AdminConfig.getid( path )
+    for dsID in AdminConfig.list( 'DataSource', scopeID ).splitlines():
+        if AdminConfig.showAttribute( dsID, 'name' ) == ds:
+            return [ dsID, 0 ]
+        #endIf
+    #endFor
+    provID = getProvider( ds, settings, path )
+    if checkonly == 'yes':
+        print "  DATA SOURCE " + ds + " WOULD BE CREATED."
+        return [ '', 1 ]
+    #endIf
+    options = [ '-name', ds, '-jndiName', settings[ 'jndiName' ],
+                '-dataStoreHelperClassName', settings[ 'dataStoreHelperClassName' ],
+                '-containerManagedPersistence', 'false' ]
+    if settings.has_key( 'authAlias' ):
+        options = options + [ '-componentManagedAuthenticationAlias', settings[ 'authAlias' ] ]
+    #endIf
+    props = []
+    for key in settings.keys():
+        if key.startswith( 'property.' ):
+            ptype, pvalue = settings[ key ].split( None, 1 )
+            props.append( '[' + key[9:] + ' ' + ptype + ' ' + pvalue + ']' )
+        #endIf
+    #endFor
+    if props:
+        options = options + [ '-configureResourceProperties', '[' + ' '.join( props ) + ']' ]
+    #endIf
+    print "CREATING DATA SOURCE " + ds + " (" + settings[ 'jndiName' ] + ")...",
+    try:
+        dsID = AdminTask.createDatasource( provID, options )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return [ dsID, 1 ]
+#endDef
+
+
+# Function compares the attributes (attrs) of config object (objID) with
+# the definition (settings) and applies the differences.  Returns the
+# number of attributes changed (or that would be changed with --check).
+def applyDelta( objID, attrs, settings ):
+    delta = []
+    for attr in attrs:
+        if not settings.has_key( attr ):
+            continue
+        #endIf
+        oldvalue = AdminConfig.showAttribute( objID, attr )
+        newvalue = settings[ attr ]
+        if oldvalue == newvalue:
+            print "  %-20s UNCHANGED %s" % ( attr, oldvalue )
+        else:
+            print "  %-20s CHANGED   %s -> %s" % ( attr, oldvalue, newvalue )
+            delta.append( [ attr, newvalue ] )
+        #endIf
+    #endFor
+    if delta and checkonly != 'yes':
+        try:
+            AdminConfig.modify( objID, delta )
+        except:
+            # Report exception type and exception message if exception raised:
+            print
+            print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+            os._exit(1)
+        #endTry
+    #endIf
+    return len( delta )
+#endDef
+
+
+# Function to create or update data source (ds) from its definition
+# (settings).  Returns the number of changes made.
+def processDataSource( ds, settings ):
+    print "DATA SOURCE " + ds + " AT SCOPE " + settings[ 'scope' ] + ":"
+    path = scopePath( settings[ 'scope' ] )
+    dsID, changes = getDataSource( ds, settings, path )
+    if not dsID:
+        return changes
+    #endIf
+    changes = changes + applyDelta( dsID, [ 'statementCacheSize' ], settings )
+    poolID = AdminConfig.showAttribute( dsID, 'connectionPool' )
+    changes = changes + applyDelta( poolID, poolAttrs, settings )
+    return changes
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Sync active nodes:
+def syncActiveNodes():
+    dmgrMB = AdminControl.queryNames("type=DeploymentManager,*")
+    print "SYNCING ACTIVE NODES ...",
+    syncResult = AdminControl.invoke(dmgrMB, 'syncActiveNodes', 'true')
+    if syncResult:
+        print "DONE."
+    else:
+        print "NO NODES SYNC'D."
+    #endIf
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+    pathCheck( dfile )
+
+    # Process each data source definition:
+    changes = 0
+    for ds, settings in readDefinitions( dfile ):
+        if dsname and ds != dsname:
+            continue
+        #endIf
+        changes = changes + processDataSource( ds, settings )
+    #endFor
+
+    # Save and sync once, only if something changed:
+    if checkonly == 'yes':
+        print str( changes ) + " CHANGE(S) WOULD BE MADE, NO CHANGES MADE (--check)."
+    elif changes:
+        saveConfig()
+        syncActiveNodes()
+    else:
+        print "ALL DATA SOURCES ALREADY MATCH " + dfile + ", NO CHANGES MADE."
+    #endIf
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
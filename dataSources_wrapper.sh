@@ -0,0 +1,6 @@
+#!/bin/bash
+
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
+
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/dataSources_J27.py --file /scripts/was9/dataSources.props
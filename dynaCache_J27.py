@@ -0,0 +1,441 @@
+#------------------------------------------------------------------------------
+#    NAME: dynaCache_J27.py
+# PURPOSE: Enables the dynamic cache service and servlet caching on a WAS
+#          app server or on every member of a cluster, and creates object
+#          cache instances and cache replication from a declarative list.
+# VERSION: 1.0
+#   NOTES: This script enables the dynamic cache service and servlet caching
+#          (web container enableServletCaching) on an app server (--server)
+#          residing on a node (--node), or on every member of a cluster
+#          (--cluster).  It can also apply the following settings by using
+#          the following options:
+#
+#          --cacheSize entries
+#              The number of entries held in memory by the servlet (base)
+#              cache instance.
+#
+#          --diskOffload location|off
+#              Enables disk offload of the base cache instance to the
+#              directory 'location', or disables disk offload ('off').
+#
+#          --objectCaches file
+#              Full path to a file listing object cache instances to create
+#              at the server or cluster scope, one section per instance,
+#              named after the instance, e.g.:
+#
+#              [ordersCache]
+#              jndiName = services/cache/orders
+#              cacheSize = 5000
+#              enableDiskOffload = false
+#              memoryCacheSizeInMB = 64
+#
+#              Every entry other than jndiName is an attribute of the
+#              ObjectCacheInstance config object.
+#
+#          --replicationDomain domain
+#              Replicates the base cache instance (and any object cache
+#              instances from --objectCaches) between the members of the
+#              cluster through the data replication domain 'domain', which
+#              is created if it does not exist.  Only valid with --cluster.
+#
+#          --replicationType PUSH|PULL|PUSH_PULL|NONE
+#              The cache replication sharing policy, default PUSH.
+#
+#          The current value of every setting is checked first, and only
+#          settings that differ are changed.  Every setting is reported as
+#          CHANGED (with its old and new value) or UNCHANGED, so the script
+#          can be run repeatedly.  The configuration is saved and nodes are
+#          synchronised only if something was changed.  The app server(s)
+#          must then be restarted for the changes to take effect.
+#
+#          Cache policies (cachespec.xml) are deployed with the applications
+#          and are not managed by this script.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import ConfigParser
+
+# Global constants used in this script:
+cellName = AdminControl.getCell()
+
+# Valid cache replication sharing policies:
+replicationTypes = [ 'PUSH', 'PULL', 'PUSH_PULL', 'NONE' ]
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    dynaCache_J27.py --server server --node node | --cluster cluster
+                     [--cacheSize entries] [--diskOffload location|off]
+                     [--objectCaches file] [--replicationDomain domain]
+                     [--replicationType PUSH|PULL|PUSH_PULL|NONE]
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global s1, n1, c1, csize, offload, ocfile, rdomain, rtype
+    # Some parameters require initial defaults:
+    s1 = ''
+    n1 = ''
+    c1 = ''
+    csize = ''
+    offload = ''
+    ocfile = ''
+    rdomain = ''
+    rtype = 'PUSH'
+    try:
+        shortForm = ""
+        longForm = ["server=", "node=", "cluster=", "cacheSize=", "diskOffload=", "objectCaches=", "replicationDomain=", "replicationType="]
+        argCount = len( sys.argv[0:])
+        if ( argCount < 2 ):
+            print "ERROR - Minimum no. of required command-line options have not been specified."
+            usage()
+            os._exit(2)
+        #endIf
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--server':
+            s1 = val
+        elif flag == '--node':
+            n1 = val
+        elif flag == '--cluster':
+            c1 = val
+        elif flag == '--cacheSize':
+            csize = val
+        elif flag == '--diskOffload':
+            offload = val
+        elif flag == '--objectCaches':
+            ocfile = val
+        elif flag == '--replicationDomain':
+            rdomain = val
+        elif flag == '--replicationType':
+            if val not in replicationTypes:
+                print "ERROR - Unknown replication type " + val + ", choose from: " + ', '.join( replicationTypes )
+                usage()
+                os._exit(2)
+            #endIf
+            rtype = val
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+    if not c1 and not ( s1 and n1 ):
+        print "ERROR - Either --server and --node, or --cluster must be specified."
+        usage()
+        os._exit(2)
+    #endIf
+    if rdomain and not c1:
+        print "ERROR - The --replicationDomain option is only valid with --cluster."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function to check file exists.
+def pathCheck( p1 ) :
+    if not os.path.isfile( p1 ) :
+        print "FILE NOT FOUND: "+p1
+        print "EXITING..."
+        os._exit(1)
+    #endif
+#endDef
+
+
+# Function to read the object cache instances file (f1).  Returns a list
+# of [name, settings] pairs in file order.
+def readObjectCaches( f1 ):
+    parser = ConfigParser.RawConfigParser()
+    # Keep the case of attribute names, e.g. cacheSize:
+    parser.optionxform = str
+    parser.read( f1 )
+    caches = []
+    for section in parser.sections():
+        settings = {}
+        for key, val in parser.items( section ):
+            settings[ key ] = val
+        #endFor
+        caches.append( [ section, settings ] )
+    #endFor
+    return caches
+#endDef
+
+
+# Function returns the [server, node] pairs to configure: either the single
+# app server given on the command-line or every member of the cluster.
+def get_targets():
+    if not c1:
+        return [ [ s1, n1 ] ]
+    #endIf
+    clusterID = AdminConfig.getid( '/ServerCluster:' + c1 + '/' )
+    if not clusterID:
+        print "CLUSTER " + c1 + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    targets = []
+    for memberID in AdminConfig.list( 'ClusterMember', clusterID ).splitlines():
+        targets.append( [ AdminConfig.showAttribute( memberID, 'memberName' ), AdminConfig.showAttribute( memberID, 'nodeName' ) ] )
+    #endFor
+    return targets
+#endDef
+
+
+# Function compares the attributes of config object (objID) with the
+# wanted values (wanted, a list of [attribute, value] pairs) and applies the
+# differences.  Returns the number of attributes changed.
+def applyDelta( objID, wanted ):
+    delta = []
+    for attr, newvalue in wanted:
+        oldvalue = AdminConfig.showAttribute( objID, attr )
+        if oldvalue == newvalue:
+            print "  %-24s UNCHANGED %s" % ( attr, oldvalue )
+        else:
+            print "  %-24s CHANGED   %s -> %s" % ( attr, oldvalue, newvalue )
+            delta.append( [ attr, newvalue ] )
+        #endIf
+    #endFor
+    if delta:
+        try:
+            AdminConfig.modify( objID, delta )
+        except:
+            # Report exception type and exception message if exception raised:
+            print
+            print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+            os._exit(1)
+        #endTry
+    #endIf
+    return len( delta )
+#endDef
+
+
+# Function returns the config ID of data replication domain (dom), creating
+# it if required.  Returns [domainID, changes].
+def replicationDomain( dom ):
+    domID = AdminConfig.getid( '/DataReplicationDomain:' + dom + '/' )
+    if domID:
+        print "DATA REPLICATION DOMAIN " + dom + " ALREADY EXISTS."
+        return [ domID, 0 ]
+    #endIf
+    print "CREATING DATA REPLICATION DOMAIN " + dom + "...",
+    try:
+        cellID = AdminConfig.getid( '/Cell:' + cellName + '/' )
+        domID = AdminConfig.create( 'DataReplicationDomain', cellID, [ [ 'name', dom ] ] )
+        # Replicate to every member of the domain:
+        AdminConfig.create( 'DataReplication', domID, [ [ 'numberOfReplicas', '-1' ] ], 'defaultDataReplicationSettings' )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return [ domID, 1 ]
+#endDef
+
+
+# Function points the cache replication of config object (objID) at data
+# replication domain (dom).  Returns the number of changes made.
+def cacheReplication( objID, dom ):
+    changes = applyDelta( objID, [ [ 'enableCacheReplication', 'true' ], [ 'replicationType', rtype ] ] )
+    drsID = AdminConfig.showAttribute( objID, 'cacheReplication' )
+    if drsID:
+        changes = changes + applyDelta( drsID, [ [ 'messageBrokerDomainName', dom ] ] )
+    else:
+        print "  %-24s CHANGED   %s -> %s" % ( 'messageBrokerDomainName', '', dom )
+        AdminConfig.create( 'DRSSettings', objID, [ [ 'messageBrokerDomainName', dom ] ], 'cacheReplication' )
+        changes = changes + 1
+    #endIf
+    return changes
+#endDef
+
+
+# Function enables the dynamic cache service and servlet caching for app
+# server (svr) on node (nde), and applies the base cache instance settings.
+# Returns the number of changes made.
+def configure_server( svr, nde ):
+    serverID = AdminConfig.getid( '/Node:' + nde + '/Server:' + svr + '/' )
+    if not serverID:
+        print "APP SERVER " + svr + " ON NODE " + nde + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    print "DYNAMIC CACHE SERVICE FOR " + svr + " ON NODE " + nde + ":"
+    cacheID = AdminConfig.list( 'DynamicCache', serverID ).splitlines()[0]
+    wanted = [ [ 'enable', 'true' ] ]
+    if csize:
+        wanted.append( [ 'cacheSize', csize ] )
+    #endIf
+    if offload == 'off':
+        wanted.append( [ 'enableDiskOffload', 'false' ] )
+    elif offload:
+        wanted = wanted + [ [ 'enableDiskOffload', 'true' ], [ 'diskOffloadLocation', offload ] ]
+    #endIf
+    changes = applyDelta( cacheID, wanted )
+    if rdomain:
+        changes = changes + cacheReplication( cacheID, rdomain )
+    #endIf
+    print "SERVLET CACHING FOR " + svr + " ON NODE " + nde + ":"
+    webcontainerID = AdminConfig.list( 'WebContainer', serverID ).splitlines()[0]
+    changes = changes + applyDelta( webcontainerID, [ [ 'enableServletCaching', 'true' ] ] )
+    return changes
+#endDef
+
+
+# Function returns the config ID of the cache provider at the server or
+# cluster scope, creating it if required.
+def cacheProvider():
+    if c1:
+        scopepath = '/ServerCluster:' + c1 + '/'
+    else:
+        scopepath = '/Node:' + n1 + '/Server:' + s1 + '/'
+    #endIf
+    providerID = AdminConfig.getid( scopepath + 'CacheProvider:CacheProvider/' )
+    if not providerID:
+        print "CREATING CACHE PROVIDER AT SCOPE " + scopepath + "...",
+        providerID = AdminConfig.create( 'CacheProvider', AdminConfig.getid( scopepath ), [ [ 'name', 'CacheProvider' ] ] )
+        print "DONE."
+    #endIf
+    return providerID
+#endDef
+
+
+# Function creates or updates the object cache instances listed in file
+# (f1).  Returns the number of changes made.
+def object_caches( f1 ):
+    providerID = cacheProvider()
+    existing = {}
+    for instanceID in AdminConfig.list( 'ObjectCacheInstance', providerID ).splitlines():
+        existing[ AdminConfig.showAttribute( instanceID, 'name' ) ] = instanceID
+    #endFor
+    changes = 0
+    for name, settings in readObjectCaches( f1 ):
+        print "OBJECT CACHE INSTANCE " + name + ":"
+        if existing.has_key( name ):
+            instanceID = existing[ name ]
+        else:
+            print "  CREATING " + name + " (" + settings[ 'jndiName' ] + ")...",
+            try:
+                instanceID = AdminConfig.create( 'ObjectCacheInstance', providerID, [ [ 'name', name ], [ 'jndiName', settings[ 'jndiName' ] ] ] )
+            except:
+                # Report exception type and exception message if exception raised:
+                print
+                print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+                os._exit(1)
+            else:
+                print "DONE."
+            #endTry
+            changes = changes + 1
+        #endIf
+        wanted = []
+        for attr in settings.keys():
+            wanted.append( [ attr, settings[ attr ] ] )
+        #endFor
+        changes = changes + applyDelta( instanceID, wanted )
+        if rdomain:
+            changes = changes + cacheReplication( instanceID, rdomain )
+        #endIf
+    #endFor
+    return changes
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Sync active nodes:
+def syncActiveNodes():
+    dmgrMB = AdminControl.queryNames("type=DeploymentManager,*")
+    print "SYNCING ACTIVE NODES ...",
+    syncResult = AdminControl.invoke(dmgrMB, 'syncActiveNodes', 'true')
+    if syncResult:
+        print "DONE."
+    else:
+        print "NO NODES SYNC'D."
+    #endIf
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+    if ocfile:
+        pathCheck( ocfile )
+    #endIf
+    targets = get_targets()
+
+    # The replication domain is shared by all cluster members:
+    changes = 0
+    if rdomain:
+        domID, changes = replicationDomain( rdomain )
+    #endIf
+
+    # Dynamic cache service and servlet caching of each app server:
+    for svr, nde in targets:
+        changes = changes + configure_server( svr, nde )
+    #endFor
+
+    # Object cache instances at the server or cluster scope:
+    if ocfile:
+        changes = changes + object_caches( ocfile )
+    #endIf
+
+    # Save and sync only if something changed:
+    if changes:
+        saveConfig()
+        syncActiveNodes()
+        print str( changes ) + " CHANGE(S) MADE, RESTART THE APP SERVER(S) FOR THEM TO TAKE EFFECT."
+    else:
+        print "DYNAMIC CACHE SETTINGS ALREADY APPLIED, NO CHANGES MADE."
+    #endIf
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
@@ -0,0 +1,6 @@
+#!/bin/bash
+
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
+
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/dynaCache_J27.py --cluster Cluster01 --cacheSize 5000 --diskOffload off --objectCaches /scripts/was9/Cluster01.objectcaches.props --replicationDomain Cluster01 --replicationType PUSH
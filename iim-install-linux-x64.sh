@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         iim-install-linux-x64.sh
-# VERSION:      1.00
+# VERSION:      1.01
 # DESCRIPTION:  Script to silently install IBM Installation Manager (IIM)
 #               on Linux x64 platforms. 
 #
@@ -18,6 +18,9 @@
 #               Ideally, the user that IIM is installed as should be the same
 #               user you intended to run WebSphere Application Server (WAS) as.
 #
+#               The installed package listing used to check the installation
+#               is saved under IMCL_CACHE_DIR, where wasnd9-install-rhel7.sh
+#               can reuse it rather than run imcl again.
 #
 ################################################################################
 #
@@ -31,6 +34,8 @@ IIM_MEDIA=${IIM_MEDIA:=/kits/IBM/iim/agent.installer.linux.gtk.x86_64_1.8.8000.2
 IIM_PACKAGE=${IIM_PACKAGE:=com.ibm.cic.agent_1.8.8000.20171130_1105}
 IIM_MODE=${IIM_MODE:=nonAdmin}
 IIM_INSTALL_LOG=${IIM_INSTALL_LOG:=/var/tmp/InstallationManager_install_log.xml}
+IIM_PATH=${IIM_PARENT}/InstallationManager
+IMCL_CACHE_DIR=${IMCL_CACHE_DIR:=/var/tmp/imcl-cache}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -213,9 +218,25 @@ install_group() {
 }
 
 
+# Save the output of imcl listInstalledPackages as a listing named IMCL_LISTING
+# in IMCL_CACHE_DIR (in the same way as wasnd9-install-rhel7.sh):
+imcl_listing() {
+  listKey=`echo "${IIM_USER} ${IIM_PATH} listInstalledPackages" | cksum | cut -d' ' -f1`
+  IMCL_LISTING=${IMCL_CACHE_DIR}/listInstalledPackages.${listKey}
+  mkdir -p ${IMCL_CACHE_DIR} || return 1
+  ${SUDO} su - ${IIM_USER} -c "${IIM_PATH}/eclipse/tools/imcl listInstalledPackages" > ${IMCL_LISTING}.$$ 2>/dev/null
+  if [ "$?" -eq 0 ] ; then
+    mv -f ${IMCL_LISTING}.$$ ${IMCL_LISTING}
+  else
+    rm -f ${IMCL_LISTING}.$$
+    return 1
+  fi
+}
+
+
 # Post-install, basic check.
 install_check() {
-  ${SUDO} su - ${IIM_USER} -c "${IIM_PARENT}/InstallationManager/eclipse/tools/imcl listInstalledPackages" | grep "${IIM_PACKAGE}" > /dev/null 2>&1
+  imcl_listing && grep -F "${IIM_PACKAGE}" ${IMCL_LISTING} > /dev/null 2>&1
   if [ "$?" -eq 0 ] ; then
     printf "=> Installation appears to have been successful.\n\n" | tee -a ${LOG}
     return 0
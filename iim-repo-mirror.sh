@@ -0,0 +1,238 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         iim-repo-mirror.sh
+# VERSION:      1.00
+# DESCRIPTION:  Builds and serves a local mirror of the IBM Installation
+#               Manager (IIM) repository, holding only the packages named in
+#               the WAS installation response file (WAS_RESPONSE), so that
+#               the WAS binaries are downloaded from the remote repository
+#               WAS_REPO once, rather than once per host.
+#
+#               The script runs one of the following actions, specified by
+#               MIRROR_ACTION:
+#
+#               create  Copies the packages not yet in the mirror from WAS_REPO
+#                       to MIRROR_DIR with the IBM Packaging Utility command
+#                       line (PUCL), for the platform MIRROR_PLATFORM only.
+#                       It then checks that every package is available from
+#                       the mirror, and records a SHA256 checksum of every
+#                       file of the mirror in MIRROR_DIR/SHA256SUMS.  The
+#                       packages are verified here, once; hosts installing
+#                       from the mirror then need no further checks.
+#               serve   Serves MIRROR_DIR to the other hosts on the network
+#                       over HTTP on port MIRROR_PORT, as the systemd service
+#                       iim-mirror, and opens the port in firewalld.
+#               verify  Checks a copy of the mirror (e.g. one copied to a
+#                       shared filesystem) against its SHA256SUMS file.
+#
+#               wasnd9-install-rhel7.sh installs from the first mirror listed
+#               in IIM_MIRRORS that it can reach, e.g.:
+#
+#               IIM_MIRRORS="http://mirrorhost:8088 /shared/iim-mirror" ./wasnd9-install-rhel7.sh
+#
+#               Requires the IBM Packaging Utility to be installed (for the
+#               create action), and uses the same secure storage and master
+#               password files as wasnd9-install-rhel7.sh to authenticate to
+#               WAS_REPO.
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment,
+#               for example:
+#
+#               MIRROR_ACTION=serve MIRROR_PORT=8090 ./iim-repo-mirror.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENV VARS
+MIRROR_ACTION=${MIRROR_ACTION:=create}
+MIRROR_DIR=${MIRROR_DIR:=/apps/IBM/iim-mirror}
+MIRROR_PORT=${MIRROR_PORT:=8088}
+MIRROR_PLATFORM=${MIRROR_PLATFORM:=os=linux,arch=x86_64}
+MIRROR_USER=${MIRROR_USER:=wbsadm}
+PUCL_PATH=${PUCL_PATH:=/apps/IBM/PackagingUtility}
+IIM_MASTER=${IIM_MASTER:=/scripts/was9/master_password.txt}
+IIM_SECURE_STORAGE=${IIM_SECURE_STORAGE:=/scripts/was9/credential.store}
+WAS_REPO=${WAS_REPO:=https://repo.iim.test/repo/composite/}
+WAS_RESPONSE=${WAS_RESPONSE:=/scripts/was9/was9nd-sdk8_install_response_v1.01.xml}
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENV VARS
+#
+#
+# BEGIN FUNCTION DEFINITIONS
+
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Check if sudo required:
+sudo_check() {
+  uid=`id | /bin/sed -e 's;^.*uid=;;' -e 's;\([0-9]\)(.*;\1;'`
+  if [ "$uid" = "0" ] ; then
+    SUDO=" "
+  else
+    SUDO=`which sudo 2>/dev/null`
+    if [ -z "${SUDO}" ] ; then
+      abort "SUDO NOT FOUND."
+    fi
+  fi
+}
+
+
+# Read the package IDs (id_version) of the offerings in the response file:
+response_packages() {
+  if [ ! -f "${WAS_RESPONSE}" ] ; then
+    abort "Response file ${WAS_RESPONSE} not found."
+  fi
+  PACKAGES=`sed -n "s/.*<offering .* id='\([^']*\)' version='\([^']*\)'.*/\1_\2/p" ${WAS_RESPONSE}`
+  if [ -z "${PACKAGES}" ] ; then
+    abort "No offerings found in response file ${WAS_RESPONSE}."
+  fi
+}
+
+
+# Print the packages available from the mirror:
+mirror_packages() {
+  ${SUDO} su - ${MIRROR_USER} -c \
+  "${PUCL_PATH}/PUCL listAvailablePackages -repositories ${MIRROR_DIR}" 2>/dev/null
+}
+
+
+# Copy the packages not yet in the mirror from WAS_REPO:
+mirror_copy() {
+  if [ ! -x "${PUCL_PATH}/PUCL" ] ; then
+    abort "Packaging Utility command ${PUCL_PATH}/PUCL not found."
+  fi
+  if [ ! -d "${MIRROR_DIR}" ] ; then
+    ${SUDO} mkdir -p -m 0755 "${MIRROR_DIR}"
+    ${SUDO} chown ${MIRROR_USER} "${MIRROR_DIR}"
+  fi
+  available=`mirror_packages`
+  for pkg in ${PACKAGES} ; do
+    if echo "${available}" | grep -F "${pkg}" > /dev/null 2>&1 ; then
+      printf "=> Package ${pkg} already in mirror ${MIRROR_DIR}.\n\n" | tee -a ${LOG}
+      continue
+    fi
+    printf "=> Copying package ${pkg} from ${WAS_REPO}...\n\n" | tee -a ${LOG}
+    ${SUDO} su - ${MIRROR_USER} -c \
+    "${PUCL_PATH}/PUCL copy ${pkg} -repositories ${WAS_REPO} -target ${MIRROR_DIR} -platform ${MIRROR_PLATFORM} -acceptLicense -secureStorageFile ${IIM_SECURE_STORAGE} -masterPasswordFile ${IIM_MASTER} -preferences com.ibm.cic.common.core.preferences.ssl.nonsecureMode=true -showProgress"
+    if [ "$?" -ne 0 ] ; then
+      abort "Failed to copy package ${pkg} to mirror ${MIRROR_DIR}."
+    fi
+  done
+}
+
+
+# Check every package is available from the mirror, and record the
+# checksums of its files:
+mirror_verify_create() {
+  available=`mirror_packages`
+  for pkg in ${PACKAGES} ; do
+    if echo "${available}" | grep -F "${pkg}" > /dev/null 2>&1 ; then
+      printf "=> Package ${pkg} available from mirror: PASS.\n" | tee -a ${LOG}
+    else
+      abort "Package ${pkg} not available from mirror ${MIRROR_DIR}: FAIL."
+    fi
+  done
+  printf "\n=> Recording checksums of the files in ${MIRROR_DIR}...\n\n" | tee -a ${LOG}
+  ( cd ${MIRROR_DIR} &&
+    find . -type f ! -name SHA256SUMS -print0 | sort -z | xargs -0 sha256sum > /tmp/${SCRIPTNAME}.$$ ) ||
+  abort "Failed to checksum the files in ${MIRROR_DIR}."
+  ${SUDO} cp /tmp/${SCRIPTNAME}.$$ ${MIRROR_DIR}/SHA256SUMS
+  ${SUDO} chmod 644 ${MIRROR_DIR}/SHA256SUMS
+  rm -f /tmp/${SCRIPTNAME}.$$
+  printf "=> Mirror ${MIRROR_DIR} created: `wc -l < ${MIRROR_DIR}/SHA256SUMS` files, `du -sh ${MIRROR_DIR} | cut -f1`.\n\n" | tee -a ${LOG}
+}
+
+
+# Check a copy of the mirror against its checksums:
+mirror_verify() {
+  if [ ! -f "${MIRROR_DIR}/SHA256SUMS" ] ; then
+    abort "Checksum file ${MIRROR_DIR}/SHA256SUMS not found."
+  fi
+  ( cd ${MIRROR_DIR} && sha256sum -c --quiet SHA256SUMS )
+  if [ "$?" -eq 0 ] ; then
+    printf "=> Mirror ${MIRROR_DIR} matches its checksums: PASS.\n\n" | tee -a ${LOG}
+  else
+    abort "Mirror ${MIRROR_DIR} does not match its checksums: FAIL."
+  fi
+}
+
+
+# Serve the mirror over HTTP as a systemd service, and open its port:
+mirror_serve() {
+  if [ ! -f "${MIRROR_DIR}/repository.config" ] ; then
+    abort "No repository found in ${MIRROR_DIR}, run with MIRROR_ACTION=create first."
+  fi
+  ${SUDO} touch /etc/systemd/system/iim-mirror.service
+  ${SUDO} chmod 664 /etc/systemd/system/iim-mirror.service
+  ${SUDO} cat > /etc/systemd/system/iim-mirror.service << EOF
+[Unit]
+Description=IBM Installation Manager repository mirror ${MIRROR_DIR}.
+After=network.target remote-fs.target
+
+[Service]
+Type=simple
+WorkingDirectory=${MIRROR_DIR}
+ExecStart=/usr/bin/python -m SimpleHTTPServer ${MIRROR_PORT}
+User=${MIRROR_USER}
+Restart=on-failure
+
+[Install]
+WantedBy=default.target
+EOF
+  ${SUDO} systemctl daemon-reload
+  ${SUDO} systemctl enable iim-mirror.service
+  ${SUDO} systemctl restart iim-mirror.service || abort "Failed to start service iim-mirror."
+  if ${SUDO} firewall-cmd --state > /dev/null 2>&1 ; then
+    ${SUDO} firewall-cmd --permanent --add-port=${MIRROR_PORT}/tcp > /dev/null &&
+    ${SUDO} firewall-cmd --reload > /dev/null ||
+    abort "Failed to open port ${MIRROR_PORT}/tcp in firewalld."
+  fi
+  printf "=> Mirror ${MIRROR_DIR} served as http://`hostname`:${MIRROR_PORT}/\n\n" | tee -a ${LOG}
+}
+
+
+# END FUNCTION DEFINITIONS
+
+################################################################################
+# MAIN
+################################################################################
+
+printf "\nSTARTING SCRIPT ON:\n" | tee ${LOG}
+date | tee -a ${LOG}
+printf "\n"
+sudo_check
+
+case "${MIRROR_ACTION}" in
+  create)
+    response_packages
+    mirror_copy
+    mirror_verify_create
+    ;;
+  serve)
+    mirror_serve
+    ;;
+  verify)
+    mirror_verify
+    ;;
+  *)
+    abort "MIRROR_ACTION not correctly set, use create, serve or verify."
+esac
+
+printf "\nENDING SCRIPT ON:\n" | tee -a ${LOG}
+date | tee -a ${LOG}
+
+exit 0
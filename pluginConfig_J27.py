@@ -0,0 +1,326 @@
+#------------------------------------------------------------------------------
+#    NAME: pluginConfig_J27.py
+# PURPOSE: Regenerates the web server plug-in configuration (plugin-cfg.xml)
+#          once after a batch of topology changes, and propagates it only if
+#          its routing has changed.
+# VERSION: 1.0
+#   NOTES: createClusterMember_J27.py, AppServerPortsProps_J27.py and
+#          clusterWeights_J27.py change the cluster members, their
+#          WC_defaulthost ports and their weights, but leave plugin-cfg.xml
+#          stale, so the web servers keep missing the new capacity.  Instead
+#          of regenerating the plug-in configuration themselves, once per
+#          change, they record each change in a pending marker file (see
+#          # Global constants below).  This script, run once after a batch
+#          of changes (e.g. at the end of a build, or regularly), then:
+#
+#          - does nothing if no change is pending (unless --force is given);
+#          - regenerates plugin-cfg.xml for every web server defined in the
+#            cell (or only --webserver), or, if the cell has none, the
+#            cell-wide plugin-cfg.xml;
+#          - compares the routing of the new file (clusters, members,
+#            weights, transports, URIs and virtual hosts) with that of the
+#            file last deployed, and reports the routes added and removed;
+#          - only if the routing has changed, propagates the new file to
+#            the web server, or copies it to --target (a local file, e.g.
+#            for a web server not defined in the cell, or for testing), and
+#            keeps a copy as the deployed file for the next comparison;
+#          - clears the pending marker once every target is done.
+#
+#          The plug-in reloads plugin-cfg.xml at its RefreshInterval
+#          (60 seconds by default), so new members receive traffic as soon
+#          as they are started.
+#
+#          The following options are optional:
+#
+#          --webserver name
+#              Regenerate for the named web server only.
+#
+#          --target path
+#              Deploy by copying plugin-cfg.xml to this local file, rather
+#              than propagating it to the web server.
+#
+#          --force
+#              Regenerate even if no change is pending.
+#
+#          The pending marker is a local file, so run this script on the
+#          same host as the scripts making the changes (the Deployment
+#          Manager host).
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import re
+import shutil
+from java.lang import Boolean
+from java.lang import System
+
+# Global constants used in this script:
+# Marker file of pending topology changes, written by the scripts making them.
+pluginMarker = '/var/tmp/was-plugin.pending'
+# Directory of the copies of the plugin-cfg.xml files last deployed.
+deployedDir = '/var/tmp/was-plugin'
+# Elements of plugin-cfg.xml that determine the routing, and those that
+# name the context of the elements inside them:
+routingTags = [ 'ServerCluster', 'Server', 'Transport', 'PrimaryServers', 'BackupServers', 'UriGroup', 'Uri', 'VirtualHostGroup', 'VirtualHost', 'Route' ]
+contextTags = [ 'ServerCluster', 'Server', 'UriGroup', 'VirtualHostGroup', 'PrimaryServers', 'BackupServers' ]
+
+cellName = AdminControl.getCell()
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    pluginConfig_J27.py [--webserver name] [--target path] [--force]
+
+    """
+#endDef
+
+
+# Function gets command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global websvr, target, force
+    # Some parameters require initial defaults:
+    websvr = ''
+    target = ''
+    force = 0
+    try:
+        shortForm = ""
+        longForm = ["webserver=", "target=", "force"]
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--webserver':
+            websvr = val
+        elif flag == '--target':
+            target = val
+        elif flag == '--force':
+            force = 1
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+#endDef
+
+
+# Function to take the pending changes, returning their descriptions.  The
+# marker is moved aside while the batch is processed, so changes marked in
+# the meantime are kept for the next run:
+def takePending():
+    batch = pluginMarker + '.' + str( os.getpid() )
+    if not os.path.isfile( pluginMarker ):
+        return batch, []
+    #endIf
+    os.rename( pluginMarker, batch )
+    f = open( batch )
+    changes = [ line.strip() for line in f.readlines() if line.strip() ]
+    f.close()
+    return batch, changes
+#endDef
+
+
+# Function to return a batch of pending changes to the marker, on failure:
+def restorePending( batch ):
+    if os.path.isfile( batch ):
+        f = open( batch )
+        lines = f.read()
+        f.close()
+        f = open( pluginMarker, 'a' )
+        f.write( lines )
+        f.close()
+        os.remove( batch )
+    #endIf
+#endDef
+
+
+# Function to list the web servers to regenerate for, as (node, server)
+# pairs, or [ ( None, None ) ] for the cell-wide plugin-cfg.xml:
+def webServers():
+    servers = []
+    for serverID in AdminTask.listServers( '[-serverType WEB_SERVER]' ).splitlines():
+        name = AdminConfig.showAttribute( serverID, 'name' )
+        node = re.search( r'/nodes/([^/|]+)/', serverID ).group(1)
+        if not websvr or name == websvr:
+            servers.append( ( node, name ) )
+        #endIf
+    #endFor
+    if websvr and not servers:
+        print "WEB SERVER " + websvr + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    if not servers:
+        print "NO WEB SERVERS DEFINED, REGENERATING THE CELL-WIDE PLUG-IN CONFIGURATION."
+        servers = [ ( None, None ) ]
+    #endIf
+    return servers
+#endDef
+
+
+# Function to regenerate plugin-cfg.xml for a web server (or the cell, with
+# node and server None), returning the path of the generated file:
+def generate( generator, configRoot, node, server ):
+    AdminControl.invoke_jmx( generator, 'generate', [ configRoot, cellName, node, server, Boolean( 0 ) ], [ 'java.lang.String', 'java.lang.String', 'java.lang.String', 'java.lang.String', 'java.lang.Boolean' ] )
+    if server:
+        return configRoot + '/cells/' + cellName + '/nodes/' + node + '/servers/' + server + '/plugin-cfg.xml'
+    #endIf
+    return configRoot + '/cells/plugin-cfg.xml'
+#endDef
+
+
+# Function to extract the routing of a plugin-cfg.xml file as a sorted list
+# of lines, each an element with its context and attributes:
+def routing( path ):
+    if not os.path.isfile( path ):
+        return []
+    #endIf
+    f = open( path )
+    xml = f.read()
+    f.close()
+    routes = []
+    context = []
+    for match in re.finditer( r'<(/?)(\w+)([^>]*?)(/?)>', xml ):
+        closing, tag, attrs, empty = match.groups()
+        if tag not in routingTags:
+            continue
+        #endIf
+        if closing:
+            if tag in contextTags and context:
+                context.pop()
+            #endIf
+            continue
+        #endIf
+        pairs = re.findall( r'(\w+)="([^"]*)"', attrs )
+        pairs.sort()
+        line = '/'.join( context + [ tag ] ) + ' ' + ' '.join( [ k + '=' + v for k, v in pairs ] )
+        routes.append( line.strip() )
+        if tag in contextTags and not empty:
+            name = dict( pairs ).get( 'Name', '' )
+            context.append( tag + '[' + name + ']' )
+        #endIf
+    #endFor
+    routes.sort()
+    return routes
+#endDef
+
+
+# Function to deploy a generated file, if its routing differs from the file
+# last deployed.  Returns 1 if deployed:
+def deploy( generator, configRoot, node, server, generated ):
+    if target:
+        deployed = target
+    elif server:
+        deployed = deployedDir + '/' + cellName + '.' + node + '.' + server + '.plugin-cfg.xml'
+    else:
+        deployed = deployedDir + '/' + cellName + '.plugin-cfg.xml'
+    #endIf
+    old = routing( deployed )
+    new = routing( generated )
+    if old == new:
+        print "UNCHANGED: routing of " + generated + " is the same as " + deployed + ", NOT DEPLOYED."
+        return 0
+    #endIf
+    for line in old:
+        if line not in new:
+            print "    - " + line
+        #endIf
+    #endFor
+    for line in new:
+        if line not in old:
+            print "    + " + line
+        #endIf
+    #endFor
+    if server and not target:
+        AdminControl.invoke( generator.toString(), 'propagate', '"' + configRoot + '" ' + cellName + ' ' + node + ' ' + server )
+        print "CHANGED:   plugin-cfg.xml propagated to web server " + server + " on node " + node + "."
+    #endIf
+    if not os.path.isdir( os.path.dirname( deployed ) ):
+        os.makedirs( os.path.dirname( deployed ) )
+    #endIf
+    shutil.copyfile( generated, deployed + '.tmp' )
+    if os.path.isfile( deployed ):
+        os.remove( deployed )
+    #endIf
+    os.rename( deployed + '.tmp', deployed )
+    if target or not server:
+        print "CHANGED:   plugin-cfg.xml copied to " + deployed + "."
+    #endIf
+    return 1
+#endDef
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+
+    batch, changes = takePending()
+    if not changes and not force:
+        print "NO PENDING TOPOLOGY CHANGES, NOTHING TO DO."
+        os._exit(0)
+    #endIf
+    print "REGENERATING PLUG-IN CONFIGURATION FOR", len( changes ), "PENDING CHANGE(S):"
+    for change in changes:
+        print "    " + change
+    #endFor
+
+    try:
+        configRoot = System.getProperty( 'user.install.root' ) + '/config'
+        generator = AdminControl.makeObjectName( AdminControl.completeObjectName( 'type=PluginCfgGenerator,*' ) )
+        servers = webServers()
+        if target and len( servers ) > 1:
+            restorePending( batch )
+            print "ERROR - --target needs --webserver, as several web servers are defined."
+            os._exit(2)
+        #endIf
+        deployedCount = 0
+        for node, server in servers:
+            generated = generate( generator, configRoot, node, server )
+            print "GENERATED: " + generated
+            deployedCount = deployedCount + deploy( generator, configRoot, node, server, generated )
+        #endFor
+    except:
+        # Keep the batch pending, to be retried by the next run:
+        restorePending( batch )
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    #endTry
+
+    if os.path.isfile( batch ):
+        os.remove( batch )
+    #endIf
+    print "PLUG-IN CONFIGURATION DEPLOYED TO", deployedCount, "TARGET(S)."
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
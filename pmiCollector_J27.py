@@ -0,0 +1,503 @@
+#------------------------------------------------------------------------------
+#    NAME: pmiCollector_J27.py
+# PURPOSE: Samples Performance Monitoring Infrastructure (PMI) statistics of
+#          WAS app servers on an interval and stores them in fixed size
+#          time series files on local disk.
+# VERSION: 1.1
+#   NOTES: This script samples the PMI statistics of an app server (--server)
+#          residing on a node (--node), of every member of a cluster
+#          (--cluster), or, if neither is given, of every running app server
+#          in the cell.  PMI must first be enabled on the app servers, e.g.
+#          with serverConfig_J27.py --pmiLevel basic.
+#
+#          On each sample, the statistics of the app server's thread pools,
+#          JDBC connection pools, session managers and JVM are fetched with
+#          a single Perf MBean getStatsArray() call per app server.  They
+#          are stored in one time series file per app server in --dir
+#          (node_server.pmi), with the statistic names in a matching .names
+#          file.  Each time series file is a ring buffer of --slots fixed
+#          size binary records, so its size never changes and the oldest
+#          samples are overwritten once it is full.
+#
+#          The following options are optional:
+#
+#          --interval seconds
+#              Time between samples, default 60.
+#
+#          --samples number
+#              Number of samples to take, default 0 (until interrupted).
+#
+#          --dir directory
+#              Directory of the time series files, default /var/tmp/pmi.
+#
+#          --slots number
+#              Number of samples kept per app server, default 10080 (one
+#              week of samples at 60 second intervals).  Only used when a
+#              time series file is created.
+#
+#          --maxStats number
+#              Number of statistic columns per app server, default 128.
+#              Only used when a time series file is created.
+#
+#          --export csv|json
+#              Exports the stored time series of the selected app server(s)
+#              to standard output (or --out file) instead of sampling.
+#
+#          --out file
+#              File to export to.
+#
+#          --print
+#              Prints each sample as it is taken.
+#
+#          A statistic appearing after a time series file was created is
+#          given the next free column; once all the file's columns are used,
+#          further new statistics are not stored, and a warning naming them
+#          is printed the first time each is seen.  To keep them, move the
+#          file aside and let it be created again with a larger --maxStats.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+import time
+import struct
+import java
+from javax.management import ObjectName
+from jarray import array
+
+# Global constants used in this script:
+cellName = AdminControl.getCell()
+
+# MBean types whose PMI statistics are sampled:
+pmiTypes = [ 'ThreadPool', 'DataSource', 'SessionManager', 'JVM' ]
+
+# Time series file layout: a header of magic, slots, columns, next slot and
+# number of samples stored, then 'slots' records of a timestamp and one
+# value per column.  Missing values are stored as NaN:
+fileMagic = 'PMI1'
+headerFormat = '>4sIIII'
+headerSize = struct.calcsize( headerFormat )
+missing = float( 'nan' )
+
+# Statistics already reported as not stored, per time series file:
+dropped = {}
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    pmiCollector_J27.py [--server server --node node | --cluster cluster]
+                        [--interval seconds] [--samples number] [--dir directory]
+                        [--slots number] [--maxStats number] [--print]
+                        [--export csv|json [--out file]]
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global s1, n1, c1, interval, samples, pmidir, slots, maxStats, export, outfile, printing
+    # Some parameters require initial defaults:
+    s1 = ''
+    n1 = ''
+    c1 = ''
+    interval = 60
+    samples = 0
+    pmidir = '/var/tmp/pmi'
+    slots = 10080
+    maxStats = 128
+    export = ''
+    outfile = ''
+    printing = 'no'
+    try:
+        shortForm = ""
+        longForm = ["server=", "node=", "cluster=", "interval=", "samples=", "dir=", "slots=", "maxStats=", "export=", "out=", "print"]
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    try:
+        for flag, val in opts:
+            if flag == '--server':
+                s1 = val
+            elif flag == '--node':
+                n1 = val
+            elif flag == '--cluster':
+                c1 = val
+            elif flag == '--interval':
+                interval = int( val )
+            elif flag == '--samples':
+                samples = int( val )
+            elif flag == '--dir':
+                pmidir = val
+            elif flag == '--slots':
+                slots = int( val )
+            elif flag == '--maxStats':
+                maxStats = int( val )
+            elif flag == '--export':
+                if val not in [ 'csv', 'json' ]:
+                    print "ERROR - --export must be csv or json."
+                    usage()
+                    os._exit(2)
+                #endIf
+                export = val
+            elif flag == '--out':
+                outfile = val
+            elif flag == '--print':
+                printing = 'yes'
+            else:
+                usage()
+                os._exit(2)
+            #endIf
+        #endFor
+    except ValueError:
+        print "ERROR - --interval, --samples, --slots and --maxStats must be numbers."
+        usage()
+        os._exit(2)
+    #endTry
+    if slots < 1 or maxStats < 1:
+        print "ERROR - --slots and --maxStats must be at least 1."
+        usage()
+        os._exit(2)
+    #endIf
+    if ( s1 and not n1 ) or ( n1 and not s1 ):
+        print "ERROR - --server and --node must be specified together."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function returns the [server, node] pairs to sample: the app server given
+# on the command-line, every member of the cluster, or every running app
+# server in the cell.
+def get_targets():
+    if s1:
+        return [ [ s1, n1 ] ]
+    #endIf
+    targets = []
+    if c1:
+        clusterID = AdminConfig.getid( '/ServerCluster:' + c1 + '/' )
+        if not clusterID:
+            print "CLUSTER " + c1 + " NOT FOUND, EXITING."
+            os._exit(1)
+        #endIf
+        for memberID in AdminConfig.list( 'ClusterMember', clusterID ).splitlines():
+            targets.append( [ AdminConfig.showAttribute( memberID, 'memberName' ), AdminConfig.showAttribute( memberID, 'nodeName' ) ] )
+        #endFor
+        return targets
+    #endIf
+    for serverMB in AdminControl.queryNames( 'cell=' + cellName + ',type=Server,processType=ManagedProcess,*' ).splitlines():
+        targets.append( [ AdminControl.getAttribute( serverMB, 'name' ), AdminControl.getAttribute( serverMB, 'nodeName' ) ] )
+    #endFor
+    return targets
+#endDef
+
+
+# Function returns the Perf MBean and the ObjectNames of the MBeans to
+# sample for app server (svr) on node (nde), or ['', []] if not running.
+def pmiSources( svr, nde ):
+    query = 'cell=' + cellName + ',node=' + nde + ',process=' + svr + ','
+    perfMB = AdminControl.completeObjectName( query + 'type=Perf,*' )
+    if not perfMB:
+        return [ '', [] ]
+    #endIf
+    names = []
+    for pmiType in pmiTypes:
+        for mbean in AdminControl.queryNames( query + 'type=' + pmiType + ',*' ).splitlines():
+            names.append( ObjectName( mbean ) )
+        #endFor
+    #endFor
+    return [ ObjectName( perfMB ), names ]
+#endDef
+
+
+# Function returns the value of PMI statistic (stat): the current value of
+# range statistics, the mean of time and average statistics, otherwise the
+# count.
+def statValue( stat ):
+    for method in [ 'getCurrent', 'getMean', 'getCount' ]:
+        if hasattr( stat, method ):
+            return float( getattr( stat, method )() )
+        #endIf
+    #endFor
+    return missing
+#endDef
+
+
+# Function adds the statistics of PMI stats object (stats) and its sub stats
+# to (values), named by their path, e.g. WebContainer.ActiveCount.
+def flattenStats( stats, prefix, values ):
+    path = prefix + stats.getName()
+    for stat in stats.getStatistics():
+        values[ path + '.' + stat.getName() ] = statValue( stat )
+    #endFor
+    for sub in stats.getSubStats():
+        flattenStats( sub, path + '.', values )
+    #endFor
+#endDef
+
+
+# Function samples the PMI statistics of the MBeans (names) through Perf
+# MBean (perf).  Returns a dictionary of statistic path to value.
+def sample( perf, names ):
+    values = {}
+    statsArray = AdminControl.invoke_jmx( perf, 'getStatsArray',
+                                          [ array( names, ObjectName ), java.lang.Boolean( 'true' ) ],
+                                          [ '[Ljavax.management.ObjectName;', 'java.lang.Boolean' ] )
+    for stats in statsArray:
+        if stats:
+            flattenStats( stats, '', values )
+        #endIf
+    #endFor
+    return values
+#endDef
+
+
+# Function returns the time series file and names file paths of app server
+# (svr) on node (nde).
+def seriesPaths( svr, nde ):
+    base = os.path.join( pmidir, nde + '_' + svr )
+    return [ base + '.pmi', base + '.names' ]
+#endDef
+
+
+# Function opens the time series of app server (svr) on node (nde),
+# creating it with (nslots) slots of maxStats columns if required.
+# Returns [file, header, names], where header is [slots, columns, next
+# slot, samples stored].
+def openSeries( svr, nde, nslots ):
+    datapath, namespath = seriesPaths( svr, nde )
+    if not os.path.isfile( datapath ):
+        if not os.path.isdir( pmidir ):
+            os.makedirs( pmidir )
+        #endIf
+        f = open( datapath, 'wb' )
+        f.write( struct.pack( headerFormat, fileMagic, nslots, maxStats, 0, 0 ) )
+        # Pre-allocate every slot, so the file never grows:
+        f.write( '\0' * ( nslots * 8 * ( maxStats + 1 ) ) )
+        f.close()
+        open( namespath, 'w' ).close()
+    #endIf
+    f = open( datapath, 'r+b' )
+    magic, nslots, ncols, nextslot, stored = struct.unpack( headerFormat, f.read( headerSize ) )
+    if magic != fileMagic:
+        print "NOT A PMI TIME SERIES FILE: " + datapath + ", EXITING."
+        os._exit(1)
+    #endIf
+    names = open( namespath ).read().splitlines()
+    return [ f, [ nslots, ncols, nextslot, stored ], names ]
+#endDef
+
+
+# Function appends a sample (values) taken at (stamp) to the time series of
+# app server (svr) on node (nde), warning of new statistics that no longer
+# fit in its columns.
+def storeSample( svr, nde, stamp, values ):
+    f, header, names = openSeries( svr, nde, slots )
+    nslots, ncols, nextslot, stored = header
+    # Give new statistics the next free columns:
+    added = []
+    full = []
+    for name in values.keys():
+        if name not in names:
+            if len( names ) < ncols:
+                names.append( name )
+                added.append( name )
+            else:
+                full.append( name )
+            #endIf
+        #endIf
+    #endFor
+    if added:
+        nf = open( seriesPaths( svr, nde )[1], 'a' )
+        nf.write( '\n'.join( added ) + '\n' )
+        nf.close()
+    #endIf
+    key = nde + '/' + svr
+    unseen = [ name for name in full if name not in dropped.get( key, [] ) ]
+    if unseen:
+        unseen.sort()
+        dropped[ key ] = dropped.get( key, [] ) + unseen
+        print "WARNING - ALL " + str( ncols ) + " COLUMNS OF " + seriesPaths( svr, nde )[0] + " ARE USED, NOT STORING: " + ', '.join( unseen )
+    #endIf
+    record = [ stamp ]
+    for name in names:
+        record.append( values.get( name, missing ) )
+    #endFor
+    record = record + [ missing ] * ( ncols - len( names ) )
+    f.seek( headerSize + nextslot * 8 * ( ncols + 1 ) )
+    f.write( struct.pack( '>' + str( ncols + 1 ) + 'd', *record ) )
+    f.seek( 0 )
+    f.write( struct.pack( headerFormat, fileMagic, nslots, ncols, ( nextslot + 1 ) % nslots, min( stored + 1, nslots ) ) )
+    f.close()
+#endDef
+
+
+# Function returns the stored samples of app server (svr) on node (nde),
+# oldest first, as [names, rows] where each row is [timestamp, values].
+def readSeries( svr, nde ):
+    datapath = seriesPaths( svr, nde )[0]
+    if not os.path.isfile( datapath ):
+        return [ [], [] ]
+    #endIf
+    f, header, names = openSeries( svr, nde, slots )
+    nslots, ncols, nextslot, stored = header
+    recordSize = 8 * ( ncols + 1 )
+    rows = []
+    first = ( nextslot - stored ) % nslots
+    for i in range( stored ):
+        f.seek( headerSize + ( ( first + i ) % nslots ) * recordSize )
+        record = struct.unpack( '>' + str( ncols + 1 ) + 'd', f.read( recordSize ) )
+        rows.append( [ record[0], list( record[ 1 : len( names ) + 1 ] ) ] )
+    #endFor
+    f.close()
+    return [ names, rows ]
+#endDef
+
+
+# Function formats a value for export, leaving missing values empty.
+def exportValue( v ):
+    if v != v:
+        return ''
+    #endIf
+    return '%g' % v
+#endDef
+
+
+# Function exports the stored samples of the app servers (targets) as CSV
+# or JSON (fmt) to (out).
+def exportSeries( targets, fmt, out ):
+    if fmt == 'json':
+        out.write( '[\n' )
+    else:
+        out.write( 'time,node,server,statistic,value\n' )
+    #endIf
+    firstrow = 1
+    for svr, nde in targets:
+        names, rows = readSeries( svr, nde )
+        for stamp, values in rows:
+            when = time.strftime( '%Y-%m-%d %H:%M:%S', time.localtime( stamp ) )
+            if fmt == 'csv':
+                for i in range( len( names ) ):
+                    if values[i] == values[i]:
+                        out.write( '%s,%s,%s,%s,%s\n' % ( when, nde, svr, names[i], exportValue( values[i] ) ) )
+                    #endIf
+                #endFor
+            else:
+                stats = []
+                for i in range( len( names ) ):
+                    if values[i] == values[i]:
+                        stats.append( '"%s": %s' % ( names[i].replace( '"', '\\"' ), exportValue( values[i] ) ) )
+                    #endIf
+                #endFor
+                if not firstrow:
+                    out.write( ',\n' )
+                #endIf
+                out.write( '{"time": "%s", "node": "%s", "server": "%s", "stats": {%s}}' % ( when, nde, svr, ', '.join( stats ) ) )
+                firstrow = 0
+            #endIf
+        #endFor
+    #endFor
+    if fmt == 'json':
+        out.write( '\n]\n' )
+    #endIf
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+    targets = get_targets()
+    if not targets:
+        print "NO APP SERVERS FOUND, EXITING."
+        os._exit(1)
+    #endIf
+
+    # Export stored samples rather than sampling, if requested:
+    if export:
+        if outfile:
+            out = open( outfile, 'w' )
+        else:
+            out = sys.stdout
+        #endIf
+        exportSeries( targets, export, out )
+        if outfile:
+            out.close()
+            print "EXPORTED TO " + outfile + "."
+        #endIf
+        os._exit(0)
+    #endIf
+
+    # Look up the MBeans of each app server once, and again only if the app
+    # server was not running or a sample fails (e.g. after a restart):
+    sources = {}
+    taken = 0
+    while samples == 0 or taken < samples:
+        began = time.time()
+        for svr, nde in targets:
+            key = nde + '/' + svr
+            if not sources.has_key( key ) or not sources[ key ][0]:
+                sources[ key ] = pmiSources( svr, nde )
+            #endIf
+            perf, names = sources[ key ]
+            if not perf:
+                print "APP SERVER " + svr + " ON NODE " + nde + " NOT RUNNING, NOT SAMPLED."
+                continue
+            #endIf
+            try:
+                values = sample( perf, names )
+            except:
+                print "SAMPLING " + svr + " ON NODE " + nde + " FAILED: ", sys.exc_info()[1]
+                del sources[ key ]
+                continue
+            #endTry
+            storeSample( svr, nde, began, values )
+            if printing == 'yes':
+                print time.strftime( '%Y-%m-%d %H:%M:%S', time.localtime( began ) ) + " " + nde + "/" + svr + ":"
+                keys = values.keys()
+                keys.sort()
+                for name in keys:
+                    print "  %-60s %s" % ( name, exportValue( values[ name ] ) )
+                #endFor
+            #endIf
+        #endFor
+        taken = taken + 1
+        if samples == 0 or taken < samples:
+            time.sleep( max( 0, interval - ( time.time() - began ) ) )
+        #endIf
+    #endWhile
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
@@ -0,0 +1,227 @@
+#------------------------------------------------------------------------------
+#    NAME: profileIdentity_J27.py
+# PURPOSE: Gives a profile restored from a golden profile archive the
+#          identity of its new host: its host name and its personal
+#          certificate.
+# VERSION: 1.0
+#   NOTES: This script is run by wasnd9-profile-custom-rhel7.sh when it clones
+#          a custom profile from an archive (PROFILE_ARCHIVE), in local mode,
+#          before the node is federated, e.g.:
+#
+#          wsadmin.sh -conntype NONE -lang jython -profileName AppSrv01 \
+#              -f profileIdentity_J27.py --node washost01Node01 \
+#              --host washost01 --certOU washost01Node01 --certO testcompany \
+#              --certC GB --certDays 365
+#
+#          (The node and cell names have already been changed by then.)
+#          It uses the following options:
+#
+#          --node node_name
+#              The node of the profile.
+#
+#          --host host_name
+#              The host name the node (and its end points) must have.
+#
+#          --certOU, --certO, --certC, --certDays
+#              The organisational unit, organisation, country and validity
+#              (in days) of the node's personal certificate, whose common
+#              name is the host name.  If the node has no personal
+#              certificate for the host, a new one, signed by the node's
+#              root certificate, replaces the personal certificate in the
+#              node default key store, and every reference to it.
+#
+#          The current host name and personal certificate are checked
+#          first, and each is reported as CHANGED or UNCHANGED.  The
+#          configuration is saved only if something was changed.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import re
+import getopt
+
+# Global constants used in this script (AdminControl is not available in
+# local mode):
+cellName = AdminConfig.showAttribute( AdminConfig.list( 'Cell' ).splitlines()[0], 'name' )
+
+# Key stores of the node:
+keyStore = 'NodeDefaultKeyStore'
+rootAlias = 'root'
+
+
+# Function specifies correct script usage:
+def usage():
+    print """Script must be used with command-line options as follows:
+
+    profileIdentity_J27.py --node node_name --host host_name
+        [--certOU unit --certO organisation --certC country --certDays days]
+
+    Run in local mode (wsadmin.sh -conntype NONE)."""
+#endDef
+
+
+# Function gets required command-line arguments:
+def get_args():
+    # Make these args global for use outside of this function:
+    global nde, hst, ou, org, country, days
+    nde = ''
+    hst = ''
+    ou = ''
+    org = ''
+    country = ''
+    days = '365'
+    try:
+        shortForm = ''
+        longForm = [ "node=", "host=", "certOU=", "certO=", "certC=", "certDays=" ]
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str(err)
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--node':
+            nde = val
+        elif flag == '--host':
+            hst = val
+        elif flag == '--certOU':
+            ou = val
+        elif flag == '--certO':
+            org = val
+        elif flag == '--certC':
+            country = val
+        elif flag == '--certDays':
+            if not val.isdigit():
+                print "--certDays must be a number of days!"
+                os._exit(2)
+            #endIf
+            days = val
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+    if not nde or not hst:
+        print "--node and --host must be specified!"
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Change the host name of the node and of its end points, if different:
+def hostName():
+    nodeID = AdminConfig.getid( '/Cell:' + cellName + '/Node:' + nde + '/' )
+    if not nodeID:
+        print "NODE " + nde + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    old = AdminConfig.showAttribute( nodeID, 'hostName' )
+    if old == hst:
+        print "UNCHANGED: host name " + hst
+        return 0
+    #endIf
+    AdminTask.changeHostName( '[-nodeName ' + nde + ' -hostName ' + hst + ']' )
+    print "CHANGED:   host name " + old + " -> " + hst
+    return 1
+#endDef
+
+
+# Replace the personal certificate of the node, unless already issued to
+# the host name:
+def personalCertificate():
+    scope = '(cell):' + cellName + ':(node):' + nde
+    storeArgs = '-keyStoreName ' + keyStore + ' -keyStoreScope ' + scope
+    certs = AdminTask.listPersonalCertificates( '[' + storeArgs + ']' ).splitlines()
+    old = ''
+    for cert in certs:
+        alias = re.search( r'\[alias ([^\]]+)\]', cert )
+        issuedTo = re.search( r'\[issuedTo \[([^\]]*)\]', cert )
+        if not alias or not issuedTo:
+            continue
+        #endIf
+        if alias.group(1) == rootAlias:
+            continue
+        #endIf
+        if re.search( r'(?i)\bCN=' + re.escape( hst ) + r'\b', issuedTo.group(1) ):
+            print "UNCHANGED: personal certificate " + alias.group(1) + " issued to " + issuedTo.group(1)
+            return 0
+        #endIf
+        old = alias.group(1)
+    #endFor
+    if not old:
+        print "NO PERSONAL CERTIFICATE FOUND IN " + keyStore + ", EXITING."
+        os._exit(1)
+    #endIf
+    newAlias = 'default_' + hst
+    createArgs = storeArgs + ' -certificateAlias ' + newAlias + ' -rootCertificateAlias ' + rootAlias
+    createArgs = createArgs + ' -certificateSize 2048 -certificateCommonName ' + hst
+    if ou:
+        createArgs = createArgs + ' -certificateOrganizationalUnit ' + ou
+    #endIf
+    if org:
+        createArgs = createArgs + ' -certificateOrganization ' + org
+    #endIf
+    if country:
+        createArgs = createArgs + ' -certificateCountry ' + country
+    #endIf
+    createArgs = createArgs + ' -certificateValidDays ' + days
+    AdminTask.createChainedCertificate( '[' + createArgs + ']' )
+    AdminTask.replaceCertificate( '[' + storeArgs + ' -certificateAlias ' + old + ' -replacementCertificateAlias ' + newAlias + ' -deleteOldCert true -deleteOldSigners true]' )
+    print "CHANGED:   personal certificate " + old + " -> " + newAlias + " issued to CN=" + hst
+    return 1
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+
+    changes = hostName() + personalCertificate()
+
+    # Save only if something changed:
+    if changes:
+        saveConfig()
+    else:
+        print "PROFILE IDENTITY ALREADY APPLIED, NO CHANGES MADE."
+    #endIf
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
@@ -2,15 +2,32 @@
 #    NAME: serverConfig_J27.py
 # PURPOSE: Applies preferred settings to a WAS app server. The settings  
 #          may incorporate "best practices" and/or corporate standards.
-# VERSION: 1.0
+# VERSION: 1.6
 #   NOTES: This script can apply the following settings to an
-#          app server ( --server) residing on a node (--node), by using the
-#          following options:
+#          app server ( --server) residing on a node (--node), or to every
+#          member of a cluster (--cluster), by using the following options:
 #
 #          --retainlogs number
 #              Changes the log rotation to daily (at midnight), with a 
 #              retention period specified by 'number'. Applied to the
-#              app server's SystemOut.log and SystemErr.log logs.
+#              app server's SystemOut.log and SystemErr.log logs.  With
+#              --hpel, 'number' is instead the number of days of log and
+#              trace records kept in the HPEL repository.  Once the rotated
+#              logs are compressed by was-log-housekeep.sh, that script
+#              applies the same retention, read from the server's
+#              configuration.
+#
+#          --hpel
+#              Switches the app server from text logging to High Performance
+#              Extensible Logging (HPEL), with buffered writes and the HPEL
+#              text log copy switched off.  The HPEL log and trace
+#              repositories are purged by size (see --hpelMaxSize) and, if
+#              --retainlogs is given, by age.  HPEL logs are read with the
+#              profile's logViewer.sh, or with the was-logquery.py tool.
+#
+#          --hpelMaxSize MB
+#              The maximum size of each of the HPEL log and trace
+#              repositories, default 1024 MB.  Only used with --hpel.
 #
 #          --enableVGC 
 #              Enables verbose garbage collection on the app server.
@@ -18,14 +35,107 @@
 #          --disableMQ
 #              Disables MQ functionality on the app server.
 #
+#          --tuning-profile profile
+#              Applies a named, versioned performance tuning profile to the
+#              app server's WebContainer and ORB thread pools, and to the
+#              TCP, HTTP and web container channels of its default web
+#              container transport chains (WCInboundDefault and
+#              WCInboundDefaultSecure).  'profile' is either the name of one
+#              of the built-in profiles (see # Tuning profiles below), or
+#              the full path to a properties file defining a profile in the
+#              same format, e.g.:
+#
+#              PROFILE=web-prod
+#              VERSION=2
+#              webcontainer.minThreads=50
+#              webcontainer.maxThreads=100
+#
+#              Only the settings listed in the profile are applied.  The
+#              current value of each setting is checked first, and only
+#              settings that differ are changed.  Every setting is reported
+#              as CHANGED (with its old and new value) or UNCHANGED.
+#
+#          --jvmPreset preset
+#              Applies a JVM startup and heap preset (see # JVM presets
+#              below) using AdminTask.setJVMProperties(): initial and
+#              maximum heap size, the gencon GC policy and nursery size, a
+#              shared class cache named after the node and app server
+#              (-Xshareclasses), -Xquickstart (dev presets only) and large
+#              pages (-Xlp).  Other generic JVM arguments are preserved, and
+#              nothing is changed if the app server already matches the
+#              preset.  Large pages must also be reserved on the host
+#              (vm.nr_hugepages), otherwise the JVM falls back to normal
+#              pages.
+#
+#          --pmiLevel none|basic|extended|all
+#              Enables Performance Monitoring Infrastructure (PMI) on the
+#              app server with the given statistic set ('none' disables
+#              PMI).  PMI statistics can then be collected with
+#              pmiCollector_J27.py.
+#
+#          --pmiCustom spec
+#              Enables PMI with a custom statistic set, where 'spec' lists
+#              the statistic IDs to enable per PMI module, e.g.:
+#
+#              threadPoolModule=3,4:connectionPoolModule=*:jvmRuntimeModule=*
+#
+#              Modules not listed keep their current setting.
+#
+#          --baseline
+#              Restarts the app server once before any changes are made, so
+#              that its start-to-STARTED time before the changes is also
+#              recorded (see below).
+#
+#          --restartBatch number
+#              The number of app servers restarted at the same time, default
+#              1.  With --cluster, the members are restarted in batches of
+#              this size (a rolling restart), each batch only once the
+#              previous one is STARTED, so the cluster keeps serving.
+#
+#          --pollInterval seconds
+#              Seconds between checks of the state of restarting app
+#              servers, default 1.  This is also the resolution of the
+#              recorded start times.
+#
+#          --startTimeout seconds
+#              Seconds an app server has to reach the STARTED state after its
+#              restart is requested, default 300.
+#
 #          All, or a subset, of the above options may be selected to 
-#          selectively apply changes to a particular app server.  Only 
-#          the --server and --node options are mandatory; if only these
-#          options are chosen, then no real changes are made to the app
-#          server, except for a restart.
+#          selectively apply changes to a particular app server.  Either
+#          the --server and --node options, or the --cluster option, are 
+#          mandatory; if only these options are chosen, then no real 
+#          changes are made to the app server, except for a restart.
 # 
 #          After changes are made, the configuration is saved, nodes are
-#          synchronised and the application server restarted.
+#          synchronised and the application server(s) restarted, one batch
+#          after the other (see --restartBatch).  The app servers of a
+#          batch are checked together, every --pollInterval seconds.  The time
+#          from each restart to the STARTED state is appended to the file
+#          given by startTimesLog (see # Global constants below) and
+#          reported together with the previously recorded time, so the
+#          effect of a change on startup time can be seen.  Where that time
+#          went is recorded on the app server's own host by the start helper
+#          of its was-server@ systemd unit, which runs was-starttimeline.py
+#          after every restart when STARTTIMELINE is set (see
+#          was-systemd-unit-create.sh); elsewhere, run
+#          was-starttimeline.py --record there.
+#
+#          If an app server is not STARTED within --startTimeout seconds,
+#          diagnostics are captured while it is still slow: javacores are
+#          requested through its JVM MBean a few times (see # Diagnostics
+#          below), and the app server state, heap and thread pool settings
+#          at each point are bundled into a timestamped .tar.gz archive in
+#          diagDir.  The javacores are written by the JVM on its own host
+#          (by default in the profile directory); was-diag-capture.sh can be
+#          run there to collect them with the log tails.  For app servers
+#          run by the was-server@ systemd units, the unit's start helper runs
+#          was-diag-capture.sh itself when the restart is not open for
+#          e-business within its DIAG_AFTER seconds (by default the same as
+#          --startTimeout, see was-systemd-unit-create.sh).  The rolling
+#          restart then stops, leaving the remaining app servers running
+#          (they pick up the changes at their next restart), and the script
+#          exits with a non-zero exit code.
 #
 #          CHANGES FOR JYTHON 2.7:
 #          -----------------------
@@ -45,17 +155,106 @@ import os
 import getopt
 import time
 import re
+import shutil
+import tarfile
 
 # Global constants used in this script:
 cellName = AdminControl.getCell()
 
+# Tuning profiles.  Each setting name maps to an object and attribute of
+# the app server configuration through tuningTargets below:
+tuningProfiles = {
+    'web-prod-v1' : {
+        'webcontainer.minThreads'            : '50',
+        'webcontainer.maxThreads'            : '100',
+        'orb.minThreads'                     : '10',
+        'orb.maxThreads'                     : '50',
+        'tcp.maxOpenConnections'             : '20000',
+        'http.keepAlive'                     : 'true',
+        'http.maximumPersistentRequests'     : '500',
+        'http.persistentTimeout'             : '30',
+        'webcontainer.writeBufferSize'       : '65536',
+    },
+    'web-dev-v1' : {
+        'webcontainer.minThreads'            : '10',
+        'webcontainer.maxThreads'            : '50',
+        'orb.minThreads'                     : '10',
+        'orb.maxThreads'                     : '50',
+        'tcp.maxOpenConnections'             : '5000',
+        'http.keepAlive'                     : 'true',
+        'http.maximumPersistentRequests'     : '100',
+        'http.persistentTimeout'             : '30',
+    },
+}
+
+# Setting name, object selector (see tuning_objects()) and attribute name:
+tuningTargets = [
+    [ 'webcontainer.minThreads',        'ThreadPool:WebContainer',        'minimumSize' ],
+    [ 'webcontainer.maxThreads',        'ThreadPool:WebContainer',        'maximumSize' ],
+    [ 'orb.minThreads',                 'ThreadPool:ORB.thread.pool',     'minimumSize' ],
+    [ 'orb.maxThreads',                 'ThreadPool:ORB.thread.pool',     'maximumSize' ],
+    [ 'tcp.maxOpenConnections',         'Chain:TCPInboundChannel',        'maxOpenConnections' ],
+    [ 'http.keepAlive',                 'Chain:HTTPInboundChannel',       'keepAlive' ],
+    [ 'http.maximumPersistentRequests', 'Chain:HTTPInboundChannel',       'maximumPersistentRequests' ],
+    [ 'http.persistentTimeout',         'Chain:HTTPInboundChannel',       'persistentTimeout' ],
+    [ 'http.readTimeout',               'Chain:HTTPInboundChannel',       'readTimeout' ],
+    [ 'http.writeTimeout',              'Chain:HTTPInboundChannel',       'writeTimeout' ],
+    [ 'webcontainer.writeBufferSize',   'Chain:WebContainerInboundChannel', 'writeBufferSize' ],
+]
+
+# Web container transport chains tuned by channel settings:
+tuningChains = [ 'WCInboundDefault', 'WCInboundDefaultSecure' ]
+
+# JVM presets.  Heap sizes are in MB; an empty nursery leaves the gencon
+# default nursery sizing in place:
+jvmPresets = {
+    'dev' : {
+        'initialHeapSize'   : '256',
+        'maximumHeapSize'   : '1024',
+        'nursery'           : '',
+        'sharedCacheSize'   : '128m',
+        'quickstart'        : 'true',
+        'largePages'        : 'false',
+    },
+    'prod' : {
+        'initialHeapSize'   : '2048',
+        'maximumHeapSize'   : '2048',
+        'nursery'           : '768m',
+        'sharedCacheSize'   : '256m',
+        'quickstart'        : 'false',
+        'largePages'        : 'true',
+    },
+}
+
+# Generic JVM arguments managed by the JVM presets; any existing arguments
+# matching these are replaced by the preset's own:
+presetArgs = re.compile( '^-(Xgcpolicy:|Xmn|Xshareclasses|Xscmx|Xquickstart$|Xlp)' )
+
+# PMI statistic sets that can be chosen with --pmiLevel:
+pmiLevels = [ 'none', 'basic', 'extended', 'all' ]
+
+# File recording the start-to-STARTED time of every restart:
+startTimesLog = '/var/tmp/serverConfig_starttimes.log'
+
+# Diagnostics: where archives are written, and the number of javacores
+# requested and the seconds between them when a restart misses its deadline:
+diagDir = '/var/tmp'
+diagDumps = 3
+diagInterval = 10
+
 
 # Function specifies correct script usage:
 def usage():
     print
     print """This script must be used with the command-line syntax: 
   
-    serverConfig_J27.py --server server --node node [--retainlogs number] [--enableVGC] [--disableMQ]
+    serverConfig_J27.py --server server --node node | --cluster cluster
+                        [--retainlogs number] [--hpel [--hpelMaxSize MB]]
+                        [--enableVGC] [--disableMQ]
+                        [--tuning-profile profile] [--jvmPreset preset]
+                        [--pmiLevel none|basic|extended|all | --pmiCustom spec] [--baseline]
+                        [--restartBatch number] [--pollInterval seconds]
+                        [--startTimeout seconds]
 
     """
 #endDef
@@ -64,16 +263,31 @@ def usage():
 # Function gets required command-line arguments & processes accordingly:
 def get_args():
     # Make args parameters global for use outside of this function:
-    global s1, n1, rlogs, r1, vgc, nomq
+    global s1, n1, c1, rlogs, r1, hpel, hpelsize, vgc, nomq, tprofile, jpreset, pmilevel, pmicustom, baseline
+    global restartbatch, pollint, starttimeout
     # Some parameters require initial defaults:
+    s1 = ''
+    n1 = ''
+    c1 = ''
     rlogs = 'no'
+    r1 = ''
+    hpel = 'no'
+    hpelsize = '1024'
     vgc = 'no'
     nomq = 'no'
+    tprofile = ''
+    jpreset = ''
+    pmilevel = ''
+    pmicustom = ''
+    baseline = 'no'
+    restartbatch = 1
+    pollint = 1
+    starttimeout = 300
     try:
         shortForm = ""
-        longForm = ["server=", "node=", "retainlogs=", "enableVGC", "disableMQ"]
+        longForm = ["server=", "node=", "cluster=", "retainlogs=", "hpel", "hpelMaxSize=", "enableVGC", "disableMQ", "tuning-profile=", "jvmPreset=", "pmiLevel=", "pmiCustom=", "baseline", "restartBatch=", "pollInterval=", "startTimeout="]
         argCount = len( sys.argv[0:])
-        if (argCount < 4) :
+        if (argCount < 2) :
             print "ERROR - Minimum no. of required command-line options have not been specified."
             usage()
             os._exit(2)
@@ -94,18 +308,94 @@ def get_args():
         elif flag == '--node':
             n1 = val
             # TO-DO: Check this against a list of valid nodes.
+        elif flag == '--cluster':
+            c1 = val
         elif flag == '--retainlogs':
             rlogs = 'yes'
             r1 = val
+        elif flag == '--hpel':
+            hpel = 'yes'
+        elif flag == '--hpelMaxSize':
+            hpelsize = val
         elif flag == '--enableVGC':
             vgc = 'yes'
         elif flag == '--disableMQ':
             nomq = 'yes'
+        elif flag == '--tuning-profile':
+            tprofile = val
+        elif flag == '--jvmPreset':
+            if not jvmPresets.has_key( val ):
+                print "ERROR - Unknown JVM preset " + val + ", choose from: " + ', '.join( jvmPresets.keys() )
+                usage()
+                os._exit(2)
+            #endIf
+            jpreset = val
+        elif flag == '--pmiLevel':
+            if val not in pmiLevels:
+                print "ERROR - Unknown PMI level " + val + ", choose from: " + ', '.join( pmiLevels )
+                usage()
+                os._exit(2)
+            #endIf
+            pmilevel = val
+        elif flag == '--pmiCustom':
+            # Each item must be module=ids, checked before any change:
+            for item in val.split( ':' ):
+                if item.count( '=' ) != 1 or not item.split( '=' )[0] or not item.split( '=' )[1]:
+                    print "ERROR - --pmiCustom item '" + item + "' must be module=ids, e.g. jvmRuntimeModule=*."
+                    usage()
+                    os._exit(2)
+                #endIf
+            #endFor
+            pmicustom = val
+        elif flag == '--baseline':
+            baseline = 'yes'
+        elif flag in [ '--restartBatch', '--pollInterval', '--startTimeout' ]:
+            if not val.isdigit() or int( val ) < 1:
+                print "ERROR - " + flag + " must be a whole number, 1 or more."
+                usage()
+                os._exit(2)
+            #endIf
+            if flag == '--restartBatch':
+                restartbatch = int( val )
+            elif flag == '--pollInterval':
+                pollint = int( val )
+            else:
+                starttimeout = int( val )
+            #endIf
         else:
             usage()
             os._exit(2)
         #endIf
     #endFor
+    if not c1 and not ( s1 and n1 ):
+        print "ERROR - Either --server and --node, or --cluster must be specified."
+        usage()
+        os._exit(2)
+    #endIf
+    if pmilevel and pmicustom:
+        print "ERROR - Only one of --pmiLevel and --pmiCustom may be specified."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function returns the [server, node] pairs to configure: either the single
+# app server given on the command-line or every member of the cluster.
+def get_targets():
+    if not c1:
+        return [ [ s1, n1 ] ]
+    #endIf
+    clusterID = AdminConfig.getid( '/ServerCluster:' + c1 + '/' )
+    if not clusterID:
+        print "CLUSTER " + c1 + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    targets = []
+    for memberID in AdminConfig.list( 'ClusterMember', clusterID ).splitlines():
+        targets.append( [ AdminConfig.showAttribute( memberID, 'memberName' ), AdminConfig.showAttribute( memberID, 'nodeName' ) ] )
+    #endFor
+    return targets
 #endDef
 
 
@@ -125,6 +415,51 @@ def log_settings( log, backups ):
 #endDef
 
 
+# Function to switch app server (svr) on node (nde) to HPEL logging, with
+# the log and trace repositories limited to (maxsize) MB each and, if (days)
+# is given, to that number of days.  Only changes settings that differ.
+def hpel_settings( svr, nde, maxsize, days ):
+    serverID = AdminConfig.getid( '/Node:' + nde + '/Server:' + svr + '/' )
+    hpelID = AdminConfig.list( 'HighPerformanceExtensibleLogging', serverID ).splitlines()[0]
+    rasID = AdminConfig.list( 'RASLoggingService', serverID ).splitlines()[0]
+    repository = [ [ 'purgeBySizeEnabled', 'true' ], [ 'purgeMaxSize', maxsize ] ]
+    if days:
+        repository = repository + [ [ 'purgeByTimeEnabled', 'true' ], [ 'purgeMinTime', str( int( days ) * 24 ) ] ]
+    #endIf
+    # Config object and the settings wanted for it:
+    wanted = [ [ hpelID, [ [ 'enable', 'true' ] ] ],
+               [ rasID, [ [ 'enable', 'false' ] ] ],
+               [ AdminConfig.showAttribute( hpelID, 'hpelLog' ), repository + [ [ 'bufferingEnabled', 'true' ] ] ],
+               [ AdminConfig.showAttribute( hpelID, 'hpelTrace' ), repository + [ [ 'bufferingEnabled', 'true' ] ] ],
+               [ AdminConfig.showAttribute( hpelID, 'hpelTextLog' ), [ [ 'enabled', 'false' ] ] ] ]
+    print "HPEL LOGGING FOR " + svr + " ON NODE " + nde + ":"
+    for objID, settings in wanted:
+        # Config type from the config ID, e.g. ...server.xml#HPELLog_1)
+        objtype = objID.split( '#' )[-1].split( '_' )[0]
+        delta = []
+        for attr, newvalue in settings:
+            oldvalue = AdminConfig.showAttribute( objID, attr )
+            if oldvalue == newvalue:
+                print "  %-40s UNCHANGED %s" % ( objtype + '.' + attr, oldvalue )
+            else:
+                print "  %-40s CHANGED   %s -> %s" % ( objtype + '.' + attr, oldvalue, newvalue )
+                delta.append( [ attr, newvalue ] )
+            #endIf
+        #endFor
+        if delta:
+            try:
+                AdminConfig.modify( objID, delta )
+            except:
+                # Report exception type and exception message if exception raised:
+                print
+                print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+                os._exit(1)
+            #endTry
+        #endIf
+    #endFor
+#endDef
+
+
 # Function to enable Verbose Garbage Collection for app server (svr) on node (nde). 
 # Only enables VGC if not already set.
 def enable_vgc( svr, nde ):
@@ -177,6 +512,227 @@ def disable_mq( svr, nde ) :
 #endDef
 
 
+# Function returns the tuning profile (tp) as a [name, settings] pair, where
+# 'tp' is either a built-in profile name or the path to a profile file.
+def load_tuning_profile( tp ):
+    if tuningProfiles.has_key( tp ):
+        return [ tp, tuningProfiles[ tp ] ]
+    #endIf
+    if not os.path.isfile( tp ):
+        print "TUNING PROFILE " + tp + " IS NEITHER A BUILT-IN PROFILE NOR A FILE, EXITING."
+        print "BUILT-IN PROFILES: " + ', '.join( tuningProfiles.keys() )
+        os._exit(1)
+    #endIf
+    settings = {}
+    pname = os.path.basename( tp )
+    pversion = ''
+    regex1 = re.compile( '^\s*([\w.]+)\s*=\s*(\S+)\s*$' )
+    file1 = open( tp, 'r' )
+    for line in file1.readlines():
+        match = regex1.search( line )
+        if not match:
+            continue
+        #endIf
+        if match.group(1) == 'PROFILE':
+            pname = match.group(2)
+        elif match.group(1) == 'VERSION':
+            pversion = match.group(2)
+        else:
+            settings[ match.group(1) ] = match.group(2)
+        #endIf
+    #endFor
+    file1.close()
+    if pversion:
+        pname = pname + '-v' + pversion
+    #endIf
+    return [ pname, settings ]
+#endDef
+
+
+# Function returns the config IDs of the objects of app server (serverID)
+# matching (selector).  'ThreadPool:name' selects a named thread pool, while
+# 'Chain:type' selects the channels of that type in the tuned chains.
+def tuning_objects( serverID, selector ):
+    otype, oname = selector.split( ':' )
+    objects = []
+    if otype == 'ThreadPool':
+        for tpID in AdminConfig.list( 'ThreadPool', serverID ).splitlines():
+            if AdminConfig.showAttribute( tpID, 'name' ) == oname:
+                objects.append( tpID )
+            #endIf
+        #endFor
+    else:
+        for chainID in AdminConfig.list( 'Chain', serverID ).splitlines():
+            if AdminConfig.showAttribute( chainID, 'name' ) not in tuningChains:
+                continue
+            #endIf
+            for channelID in AdminConfig.showAttribute( chainID, 'transportChannels' )[1:-1].split():
+                if channelID.find( '#' + oname + '_' ) >= 0:
+                    objects.append( channelID )
+                #endIf
+            #endFor
+        #endFor
+    #endIf
+    return objects
+#endDef
+
+
+# Function to apply tuning profile (tp) to app server (svr) on node (nde).
+# Current values are checked first and only differing values are changed.
+def tune_server( svr, nde, tp ):
+    pname, settings = load_tuning_profile( tp )
+    serverID = AdminConfig.getid( '/Node:' + nde + '/Server:' + svr + '/' )
+    print "APPLYING TUNING PROFILE " + pname + " TO " + svr + " ON " + nde + ":"
+    known = []
+    changes = 0
+    for setting, selector, attr in tuningTargets:
+        known.append( setting )
+        if not settings.has_key( setting ):
+            continue
+        #endIf
+        newvalue = settings[ setting ]
+        objects = tuning_objects( serverID, selector )
+        if not objects:
+            print "  %-34s NOT FOUND (%s)" % ( setting, selector )
+        #endIf
+        for objID in objects:
+            oldvalue = AdminConfig.showAttribute( objID, attr )
+            label = setting
+            if selector.startswith( 'Chain:' ):
+                label = setting + '[' + AdminConfig.showAttribute( objID, 'name' ) + ']'
+            #endIf
+            if oldvalue == newvalue:
+                print "  %-34s UNCHANGED %s" % ( label, oldvalue )
+                continue
+            #endIf
+            try:
+                AdminConfig.modify( objID, [[attr, newvalue]] )
+            except:
+                # Report exception type and exception message if exception raised:
+                print
+                print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+                os._exit(1)
+            #endTry
+            print "  %-34s CHANGED   %s -> %s" % ( label, oldvalue, newvalue )
+            changes = changes + 1
+        #endFor
+    #endFor
+    for setting in settings.keys():
+        if setting not in known:
+            print "  %-34s UNKNOWN SETTING, IGNORED" % setting
+        #endIf
+    #endFor
+    print "TUNING PROFILE " + pname + ": " + str( changes ) + " SETTING(S) CHANGED."
+#endDef
+
+
+# Function to apply JVM preset (jp) to app server (svr) on node (nde).
+# Only changes the JVM properties if they differ from the preset.
+def jvm_preset( svr, nde, jp ):
+    preset = jvmPresets[ jp ]
+    getstring = '[-serverName ' + svr + ' -nodeName ' + nde + ' -propertyName '
+    oldargs = AdminTask.showJVMProperties( getstring + 'genericJvmArguments]' ).split()
+    # Keep arguments not managed by presets, then add the preset's own:
+    newargs = []
+    for arg in oldargs:
+        if not presetArgs.search( arg ):
+            newargs.append( arg )
+        #endIf
+    #endFor
+    newargs.append( '-Xgcpolicy:gencon' )
+    if preset[ 'nursery' ]:
+        newargs.append( '-Xmn' + preset[ 'nursery' ] )
+    #endIf
+    newargs.append( '-Xshareclasses:name=was_' + nde + '_' + svr + ',nonfatal' )
+    newargs.append( '-Xscmx' + preset[ 'sharedCacheSize' ] )
+    if preset[ 'quickstart' ] == 'true':
+        newargs.append( '-Xquickstart' )
+    #endIf
+    if preset[ 'largePages' ] == 'true':
+        newargs.append( '-Xlp' )
+    #endIf
+    settings = []
+    for prop in [ 'initialHeapSize', 'maximumHeapSize' ]:
+        oldvalue = AdminTask.showJVMProperties( getstring + prop + ']' )
+        if oldvalue != preset[ prop ]:
+            print "  %-20s CHANGED   %s -> %s" % ( prop, oldvalue, preset[ prop ] )
+            settings = settings + [ '-' + prop, preset[ prop ] ]
+        else:
+            print "  %-20s UNCHANGED %s" % ( prop, oldvalue )
+        #endIf
+    #endFor
+    if newargs != oldargs:
+        print "  %-20s CHANGED   %s -> %s" % ( 'genericJvmArguments', ' '.join( oldargs ), ' '.join( newargs ) )
+        settings = settings + [ '-genericJvmArguments', ' '.join( newargs ) ]
+    else:
+        print "  %-20s UNCHANGED %s" % ( 'genericJvmArguments', ' '.join( oldargs ) )
+    #endIf
+    if not settings:
+        print "JVM PRESET " + jp + " ALREADY APPLIED TO " + svr + ", NO CHANGES MADE."
+        return
+    #endIf
+    print "APPLYING JVM PRESET " + jp + " TO " + svr + " ON " + nde + "...",
+    try:
+        AdminTask.setJVMProperties( [ '-serverName', svr, '-nodeName', nde ] + settings )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+#endDef
+
+
+# Function to set the PMI statistic set of app server (svr) on node (nde)
+# to level (lvl), or to the custom statistic set (spec) if lvl is 'custom'.
+# Only changes settings that differ.
+def pmi_settings( svr, nde, lvl, spec ):
+    serverID = AdminConfig.getid( '/Node:' + nde + '/Server:' + svr + '/' )
+    pmiID = AdminConfig.list( 'PMIService', serverID ).splitlines()[0]
+    # Config object, label and the settings wanted for it:
+    wanted = [ [ pmiID, 'PMIService', [ [ 'enable', str( lvl != 'none' ).lower() ], [ 'statisticSet', lvl ] ] ] ]
+    if lvl == 'custom':
+        modules = {}
+        for moduleID in AdminConfig.list( 'PMIModule', serverID ).splitlines():
+            modules[ AdminConfig.showAttribute( moduleID, 'moduleName' ) ] = moduleID
+        #endFor
+        for item in spec.split( ':' ):
+            module, ids = item.split( '=' )
+            if not modules.has_key( module ):
+                print "  %-34s UNKNOWN PMI MODULE, IGNORED" % module
+                continue
+            #endIf
+            wanted.append( [ modules[ module ], module, [ [ 'enable', ids ] ] ] )
+        #endFor
+    #endIf
+    print "PMI SETTINGS FOR " + svr + " ON NODE " + nde + ":"
+    for objID, label, settings in wanted:
+        delta = []
+        for attr, newvalue in settings:
+            oldvalue = AdminConfig.showAttribute( objID, attr )
+            if oldvalue == newvalue:
+                print "  %-34s UNCHANGED %s" % ( label + '.' + attr, oldvalue )
+            else:
+                print "  %-34s CHANGED   %s -> %s" % ( label + '.' + attr, oldvalue, newvalue )
+                delta.append( [ attr, newvalue ] )
+            #endIf
+        #endFor
+        if delta:
+            try:
+                AdminConfig.modify( objID, delta )
+            except:
+                # Report exception type and exception message if exception raised:
+                print
+                print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+                os._exit(1)
+            #endTry
+        #endIf
+    #endFor
+#endDef
+
+
 # Save WAS Configuration:
 def saveConfig():
     print "SAVING CONFIGURATION ...",
@@ -204,8 +760,10 @@ def syncActiveNodes():
 
 
 # Simple function to restart app server (svr) on node (nde) so changes can take effect.
+# Returns the time the restart was requested, for timing the restart.
 # TO-DO: this function might be improved with some exception handling.
 def restartAppSvr( svr, nde ):
+    starttime = time.time()
     # Construct object reference for app server:
     svrobj = 'cell=' + cellName + ',node=' + nde + ',name=' + svr + ',type=Server,*'
     # Then determine if an MBean exists for this object:
@@ -221,31 +779,188 @@ def restartAppSvr( svr, nde ):
         else:
             print "A PROBLEM OCCURRED DURING RESTART OF: " + svr
         #endIf
+        waitForStop( svr, nde, starttime + starttimeout )
     #endIf
+    return starttime
 #endDef
 
 
-# Function to check app server (svr) on node (nde) has restarted.
-# Status is determined by getting status of the server MBean.
-# By default, checks 10 times every 10 seconds, this can be changed if desired.
-def checkAppSvr( svr, nde, snooze = 10, retries = 10 ):
-    svrstate = ""
+# Function to return the state of app server (svr) on node (nde), from its
+# server MBean, or '' if it has none (i.e. is not running):
+def serverState( svr, nde ):
     svrobj = 'cell=' + cellName + ',node=' + nde + ',name=' + svr + ',type=Server,*'
-    for n in range(0, retries):
-        svrmb = AdminControl.completeObjectName(svrobj)
+    svrmb = AdminControl.completeObjectName(svrobj)
+    if not svrmb:
+        return ''
+    #endIf
+    try:
+        return AdminControl.getAttribute(svrmb, 'state')
+    except:
+        return ''
+    #endTry
+#endDef
+
+
+# Function to wait until a restarting app server (svr) on node (nde) has
+# left the STARTED state, so that checkAppSvrs() does not see the state of
+# the old JVM.  Waits at most until (deadline).
+def waitForStop( svr, nde, deadline ):
+    while serverState( svr, nde ) == "STARTED" and time.time() < deadline:
+        time.sleep(pollint)
+    #endWhile
+#endDef
+
+
+# Function to check the app servers of (batch), whose restarts were requested
+# at (starttimes), have restarted.  They are checked together every pollint
+# seconds, each until it is STARTED or startTimeout seconds have passed since
+# its restart.  Returns the state and start-to-state time of each app server.
+def checkAppSvrs( batch, starttimes ):
+    states = {}
+    elapsed = {}
+    pending = range( 0, len( batch ) )
+    checks = 0
+    while pending:
+        for n in pending[:]:
+            svr, nde = batch[n]
+            states[n] = serverState( svr, nde )
+            now = time.time()
+            if states[n] == "STARTED" or now >= starttimes[n] + starttimeout:
+                elapsed[n] = now - starttimes[n]
+                pending.remove( n )
+                print "APP SERVER " + svr + " STATUS: " + states[n]
+            #endIf
+        #endFor
+        if pending:
+            time.sleep(pollint)
+            # Show progress about every 10 seconds:
+            checks = checks + 1
+            if checks * pollint % 10 < pollint:
+                print '.',
+            #endIf
+        #endIf
+    #endWhile
+    return states, elapsed
+#endDef
+
+
+# Function to record the start-to-STARTED time (elapsed) of app server (svr)
+# on node (nde) in startTimesLog, and report it against the time previously
+# recorded for the same app server.  (label) describes the restart.
+def recordStartTime( svr, nde, elapsed, svrstate, label ):
+    previous = ''
+    if os.path.isfile( startTimesLog ):
+        file1 = open( startTimesLog, 'r' )
+        for line in file1.readlines():
+            fields = line.split()
+            if len( fields ) >= 5 and fields[1] == nde and fields[2] == svr and fields[4] == 'STARTED':
+                previous = fields[3]
+            #endIf
+        #endFor
+        file1.close()
+    #endIf
+    file1 = open( startTimesLog, 'a' )
+    file1.write( '%d %s %s %.1f %s %s\n' % ( time.time(), nde, svr, elapsed, svrstate or 'UNKNOWN', label ) )
+    file1.close()
+    if previous:
+        print "START TIME OF " + svr + " (" + label + "): %.1fs, PREVIOUSLY %ss." % ( elapsed, previous )
+    else:
+        print "START TIME OF " + svr + " (" + label + "): %.1fs." % elapsed
+    #endIf
+#endDef
+
+
+# Function to write the thread pool settings and statistics of the app
+# server MBeans matching (query) to the open file (f1).
+def writeThreadPools( query, f1 ):
+    for tpMB in AdminControl.queryNames( query + 'type=ThreadPool,*' ).splitlines():
+        f1.write( '  ' + AdminControl.getAttribute( tpMB, 'name' ) + ': min ' + AdminControl.getAttribute( tpMB, 'minimumSize' ) + ', max ' + AdminControl.getAttribute( tpMB, 'maximumSize' ) + '\n' )
+        try:
+            f1.write( '    ' + str( AdminControl.getAttribute( tpMB, 'stats' ) ).replace( '\n', '\n    ' ) + '\n' )
+        except:
+            f1.write( '    NO STATISTICS (PMI NOT ENABLED?)\n' )
+        #endTry
+    #endFor
+#endDef
+
+
+# Function to capture diagnostics of app server (svr) on node (nde) that has
+# missed its restart deadline: requests diagDumps javacores through the JVM
+# MBean, diagInterval seconds apart, recording the app server state, heap
+# and thread pools each time, and bundles the results in an archive.
+def diagCapture( svr, nde ):
+    name = 'serverConfig_diag_' + nde + '_' + svr + '_' + time.strftime( '%Y%m%d_%H%M%S' )
+    path = os.path.join( diagDir, name )
+    os.makedirs( path )
+    query = 'cell=' + cellName + ',node=' + nde + ',process=' + svr + ','
+    print "CAPTURING DIAGNOSTICS FOR " + svr + " ON NODE " + nde + "..."
+    f1 = open( os.path.join( path, 'diagnostics.txt' ), 'w' )
+    for n in range( 0, diagDumps ):
+        f1.write( time.strftime( '%Y-%m-%d %H:%M:%S' ) + ' SAMPLE ' + str( n + 1 ) + ' OF ' + str( diagDumps ) + ':\n' )
+        svrmb = AdminControl.completeObjectName( query + 'type=Server,*' )
+        jvmmb = AdminControl.completeObjectName( query + 'type=JVM,*' )
         try:
-            svrstate = AdminControl.getAttribute(svrmb, 'state')
+            f1.write( '  STATE: ' + AdminControl.getAttribute( svrmb, 'state' ) + '\n' )
         except:
-            pass
+            f1.write( '  STATE: UNKNOWN (NO SERVER MBEAN)\n' )
         #endTry
-        if svrstate != "STARTED":
-            time.sleep(snooze)
-            print '.',
+        if jvmmb:
+            try:
+                AdminControl.invoke( jvmmb, 'dumpThreads' )
+                f1.write( '  JAVACORE REQUESTED\n' )
+                f1.write( '  HEAP: ' + AdminControl.getAttribute( jvmmb, 'heapSize' ) + ' bytes, free ' + AdminControl.getAttribute( jvmmb, 'freeMemory' ) + ', max ' + AdminControl.getAttribute( jvmmb, 'maxMemory' ) + '\n' )
+            except:
+                f1.write( '  JVM MBEAN ERROR: ' + str( sys.exc_info()[1] ) + '\n' )
+            #endTry
+            writeThreadPools( query, f1 )
         else:
+            f1.write( '  NO JVM MBEAN, USE was-diag-capture.sh ON THE HOST OF ' + nde + '\n' )
+        #endIf
+        if n < diagDumps - 1:
+            time.sleep( diagInterval )
+        #endIf
+    #endFor
+    f1.close()
+    tar = tarfile.open( path + '.tar.gz', 'w:gz' )
+    tar.add( path, name )
+    tar.close()
+    shutil.rmtree( path )
+    print "DIAGNOSTICS FOR " + svr + " SAVED TO " + path + ".tar.gz"
+    print "JAVACORES ARE WRITTEN ON THE HOST OF NODE " + nde + ", COLLECT THEM WITH was-diag-capture.sh."
+#endDef
+
+
+# Function to restart the app servers in (targets), restartbatch at a time,
+# and record the time each takes to reach the STARTED state.  Each batch is
+# restarted only once the previous one is STARTED.  Captures diagnostics of
+# any app server not STARTED in time, in which case the remaining app servers
+# are not restarted, and returns the number of such app servers.
+def restartTargets( targets, label ):
+    missed = 0
+    for first in range( 0, len( targets ), restartbatch ):
+        batch = targets[first:first + restartbatch]
+        starttimes = []
+        for svr, nde in batch:
+            starttimes.append( restartAppSvr( svr, nde ) )
+        #endFor
+        states, elapsed = checkAppSvrs( batch, starttimes )
+        for n in range( 0, len( batch ) ):
+            svr, nde = batch[n]
+            recordStartTime( svr, nde, elapsed[n], states[n], label )
+            if states[n] != "STARTED":
+                diagCapture( svr, nde )
+                missed = missed + 1
+            #endIf
+        #endFor
+        if missed:
+            remaining = targets[first + len( batch ):]
+            if remaining:
+                print "ROLLING RESTART STOPPED, NOT RESTARTED: " + ', '.join( [ svr for svr, nde in remaining ] )
+            #endIf
             break
         #endIf
     #endFor
-    print "APP SERVER " + svr + " STATUS: " + svrstate
+    return missed
 #endDef
 
 
@@ -255,31 +970,62 @@ def main():
 
     # First get command-line parameters:
     get_args()
+    targets = get_targets()
 
-    # Apply log rotation settings, if specified on command-line:
-    if rlogs == "yes":
-        # Define containment path of app server before getting its id:
-        spath = '/Server:' + s1
-        sid = AdminConfig.getid( spath )
-        # Change log settings for SystemOut.log:
-        print "CHANGING LOG ROTATION & RETENTION POLICY FOR", s1, "SystemOut.log FILE...",
-        log1 = AdminConfig.showAttribute(sid, 'outputStreamRedirect')
-        log_settings( log1, r1 )
-        # Change log settings for SystemErr.log:
-        print "CHANGING LOG ROTATION & RETENTION POLICY FOR", s1, "SystemErr.log FILE...",
-        log2 = AdminConfig.showAttribute(sid, 'errorStreamRedirect')
-        log_settings( log2, r1 )
+    # Measure start time before any changes, if requested:
+    if baseline == "yes":
+        if restartTargets( targets, 'baseline' ):
+            print "BASELINE RESTART FAILED, NO CHANGES MADE, EXITING."
+            os._exit(1)
+        #endIf
     #endIf
 
-    # Verbose GC settings: 
-    if vgc == "yes":
-        enable_vgc( s1, n1 )
-    #endIf
+    for svr, nde in targets:
+        # Switch to HPEL, or apply log rotation settings, if specified on
+        # command-line:
+        if hpel == "yes":
+            hpel_settings( svr, nde, hpelsize, r1 )
+        elif rlogs == "yes":
+            # Define containment path of app server before getting its id:
+            spath = '/Node:' + nde + '/Server:' + svr + '/'
+            sid = AdminConfig.getid( spath )
+            # Change log settings for SystemOut.log:
+            print "CHANGING LOG ROTATION & RETENTION POLICY FOR", svr, "SystemOut.log FILE...",
+            log1 = AdminConfig.showAttribute(sid, 'outputStreamRedirect')
+            log_settings( log1, r1 )
+            # Change log settings for SystemErr.log:
+            print "CHANGING LOG ROTATION & RETENTION POLICY FOR", svr, "SystemErr.log FILE...",
+            log2 = AdminConfig.showAttribute(sid, 'errorStreamRedirect')
+            log_settings( log2, r1 )
+        #endIf
 
-    # MQ settings:
-    if nomq == "yes":
-        disable_mq( s1, n1 )
-    #endIf
+        # Verbose GC settings: 
+        if vgc == "yes":
+            enable_vgc( svr, nde )
+        #endIf
+
+        # MQ settings:
+        if nomq == "yes":
+            disable_mq( svr, nde )
+        #endIf
+
+        # Tuning profile:
+        if tprofile:
+            tune_server( svr, nde, tprofile )
+        #endIf
+
+        # JVM preset:
+        if jpreset:
+            jvm_preset( svr, nde, jpreset )
+        #endIf
+
+        # PMI statistic set:
+        if pmicustom:
+            pmi_settings( svr, nde, 'custom', pmicustom )
+        elif pmilevel:
+            pmi_settings( svr, nde, pmilevel, '' )
+        #endIf
+    #endFor
 
     # Save configuration:
     saveConfig()
@@ -287,13 +1033,19 @@ def main():
     # Sync any active nodes:
     syncActiveNodes()
 
-    # Restart app server for changes to take effect:
-    restartAppSvr( s1, n1 )
-
-    # Check app server has restarted:
-    checkAppSvr( s1, n1 ) 
+    # Restart app server(s) for changes to take effect, and check they have
+    # restarted:
+    label = 'changes'
+    if jpreset:
+        label = 'jvmPreset=' + jpreset
+    #endIf
+    missed = restartTargets( targets, label )
  
     # Exit from Jython with a specific exit code:
+    if missed:
+        print str( missed ) + " APP SERVER(S) NOT STARTED IN TIME, EXITING."
+        os._exit(1)
+    #endIf
     os._exit(0)
 
 
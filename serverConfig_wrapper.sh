@@ -1,7 +1,8 @@
 #!/bin/bash
 
-# Run wsadmin Jython script:
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
 
-/apps/IBM/WebSphere/AppServer/profiles/Dmgr01/bin/wsadmin.sh -lang jython -profileName Dmgr01 -username wasadmin -password 12345678 -f /scripts/was9/serverConfig_J27.py --server server1 --node centos70Node01 --retainlogs 14 --disableMQ --enableVGC
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/serverConfig_J27.py --server server1 --node centos70Node01 --retainlogs 14 --disableMQ --enableVGC --tuning-profile web-prod-v1 --jvmPreset prod --restartBatch 1 --pollInterval 1 --startTimeout 300
 
 
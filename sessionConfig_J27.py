@@ -0,0 +1,391 @@
+#------------------------------------------------------------------------------
+#    NAME: sessionConfig_J27.py
+# PURPOSE: Tunes HTTP session management and memory-to-memory session
+#          replication for every member of a cluster, or for a single app
+#          server.
+# VERSION: 1.0
+#   NOTES: This script applies the following session manager settings to
+#          every member of a cluster (--cluster), or to an app server
+#          (--server) residing on a node (--node), by using the following
+#          options:
+#
+#          --maxSessions number
+#              The maximum number of sessions held in memory per app server
+#              (session manager maxInMemorySessionCount).
+#
+#          --allowOverflow true|false
+#              Whether more than --maxSessions sessions may be created.
+#
+#          --writeInterval seconds
+#              Writes updated sessions to the replication domain every
+#              'seconds' (time based write), instead of at the end of every
+#              servlet service.
+#
+#          --endOfService
+#              Writes updated sessions at the end of every servlet service
+#              (the WAS default).
+#
+#          --replicationDomain domain
+#              Replicates sessions memory-to-memory through the data
+#              replication domain 'domain', which is created if it does not
+#              exist, using a single replica of each session.
+#
+#          --replicationMode CLIENT|SERVER|BOTH
+#              The members' replication mode within the domain: CLIENT
+#              (only sends sessions), SERVER (only stores the sessions of
+#              others) or BOTH (peer-to-peer, the default).
+#
+#          --noReplication
+#              Switches memory-to-memory session replication off.
+#
+#          --rippleStart
+#              Ripple starts the cluster (one member at a time) after the
+#              changes are saved, so the changes take effect without an
+#              outage.  Only valid with --cluster.
+#
+#          The current value of every setting is checked first, and only
+#          settings that differ are changed.  Every setting is reported as
+#          CHANGED (with its old and new value) or UNCHANGED.  The
+#          configuration is saved and nodes are synchronised only if
+#          something was changed.
+#
+#          CHANGES FOR JYTHON 2.7:
+#          -----------------------
+#          os._exit() now raises an exception and will expect exception
+#          handling.  Either modify script for exception handle os._exit(),
+#          or use os._exit() instead. This script has been modified to
+#          use os._exit() instead.
+#
+#------------------------------------------------------------------------------
+
+import sys
+import os
+import getopt
+
+# Global constants used in this script:
+cellName = AdminControl.getCell()
+
+# Valid replication modes:
+replicationModes = [ 'CLIENT', 'SERVER', 'BOTH' ]
+
+
+# Function specifies correct script usage:
+def usage():
+    print
+    print """This script must be used with the command-line syntax:
+
+    sessionConfig_J27.py --cluster cluster | --server server --node node
+                         [--maxSessions number] [--allowOverflow true|false]
+                         [--writeInterval seconds | --endOfService]
+                         [--replicationDomain domain [--replicationMode CLIENT|SERVER|BOTH] | --noReplication]
+                         [--rippleStart]
+
+    """
+#endDef
+
+
+# Function gets required command-line arguments & processes accordingly:
+def get_args():
+    # Make args parameters global for use outside of this function:
+    global s1, n1, c1, maxsess, overflow, winterval, eos, rdomain, rmode, norep, ripple
+    # Some parameters require initial defaults:
+    s1 = ''
+    n1 = ''
+    c1 = ''
+    maxsess = ''
+    overflow = ''
+    winterval = ''
+    eos = 'no'
+    rdomain = ''
+    rmode = 'BOTH'
+    norep = 'no'
+    ripple = 'no'
+    try:
+        shortForm = ""
+        longForm = ["server=", "node=", "cluster=", "maxSessions=", "allowOverflow=", "writeInterval=", "endOfService",
+                    "replicationDomain=", "replicationMode=", "noReplication", "rippleStart"]
+        argCount = len( sys.argv[0:])
+        if ( argCount < 2 ):
+            print "ERROR - Minimum no. of required command-line options have not been specified."
+            usage()
+            os._exit(2)
+        #endIf
+        opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
+    except getopt.GetoptError,  err:
+        # Print usage before exiting:
+        print str( err )
+        print "Exception triggered!"
+        usage()
+        os._exit(2)
+    #endTry
+    # Process options:
+    for flag, val in opts:
+        if flag == '--server':
+            s1 = val
+        elif flag == '--node':
+            n1 = val
+        elif flag == '--cluster':
+            c1 = val
+        elif flag == '--maxSessions':
+            maxsess = val
+        elif flag == '--allowOverflow':
+            if val not in [ 'true', 'false' ]:
+                print "ERROR - --allowOverflow must be true or false."
+                usage()
+                os._exit(2)
+            #endIf
+            overflow = val
+        elif flag == '--writeInterval':
+            winterval = val
+        elif flag == '--endOfService':
+            eos = 'yes'
+        elif flag == '--replicationDomain':
+            rdomain = val
+        elif flag == '--replicationMode':
+            if val not in replicationModes:
+                print "ERROR - Unknown replication mode " + val + ", choose from: " + ', '.join( replicationModes )
+                usage()
+                os._exit(2)
+            #endIf
+            rmode = val
+        elif flag == '--noReplication':
+            norep = 'yes'
+        elif flag == '--rippleStart':
+            ripple = 'yes'
+        else:
+            usage()
+            os._exit(2)
+        #endIf
+    #endFor
+    if not c1 and not ( s1 and n1 ):
+        print "ERROR - Either --server and --node, or --cluster must be specified."
+        usage()
+        os._exit(2)
+    #endIf
+    if winterval and eos == 'yes':
+        print "ERROR - Only one of --writeInterval and --endOfService may be specified."
+        usage()
+        os._exit(2)
+    #endIf
+    if rdomain and norep == 'yes':
+        print "ERROR - Only one of --replicationDomain and --noReplication may be specified."
+        usage()
+        os._exit(2)
+    #endIf
+    if ripple == 'yes' and not c1:
+        print "ERROR - The --rippleStart option is only valid with --cluster."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function returns the [server, node] pairs to configure: either the single
+# app server given on the command-line or every member of the cluster.
+def get_targets():
+    if not c1:
+        return [ [ s1, n1 ] ]
+    #endIf
+    clusterID = AdminConfig.getid( '/ServerCluster:' + c1 + '/' )
+    if not clusterID:
+        print "CLUSTER " + c1 + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    targets = []
+    for memberID in AdminConfig.list( 'ClusterMember', clusterID ).splitlines():
+        targets.append( [ AdminConfig.showAttribute( memberID, 'memberName' ), AdminConfig.showAttribute( memberID, 'nodeName' ) ] )
+    #endFor
+    return targets
+#endDef
+
+
+# Function compares the attributes of config object (objID) with the
+# wanted values (wanted, a list of [attribute, value] pairs) and applies the
+# differences.  Returns the number of attributes changed.
+def applyDelta( objID, wanted ):
+    delta = []
+    for attr, newvalue in wanted:
+        oldvalue = AdminConfig.showAttribute( objID, attr )
+        if oldvalue == newvalue:
+            print "  %-24s UNCHANGED %s" % ( attr, oldvalue )
+        else:
+            print "  %-24s CHANGED   %s -> %s" % ( attr, oldvalue, newvalue )
+            delta.append( [ attr, newvalue ] )
+        #endIf
+    #endFor
+    if delta:
+        try:
+            AdminConfig.modify( objID, delta )
+        except:
+            # Report exception type and exception message if exception raised:
+            print
+            print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+            os._exit(1)
+        #endTry
+    #endIf
+    return len( delta )
+#endDef
+
+
+# Function returns the config ID of data replication domain (dom), creating
+# it with a single replica of each entry if required.  Returns
+# [domainID, changes].
+def replicationDomain( dom ):
+    domID = AdminConfig.getid( '/DataReplicationDomain:' + dom + '/' )
+    if domID:
+        print "DATA REPLICATION DOMAIN " + dom + " ALREADY EXISTS."
+        return [ domID, 0 ]
+    #endIf
+    print "CREATING DATA REPLICATION DOMAIN " + dom + "...",
+    try:
+        cellID = AdminConfig.getid( '/Cell:' + cellName + '/' )
+        domID = AdminConfig.create( 'DataReplicationDomain', cellID, [ [ 'name', dom ] ] )
+        AdminConfig.create( 'DataReplication', domID, [ [ 'numberOfReplicas', '1' ] ], 'defaultDataReplicationSettings' )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "DONE."
+    #endTry
+    return [ domID, 1 ]
+#endDef
+
+
+# Function applies the session settings to app server (svr) on node (nde).
+# Returns the number of changes made.
+def configure_sessions( svr, nde ):
+    serverID = AdminConfig.getid( '/Node:' + nde + '/Server:' + svr + '/' )
+    if not serverID:
+        print "APP SERVER " + svr + " ON NODE " + nde + " NOT FOUND, EXITING."
+        os._exit(1)
+    #endIf
+    print "SESSION MANAGER FOR " + svr + " ON NODE " + nde + ":"
+    sessionID = AdminConfig.list( 'SessionManager', serverID ).splitlines()[0]
+    tuningID = AdminConfig.showAttribute( sessionID, 'tuningParams' )
+    wanted = []
+    if maxsess:
+        wanted.append( [ 'maxInMemorySessionCount', maxsess ] )
+    #endIf
+    if overflow:
+        wanted.append( [ 'allowOverflow', overflow ] )
+    #endIf
+    if winterval:
+        wanted = wanted + [ [ 'writeFrequency', 'TIME_BASED_WRITE' ], [ 'writeInterval', winterval ] ]
+    elif eos == 'yes':
+        wanted.append( [ 'writeFrequency', 'END_OF_SERVLET_SERVICE' ] )
+    #endIf
+    changes = applyDelta( tuningID, wanted )
+    if norep == 'yes':
+        changes = changes + applyDelta( sessionID, [ [ 'sessionPersistenceMode', 'NONE' ] ] )
+    elif rdomain:
+        changes = changes + applyDelta( sessionID, [ [ 'sessionPersistenceMode', 'DATA_REPLICATION' ] ] )
+        drsID = AdminConfig.showAttribute( sessionID, 'sessionDRSPersistence' )
+        drswanted = [ [ 'messageBrokerDomainName', rdomain ], [ 'dataReplicationMode', rmode ] ]
+        if drsID:
+            changes = changes + applyDelta( drsID, drswanted )
+        else:
+            for attr, newvalue in drswanted:
+                print "  %-24s CHANGED   %s -> %s" % ( attr, '', newvalue )
+            #endFor
+            AdminConfig.create( 'DRSSettings', sessionID, drswanted, 'sessionDRSPersistence' )
+            changes = changes + len( drswanted )
+        #endIf
+    #endIf
+    return changes
+#endDef
+
+
+# Function to ripple start the cluster (clstr), one member at a time.
+def rippleStart( clstr ):
+    clusterMB = AdminControl.completeObjectName( 'cell=' + cellName + ',type=Cluster,name=' + clstr + ',*' )
+    if not clusterMB:
+        print "CLUSTER " + clstr + " IS NOT RUNNING, NOT RIPPLE STARTING."
+        return
+    #endIf
+    print "RIPPLE STARTING CLUSTER " + clstr + "...",
+    try:
+        AdminControl.invoke( clusterMB, 'rippleStart' )
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    else:
+        print "REQUESTED."
+    #endTry
+#endDef
+
+
+# Save WAS Configuration:
+def saveConfig():
+    print "SAVING CONFIGURATION ...",
+    saveResult = AdminConfig.save()
+    if not saveResult:
+        print "DONE."
+    else:
+        print "A PROBLEM OCCURRED SAVING, EXITING."
+        os._exit(1)
+    #endIf
+#endDef
+
+
+# Sync active nodes:
+def syncActiveNodes():
+    dmgrMB = AdminControl.queryNames("type=DeploymentManager,*")
+    print "SYNCING ACTIVE NODES ...",
+    syncResult = AdminControl.invoke(dmgrMB, 'syncActiveNodes', 'true')
+    if syncResult:
+        print "DONE."
+    else:
+        print "NO NODES SYNC'D."
+    #endIf
+#endDef
+
+
+
+# Main function:
+def main():
+
+    # First get command-line parameters:
+    get_args()
+    targets = get_targets()
+
+    # The replication domain is shared by all cluster members:
+    changes = 0
+    if rdomain:
+        domID, changes = replicationDomain( rdomain )
+    #endIf
+
+    # Session manager of each app server:
+    for svr, nde in targets:
+        changes = changes + configure_sessions( svr, nde )
+    #endFor
+
+    # Save and sync only if something changed:
+    if changes:
+        saveConfig()
+        syncActiveNodes()
+        if ripple == 'yes':
+            rippleStart( c1 )
+        else:
+            print str( changes ) + " CHANGE(S) MADE, RESTART THE APP SERVER(S) FOR THEM TO TAKE EFFECT."
+        #endIf
+    else:
+        print "SESSION SETTINGS ALREADY APPLIED, NO CHANGES MADE."
+    #endIf
+
+    # Exit from Jython with a specific exit code:
+    os._exit(0)
+#endDef
+
+
+# Ensure script is executed rather than imported:
+if ( __name__ == '__main__' ):
+    main()
+else:
+    print 'Error: this script must be executed, not imported.'
+    usage()
+    os._exit(1)
+#endIf
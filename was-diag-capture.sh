@@ -0,0 +1,161 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         was-diag-capture.sh
+# VERSION:      1.01
+# DESCRIPTION:  Captures diagnostics of a slow or hung WebSphere Application
+#               Server (WAS) process on the local host, e.g. when a restart
+#               has missed its deadline (see serverConfig_J27.py).
+#
+#               For app servers run by the was-server@ template units (see
+#               was-systemd-unit-create.sh, WAS_TYPE=AppServers) it is run
+#               automatically, as WAS_USER: by the start helper
+#               was-server-start.sh when a start or restart of the app server
+#               is not open for e-business within DIAG_AFTER seconds, and by
+#               the unit's OnFailure= unit, was-diag-capture@<server>, when
+#               the app server unit fails.
+#
+#               The process ID is read from the PIDFile of the process's
+#               systemd unit (WAS_SERVICE) if it has one, or otherwise from
+#               the .pid file in its log directory.
+#               The script then:
+#
+#               - sends the process DUMPS signals (kill -3), INTERVAL seconds
+#                 apart, each of which writes a javacore, and records the
+#                 CPU use of its threads (top -H) each time;
+#               - collects the javacores written since it started, together
+#                 with any javacores requested by serverConfig_J27.py, from
+#                 the profile directory;
+#               - copies the last TAIL_LINES lines of the process's
+#                 SystemOut.log, SystemErr.log, native_stdout.log and
+#                 native_stderr.log;
+#
+#               and bundles everything into a timestamped archive in
+#               DIAG_DIR, e.g.:
+#
+#               /var/tmp/was-diag_server1_20261019_134512.tar.gz
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment,
+#               for example:
+#
+#               WAS_JVM=server2 DUMPS=5 ./was-diag-capture.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+WAS_USER=${WAS_USER:=wbsadm}
+PROFILE_PATH=${PROFILE_PATH:=/apps/IBM/WebSphere/AppServer/profiles/AppSrv01}
+WAS_JVM=${WAS_JVM:=server1}
+WAS_SERVICE=${WAS_SERVICE:=was-server@${WAS_JVM}}
+DUMPS=${DUMPS:=3}
+INTERVAL=${INTERVAL:=10}
+TAIL_LINES=${TAIL_LINES:=500}
+DIAG_DIR=${DIAG_DIR:=/var/tmp}
+# Javacores older than this (in minutes) are not collected:
+JAVACORE_AGE=${JAVACORE_AGE:=30}
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+#
+#
+#
+# BEGIN FUNCTION DEFINITIONS
+
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Check if sudo required (not as root, or as WAS_USER, which owns the
+# process and its logs):
+sudo_check() {
+  uid=`id | /bin/sed -e 's;^.*uid=;;' -e 's;\([0-9]\)(.*;\1;'`
+  if [ "$uid" = "0" ] || [ "`id -un`" = "${WAS_USER}" ] ; then
+    SUDO=" "
+  else
+    SUDO=`which sudo 2>/dev/null`
+    if [ -z "${SUDO}" ] ; then
+      abort "SUDO NOT FOUND."
+    fi
+  fi
+}
+
+
+# Find the process ID, from the systemd unit's PIDFile if there is one:
+find_pid() {
+  PIDFILE=`systemctl show -p PIDFile ${WAS_SERVICE}.service 2>/dev/null | cut -d= -f2`
+  if [ -z "${PIDFILE}" ] ; then
+    PIDFILE=${PROFILE_PATH}/logs/${WAS_JVM}/${WAS_JVM}.pid
+  fi
+  if [ -f "${PIDFILE}" ] ; then
+    WAS_PID=`cat ${PIDFILE}`
+  fi
+  if [ -n "${WAS_PID}" ] && ${SUDO} kill -0 ${WAS_PID} 2>/dev/null ; then
+    printf "=> ${WAS_JVM} PROCESS ID ${WAS_PID} (FROM ${PIDFILE}).\n" | tee -a ${LOG}
+  else
+    printf "=> ${WAS_JVM} IS NOT RUNNING, COLLECTING LOGS ONLY.\n" | tee -a ${LOG}
+    WAS_PID=""
+  fi
+}
+
+
+# Request javacores and record thread CPU use, DUMPS times:
+capture_javacores() {
+  for n in `seq 1 ${DUMPS}` ; do
+    printf "=> REQUESTING JAVACORE ${n} OF ${DUMPS}.\n" | tee -a ${LOG}
+    ${SUDO} kill -3 ${WAS_PID}
+    top -b -H -n 1 -p ${WAS_PID} > ${WORK_DIR}/top-threads.${n}.txt 2>&1
+    if [ "${n}" -lt "${DUMPS}" ] ; then
+      sleep ${INTERVAL}
+    fi
+  done
+  # Give the JVM time to finish writing the last javacore:
+  sleep 2
+}
+
+
+# Collect recent javacores and the tails of the process's logs:
+collect_files() {
+  find ${PROFILE_PATH} -maxdepth 1 -name 'javacore*.txt' -mmin -${JAVACORE_AGE} -exec cp -p {} ${WORK_DIR}/ \;
+  for f in SystemOut.log SystemErr.log native_stdout.log native_stderr.log ; do
+    if [ -f "${PROFILE_PATH}/logs/${WAS_JVM}/${f}" ] ; then
+      ${SUDO} tail -n ${TAIL_LINES} ${PROFILE_PATH}/logs/${WAS_JVM}/${f} > ${WORK_DIR}/${f}
+    fi
+  done
+}
+
+
+# END FUNCTION DEFINITIONS
+
+################################################################################
+# MAIN
+################################################################################
+
+sudo_check
+
+STAMP=`date +%Y%m%d_%H%M%S`
+WORK_DIR=${DIAG_DIR}/was-diag_${WAS_JVM}_${STAMP}
+mkdir -p ${WORK_DIR} || abort "CANNOT CREATE ${WORK_DIR}."
+
+find_pid
+if [ -n "${WAS_PID}" ] ; then
+  capture_javacores
+fi
+collect_files
+
+tar -C ${DIAG_DIR} -czf ${WORK_DIR}.tar.gz `basename ${WORK_DIR}` || abort "CANNOT CREATE ${WORK_DIR}.tar.gz."
+rm -rf ${WORK_DIR}
+printf "\n=> DIAGNOSTICS FOR ${WAS_JVM} SAVED TO ${WORK_DIR}.tar.gz.\n\n" | tee -a ${LOG}
+
+exit 0
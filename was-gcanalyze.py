@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+#
+################################################################################
+#
+# NAME:         was-gcanalyze.py
+# VERSION:      1.00
+# DESCRIPTION:  Analyses the IBM J9 verbose garbage collection (GC) logs of
+#               the WebSphere Application Server (WAS) app servers on a node,
+#               as enabled by serverConfig_J27.py --enableVGC.
+#
+#               For each app server it reports:
+#
+#               - GC pause time percentiles (50, 90, 99, 99.9 and max) and
+#                 the number of pauses, by GC type (scavenge, global);
+#               - the allocation rate and the rate at which objects are
+#                 tenured (copied from the nursery to the tenure area);
+#               - nursery and tenure occupancy after GC;
+#               - the share of time spent in GC pauses, per interval
+#                 (--interval), with the worst interval in the summary.
+#
+#               The logs are read in fixed size chunks and every statistic
+#               is kept in a fixed size histogram or counter, so multi-GB
+#               logs are analysed in constant memory.  The app servers are
+#               analysed in parallel, one process per app server.
+#
+#               The verbose GC files of an app server are its native_stderr.log
+#               and any -Xverbosegclog files (verbosegc*.log), including
+#               rotated and compressed (.gz) files, read oldest first.
+#
+#               With --change, the statistics before and after the given
+#               time are reported separately, to measure the effect of a
+#               tuning change (e.g. serverConfig_J27.py --jvmPreset).
+#
+#               Examples:
+#
+#               was-gcanalyze.py --logroot /apps/IBM/WebSphere/AppServer/profiles/AppSrv01/logs
+#
+#               was-gcanalyze.py --logroot .../logs --server server1 \
+#                   --change "2026-10-19 13:00" --json /var/tmp/gc.json
+#
+#               Runs with Python 2.7 (RHEL 7 system Python) or Python 3.
+#
+################################################################################
+
+from __future__ import print_function
+
+import argparse
+import glob
+import gzip
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+
+# Size of each read from a verbose GC file:
+CHUNK_SIZE = 1024 * 1024
+
+# Pause histogram buckets grow by 5%, so percentiles are within 5%:
+BUCKET_GROWTH = 1.05
+
+# Percentiles reported for GC pauses:
+PERCENTILES = [50, 90, 99, 99.9]
+
+# Verbose GC elements used, and their attributes:
+ELEMENT = re.compile(br'<([a-z-]+)((?:\s+[\w-]+="[^"]*")*)\s*/?>')
+ATTRIBUTE = re.compile(br'([\w-]+)="([^"]*)"')
+INTERESTING = set([b'exclusive-end', b'cycle-start', b'gc-start', b'gc-op', b'gc-end', b'mem', b'allocation-stats', b'memory-copied'])
+
+
+def parse_time(value):
+    """Parse a command-line time, YYYY-MM-DD HH:MM[:SS], to epoch seconds."""
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError('invalid time "%s", use YYYY-MM-DD HH:MM[:SS]' % value)
+
+
+def gc_time(value):
+    """Convert a verbose GC timestamp, e.g. 2026-10-19T13:45:12.345, to
+    epoch seconds."""
+    stamp = time.mktime(time.strptime(value[:19], '%Y-%m-%dT%H:%M:%S'))
+    if len(value) > 20:
+        stamp += float('0' + value[19:23])
+    return stamp
+
+
+class Histogram(object):
+    """Fixed size histogram of pause times in ms, with approximate
+    percentiles."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, ms):
+        bucket = int(math.log(max(ms, 0.01) / 0.01, BUCKET_GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.maximum = max(self.maximum, ms)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        wanted = self.count * pct / 100.0
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min(0.01 * BUCKET_GROWTH ** (bucket + 1), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        result = {'count': self.count, 'total_ms': round(self.total, 1), 'max_ms': round(self.maximum, 1)}
+        for pct in PERCENTILES:
+            result['p%s_ms' % pct] = round(self.percentile(pct), 1)
+        return result
+
+
+class Period(object):
+    """GC statistics of one app server over one period (before or after
+    --change, or the whole log)."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pauses = Histogram()
+        self.by_type = {}
+        self.first = None
+        self.last = None
+        self.allocated = 0
+        self.tenured = 0
+        self.occupancy = {}
+        self.intervals = {}
+
+    def timestamp(self, stamp):
+        if self.first is None:
+            self.first = stamp
+        self.last = stamp
+
+    def pause(self, stamp, ms, gctype):
+        self.pauses.add(ms)
+        self.by_type.setdefault(gctype, Histogram()).add(ms)
+        slot = int(stamp // self.interval)
+        self.intervals[slot] = self.intervals.get(slot, 0.0) + ms
+
+    def after_gc(self, area, used, total):
+        # [count, sum of used bytes, max used bytes, total bytes]
+        stats = self.occupancy.setdefault(area, [0, 0, 0, 0])
+        stats[0] += 1
+        stats[1] += used
+        stats[2] = max(stats[2], used)
+        stats[3] = total
+
+    def summary(self):
+        elapsed = (self.last - self.first) if self.first is not None else 0
+        result = {
+            'start': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.first)) if self.first else None,
+            'end': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.last)) if self.last else None,
+            'elapsed_s': round(elapsed, 1),
+            'pauses': self.pauses.summary(),
+            'pauses_by_type': dict((t, h.summary()) for t, h in self.by_type.items()),
+            'allocation_mb_per_s': round(self.allocated / 1048576.0 / elapsed, 2) if elapsed else 0,
+            'tenured_mb_per_s': round(self.tenured / 1048576.0 / elapsed, 3) if elapsed else 0,
+            'gc_time_pct': round(self.pauses.total / 10.0 / elapsed, 2) if elapsed else 0,
+        }
+        for area, (count, used, maximum, total) in self.occupancy.items():
+            result['%s_after_gc' % area] = {
+                'avg_used_mb': round(used / 1048576.0 / count, 1),
+                'max_used_mb': round(maximum / 1048576.0, 1),
+                'size_mb': round(total / 1048576.0, 1),
+            }
+        if self.intervals:
+            slot = max(self.intervals, key=self.intervals.get)
+            result['worst_interval'] = {
+                'start': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(slot * self.interval)),
+                'gc_time_pct': round(self.intervals[slot] / 10.0 / self.interval, 2),
+            }
+            result['gc_time_pct_by_interval'] = dict(
+                (time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(s * self.interval)), round(ms / 10.0 / self.interval, 2))
+                for s, ms in sorted(self.intervals.items()))
+        return result
+
+
+def elements(path):
+    """Yield (name, attributes) of the interesting verbose GC elements of a
+    file, reading it in chunks."""
+    opener = gzip.open if path.endswith('.gz') else open
+    handle = opener(path, 'rb')
+    try:
+        pending = b''
+        while True:
+            chunk = handle.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            data = pending + chunk
+            # Keep any incomplete element for the next chunk:
+            cut = data.rfind(b'>') + 1
+            pending = data[cut:]
+            for match in ELEMENT.finditer(data, 0, cut):
+                if match.group(1) in INTERESTING:
+                    yield match.group(1), dict(ATTRIBUTE.findall(match.group(2)))
+    finally:
+        handle.close()
+
+
+def gc_files(serverdir):
+    """Return the verbose GC files of an app server, oldest first."""
+    files = glob.glob(os.path.join(serverdir, 'verbosegc*.log*')) + glob.glob(os.path.join(serverdir, 'native_stderr.log*'))
+    return sorted(files, key=os.path.getmtime)
+
+
+def analyse(job):
+    """Analyse the verbose GC files of one app server.  Returns the server
+    name and its statistics per period."""
+    server, files, change, interval = job
+    periods = {}
+    current = None
+    gctype = None
+    in_gc_end = False
+    for path in files:
+        for name, attrs in elements(path):
+            if b'timestamp' in attrs:
+                stamp = gc_time(attrs[b'timestamp'].decode('ascii'))
+                label = 'all' if change is None else ('before' if stamp < change else 'after')
+                current = periods.setdefault(label, Period(interval))
+                current.timestamp(stamp)
+            if current is None:
+                continue
+            # A pause is named after its collection (scavenge, global), from
+            # gc-start, else cycle-start, else its first gc-op (mark, sweep,
+            # compact... are phases of a global collection, not types):
+            if name == b'gc-start' and b'type' in attrs:
+                gctype = attrs[b'type'].decode('ascii')
+            elif name == b'cycle-start' and b'type' in attrs:
+                gctype = gctype or attrs[b'type'].decode('ascii')
+            elif name == b'gc-op':
+                gctype = gctype or attrs.get(b'type', b'unknown').decode('ascii')
+            elif name == b'exclusive-end':
+                current.pause(current.last, float(attrs.get(b'durationms', b'0')), gctype or 'unknown')
+                gctype = None
+            elif name == b'allocation-stats':
+                current.allocated += int(attrs.get(b'totalBytes', b'0'))
+            elif name == b'memory-copied' and attrs.get(b'type') == b'tenure':
+                current.tenured += int(attrs.get(b'bytes', b'0'))
+            elif name == b'gc-end':
+                in_gc_end = True
+                continue
+            elif name == b'mem' and in_gc_end and b'free' in attrs:
+                total = int(attrs[b'total'])
+                current.after_gc(attrs[b'type'].decode('ascii'), total - int(attrs[b'free']), total)
+                continue
+            in_gc_end = False
+    return server, dict((label, period.summary()) for label, period in periods.items())
+
+
+def text_summary(results):
+    """Return a text summary of the analysis results."""
+    lines = []
+    for server in sorted(results):
+        for label in ('all', 'before', 'after'):
+            stats = results[server].get(label)
+            if not stats:
+                continue
+            pauses = stats['pauses']
+            lines.append('%s%s: %s - %s' % (server, '' if label == 'all' else ' (%s change)' % label, stats['start'], stats['end']))
+            lines.append('  PAUSES      %d, p50 %.1f ms, p90 %.1f ms, p99 %.1f ms, p99.9 %.1f ms, max %.1f ms' % (
+                pauses['count'], pauses['p50_ms'], pauses['p90_ms'], pauses['p99_ms'], pauses['p99.9_ms'], pauses['max_ms']))
+            for gctype, typed in sorted(stats['pauses_by_type'].items()):
+                lines.append('  %-11s %d, p99 %.1f ms, max %.1f ms' % (gctype.upper(), typed['count'], typed['p99_ms'], typed['max_ms']))
+            lines.append('  ALLOCATION  %.2f MB/s, TENURED %.3f MB/s' % (stats['allocation_mb_per_s'], stats['tenured_mb_per_s']))
+            for area in ('nursery', 'tenure'):
+                if area + '_after_gc' in stats:
+                    occ = stats[area + '_after_gc']
+                    lines.append('  %-11s avg %.1f MB, max %.1f MB used after GC, of %.1f MB' % (
+                        area.upper(), occ['avg_used_mb'], occ['max_used_mb'], occ['size_mb']))
+            lines.append('  GC TIME     %.2f%% overall' % stats['gc_time_pct'])
+            if 'worst_interval' in stats:
+                lines.append('              %.2f%% in worst interval from %s' % (
+                    stats['worst_interval']['gc_time_pct'], stats['worst_interval']['start']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse the J9 verbose GC logs of the WAS app servers on a node.')
+    parser.add_argument('--logroot', required=True, help='profile logs directory, e.g. <profile>/logs')
+    parser.add_argument('--server', action='append', help='app server to analyse (repeatable), default all')
+    parser.add_argument('--change', type=parse_time, help='report before/after this time, YYYY-MM-DD HH:MM[:SS]')
+    parser.add_argument('--interval', type=int, default=300, help='GC time interval in seconds, default 300')
+    parser.add_argument('--json', help='write the full results as JSON to this file ("-" for stdout)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.logroot):
+        sys.exit('LOG DIRECTORY NOT FOUND: %s' % args.logroot)
+    servers = args.server or sorted(os.listdir(args.logroot))
+    jobs = []
+    for server in servers:
+        files = gc_files(os.path.join(args.logroot, server))
+        if files:
+            jobs.append((server, files, args.change, args.interval))
+    if not jobs:
+        sys.exit('NO VERBOSE GC FILES FOUND UNDER %s' % args.logroot)
+
+    pool = multiprocessing.Pool(min(len(jobs), multiprocessing.cpu_count()))
+    try:
+        results = dict(pool.map(analyse, jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+        return
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+    print(text_summary(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         was-log-housekeep.sh
+# VERSION:      1.00
+# DESCRIPTION:  Compresses the rotated text logs of every WebSphere Application
+#               Server (WAS) process of every profile on the host, applies
+#               their retention, and indexes the time range of each compressed
+#               log for was-logquery.py.
+#
+#               It is intended to run regularly, at the lowest CPU and I/O
+#               priority, from the systemd timer created by
+#               was-systemd-unit-create.sh with WAS_TYPE=LogHousekeep, but can
+#               also be run by hand (as WAS_USER or root).  For each log
+#               directory PROFILES_DIR/<profile>/logs/<process>:
+#
+#               - Rotated logs (e.g. SystemOut_26.10.19_00.00.00.log, and
+#                 rotated trace logs) older than COMPRESS_AFTER_MIN minutes
+#                 are compressed with gzip.  The times of their first and
+#                 last records are first recorded in the directory's
+#                 .logindex file, so that was-logquery.py can skip them
+#                 without opening them.
+#               - Rotated logs, compressed or not, are deleted once older than
+#                 the retention of the process's logs: the number of daily
+#                 backups set with serverConfig_J27.py --retainlogs (read from
+#                 its server.xml), or LOG_RETAIN_DAYS if it has none.  (WAS
+#                 itself no longer counts the backups once compressed.)
+#               - The oldest rotated logs are then deleted while they take up
+#                 more than LOG_MAX_MB in the directory (0 = no limit).
+#               - FFDC incident files older than FFDC_RETAIN_DAYS are deleted.
+#
+#               HPEL repositories, which WAS purges itself, and the current
+#               logs are left alone.  Only one run is allowed at a time.
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment
+#               (or, for the systemd timer, in /etc/sysconfig/was-log-housekeep),
+#               for example:
+#
+#               LOG_RETAIN_DAYS=7 LOG_MAX_MB=1024 ./was-log-housekeep.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENV VARS
+WAS_ROOT=${WAS_ROOT:=/apps/IBM/WebSphere/AppServer}
+PROFILES_DIR=${PROFILES_DIR:=${WAS_ROOT}/profiles}
+LOG_RETAIN_DAYS=${LOG_RETAIN_DAYS:=14}
+LOG_MAX_MB=${LOG_MAX_MB:=2048}
+FFDC_RETAIN_DAYS=${FFDC_RETAIN_DAYS:=14}
+COMPRESS_AFTER_MIN=${COMPRESS_AFTER_MIN:=5}
+GZIP_LEVEL=${GZIP_LEVEL:=6}
+LOCK_FILE=${LOCK_FILE:=/var/tmp/was-log-housekeep.lock}
+INDEX=.logindex
+ROTATED_REGEX='.*_[0-9][0-9]\.[0-9][0-9]\.[0-9][0-9]_[0-9][0-9]\.[0-9][0-9]\.[0-9][0-9]\.log\(\.gz\)?'
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENV VARS
+
+
+# BEGIN FUNCTION DEFINITIONS
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Run at the lowest CPU and I/O priority (inherited by gzip), and allow only
+# one run at a time:
+run_quietly() {
+  renice -n 19 -p $$ > /dev/null 2>&1
+  ionice -c 3 -p $$ > /dev/null 2>&1
+  exec {LOCK_FD}>>${LOCK_FILE} || abort "Cannot open lock file ${LOCK_FILE}."
+  if ! flock -n ${LOCK_FD} ; then
+    printf "=> Another run is in progress, nothing to do.\n" | tee -a ${LOG}
+    exit 0
+  fi
+}
+
+
+# Print the retention in days of the logs of a process ($2) of a profile
+# ($1): its daily backups of SystemOut.log, if rotated by time, otherwise
+# LOG_RETAIN_DAYS:
+log_retention() {
+  redirect=`sed -n 's/.*\(<outputStreamRedirect [^>]*>\).*/\1/p' $1/config/cells/*/nodes/*/servers/$2/server.xml 2>/dev/null | head -1`
+  backups=`echo "${redirect}" | sed -n 's/.* maxNumberOfBackupFiles="\([0-9]*\)".*/\1/p'`
+  period=`echo "${redirect}" | sed -n 's/.* rolloverPeriod="\([0-9]*\)".*/\1/p'`
+  if echo "${redirect}" | grep 'rolloverType="TIME"' > /dev/null && [ -n "${backups}" ] && [ -n "${period}" ] ; then
+    echo $(( (${backups} * ${period} + 23) / 24 ))
+  else
+    echo ${LOG_RETAIN_DAYS}
+  fi
+}
+
+
+# Print the epoch seconds of a log record header line read from stdin, e.g.
+# [10/19/26 13:45:12:345 BST] ..., in local time:
+record_time() {
+  stamp=`sed -n 's;^\[\([0-9]*\)/\([0-9]*\)/\([0-9]*\) \([0-9]*:[0-9]*:[0-9]*\):[0-9]* .*;20\3-\1-\2 \4;p'`
+  [ -n "${stamp}" ] && date -d "${stamp}" +%s 2>/dev/null
+}
+
+
+# Compress the rotated logs of a log directory ($1), indexing each first:
+logs_compress() {
+  COMPRESSED=0
+  BEFORE_KB=0
+  AFTER_KB=0
+  for file in `find $1 -maxdepth 1 -type f -regex "${ROTATED_REGEX}" ! -name '*.gz' -mmin +${COMPRESS_AFTER_MIN} | sort` ; do
+    first=`grep -a -m 1 '^\[[0-9]*/[0-9]*/[0-9]* ' ${file} | record_time`
+    last=`tac ${file} | grep -a -m 1 '^\[[0-9]*/[0-9]*/[0-9]* ' | record_time`
+    size=`du -k ${file} | cut -f1`
+    gzip -f -${GZIP_LEVEL} ${file} || continue
+    if [ -n "${first}" ] && [ -n "${last}" ] ; then
+      echo "`basename ${file}`.gz ${first} ${last}" >> $1/${INDEX}
+    fi
+    COMPRESSED=$(( ${COMPRESSED} + 1 ))
+    BEFORE_KB=$(( ${BEFORE_KB} + ${size} ))
+    AFTER_KB=$(( ${AFTER_KB} + `du -k ${file}.gz | cut -f1` ))
+  done
+}
+
+
+# Delete the rotated logs of a log directory ($1) older than $2 days:
+logs_expire() {
+  AGED=`find $1 -maxdepth 1 -type f -regex "${ROTATED_REGEX}" -mmin +$(( $2 * 1440 )) -print -delete | wc -l`
+}
+
+
+# Delete the oldest rotated logs of a log directory ($1) while they take up
+# more than LOG_MAX_MB, and drop the index entries of deleted logs:
+logs_trim() {
+  SIZED=0
+  if [ "${LOG_MAX_MB}" -gt 0 ] ; then
+    total=0
+    # Newest first, keeping files until the limit is reached:
+    find $1 -maxdepth 1 -type f -regex "${ROTATED_REGEX}" -printf '%T@ %s %p\n' | sort -rn > /tmp/${SCRIPTNAME}.$$
+    while read mtime size file ; do
+      total=$(( ${total} + ${size} ))
+      if [ "${total}" -gt $(( ${LOG_MAX_MB} * 1048576 )) ] ; then
+        rm -f ${file} && SIZED=$(( ${SIZED} + 1 ))
+      fi
+    done < /tmp/${SCRIPTNAME}.$$
+    rm -f /tmp/${SCRIPTNAME}.$$
+  fi
+  if [ -f "$1/${INDEX}" ] ; then
+    # Keep the latest entry of each log still present:
+    awk '{ entry[$1] = $0 } END { for (name in entry) print entry[name] }' $1/${INDEX} | sort |
+    while read name first last ; do
+      [ -f "$1/${name}" ] && echo "${name} ${first} ${last}"
+    done > $1/${INDEX}.$$
+    mv -f $1/${INDEX}.$$ $1/${INDEX}
+  fi
+}
+
+
+# Housekeep every log directory of every profile:
+housekeep() {
+  TOTAL_COMPRESSED=0
+  TOTAL_DELETED=0
+  for logdir in ${PROFILES_DIR}/*/logs/* ; do
+    [ -d "${logdir}" ] || continue
+    # FFDC incident files:
+    if [ "`basename ${logdir}`" = "ffdc" ] ; then
+      deleted=`find ${logdir} -maxdepth 1 -type f -mtime +${FFDC_RETAIN_DAYS} -print -delete | wc -l`
+      if [ "${deleted}" -gt 0 ] ; then
+        printf "=> ${logdir}: ${deleted} FFDC file(s) deleted.\n" | tee -a ${LOG}
+      fi
+      TOTAL_DELETED=$(( ${TOTAL_DELETED} + ${deleted} ))
+      continue
+    fi
+    # HPEL repositories purge themselves:
+    [ -d "${logdir}/logdata" ] && continue
+    profile=`dirname \`dirname ${logdir}\``
+    days=`log_retention ${profile} \`basename ${logdir}\``
+    logs_expire ${logdir} ${days}
+    logs_compress ${logdir}
+    logs_trim ${logdir}
+    if [ $(( ${COMPRESSED} + ${AGED} + ${SIZED} )) -gt 0 ] ; then
+      printf "=> ${logdir}: ${COMPRESSED} compressed (${BEFORE_KB} KB -> ${AFTER_KB} KB), ${AGED} deleted (over ${days} days), ${SIZED} deleted (over ${LOG_MAX_MB} MB).\n" | tee -a ${LOG}
+    fi
+    TOTAL_COMPRESSED=$(( ${TOTAL_COMPRESSED} + ${COMPRESSED} ))
+    TOTAL_DELETED=$(( ${TOTAL_DELETED} + ${AGED} + ${SIZED} ))
+  done
+  printf "\n=> ${TOTAL_COMPRESSED} log(s) compressed, ${TOTAL_DELETED} file(s) deleted, under ${PROFILES_DIR}.\n" | tee -a ${LOG}
+}
+
+
+# END FUNCTION DEFINITIONS
+
+
+########################################################################
+# MAIN
+########################################################################
+
+printf "\nSTARTING SCRIPT ON:\n" | tee ${LOG}
+date | tee -a ${LOG}
+printf "\n"
+if [ ! -d "${PROFILES_DIR}" ] ; then
+  abort "Profiles directory ${PROFILES_DIR} not found."
+fi
+run_quietly
+housekeep
+
+printf "\nENDING SCRIPT ON:\n" | tee -a ${LOG}
+date | tee -a ${LOG}
+
+exit 0
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+#
+################################################################################
+#
+# NAME:         was-logquery.py
+# VERSION:      1.02
+# DESCRIPTION:  Queries the logs of a WebSphere Application Server (WAS) app
+#               server by time range, minimum level and thread, without
+#               reading whole log files.
+#
+#               For an app server using High Performance Extensible Logging
+#               (HPEL, see serverConfig_J27.py --hpel), the query is passed
+#               to the profile's logViewer.sh, which uses the repository's
+#               own index.
+#
+#               For an app server using text logs, the SystemOut.log and
+#               SystemErr.log files (or trace.log with --trace) are queried:
+#
+#               - Rotated logs (e.g. SystemOut_26.10.19_00.00.00.log) are
+#                 named after the time they were rotated, i.e. the time of
+#                 their last record, so files outside the time range are
+#                 skipped by name alone.
+#               - Within each remaining file the first record of the time
+#                 range is found by a binary search on the file offset,
+#                 and reading stops at the first record after the range.
+#               - Compressed logs (.gz, see was-log-housekeep.sh) cannot be
+#                 searched this way and are read from the start, stopping
+#                 at the first record after the range.  The times of their
+#                 first and last records are taken from the .logindex file
+#                 kept by was-log-housekeep.sh, so compressed logs outside
+#                 the time range are skipped without being opened.
+#               - The matching records of SystemOut.log and SystemErr.log
+#                 are merged as they are read, so they are written in a
+#                 single time order.
+#
+#               Text log timestamps are expected in the default en_US
+#               format, e.g. [10/19/26 13:45:12:345 BST].
+#
+#               Examples:
+#
+#               was-logquery.py --logs /apps/IBM/WebSphere/AppServer/profiles/AppSrv01/logs/server1 \
+#                   --from "2026-10-19 13:00" --to "2026-10-19 13:15" --level WARNING
+#
+#               was-logquery.py --logs .../logs/server1 --from "2026-10-19 13:00" --thread 0000004a
+#
+#               Runs with Python 2.7 (RHEL 7 system Python) or Python 3.
+#
+################################################################################
+
+from __future__ import print_function
+
+import argparse
+import gzip
+import heapq
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+# Levels of text log records, by the event type character of each record,
+# and their java.util.logging ranks (SystemOut as INFO, SystemErr as SEVERE):
+LEVELS = {
+    'FATAL': 1100, 'SEVERE': 1000, 'WARNING': 900, 'AUDIT': 850,
+    'INFO': 800, 'CONFIG': 700, 'DETAIL': 625, 'FINE': 500,
+    'FINER': 400, 'FINEST': 300,
+}
+EVENT_TYPES = {
+    'F': 'FATAL', 'E': 'SEVERE', 'R': 'SEVERE', 'W': 'WARNING', 'A': 'AUDIT',
+    'I': 'INFO', 'O': 'INFO', 'C': 'CONFIG', 'D': 'DETAIL', '1': 'FINE',
+    '2': 'FINER', '>': 'FINER', '<': 'FINER', '3': 'FINEST', 'Z': 'INFO',
+}
+
+# Text log record header, e.g.
+# [10/19/26 13:45:12:345 BST] 0000004a SystemOut     O message
+RECORD = re.compile(br'^\[(\d+)/(\d+)/(\d+) (\d+):(\d+):(\d+):(\d+) [^\]]*\] ([0-9a-fA-F]+) \S+\s+(\S) ')
+
+# Rotated log file names, e.g. SystemOut_26.10.19_00.00.00.log[.gz]
+ROTATED = re.compile(r'^(\w+?)_(\d\d)\.(\d\d)\.(\d\d)_(\d\d)\.(\d\d)\.(\d\d)\.log(\.gz)?$')
+
+# Stop the binary search once the remaining range is this small:
+BISECT_MIN = 65536
+
+# Index of the first and last record times of the compressed logs of a log
+# directory, kept by was-log-housekeep.sh, one "file first last" line each:
+INDEX = '.logindex'
+
+
+def parse_time(value):
+    """Parse a command-line time, YYYY-MM-DD HH:MM[:SS], to epoch seconds."""
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError('invalid time "%s", use YYYY-MM-DD HH:MM[:SS]' % value)
+
+
+def record_header(line):
+    """Return (epoch seconds, thread id, level rank) of a record header
+    line, or None for a continuation line."""
+    match = RECORD.match(line)
+    if not match:
+        return None
+    mon, day, year, hour, mins, secs, msecs = [int(g) for g in match.groups()[:7]]
+    stamp = time.mktime((2000 + year, mon, day, hour, mins, secs, 0, 0, -1)) + msecs / 1000.0
+    level = LEVELS[EVENT_TYPES.get(match.group(9).decode('ascii'), 'INFO')]
+    return stamp, int(match.group(8), 16), level
+
+
+def read_index(logdir):
+    """Return the indexed (first, last) record times of the logs of a log
+    directory, by file name."""
+    index = {}
+    try:
+        handle = open(os.path.join(logdir, INDEX))
+    except IOError:
+        return index
+    try:
+        for line in handle:
+            fields = line.split()
+            if len(fields) == 3:
+                index[fields[0]] = (float(fields[1]), float(fields[2]))
+    finally:
+        handle.close()
+    return index
+
+
+def log_files(logdir, bases, start, stop):
+    """Return the text log files of the app server that may hold records
+    between start and stop, oldest first."""
+    index = read_index(logdir)
+    files = []
+    for name in os.listdir(logdir):
+        match = ROTATED.match(name)
+        if match and match.group(1) in bases:
+            yy, mo, dd, hh, mi, ss = [int(g) for g in match.groups()[1:7]]
+            rotated = time.mktime((2000 + yy, mo, dd, hh, mi, ss, 0, 0, -1))
+            files.append((match.group(1), rotated, os.path.join(logdir, name)))
+    for base in bases:
+        current = os.path.join(logdir, base + '.log')
+        if os.path.isfile(current):
+            files.append((base, float('inf'), current))
+    files.sort()
+    # Each file holds the records after the rotation of the previous file
+    # of the same log, up to its own rotation time, unless indexed:
+    selected = []
+    previous = {}
+    for base, rotated, path in files:
+        first = previous.get(base, float('-inf'))
+        previous[base] = rotated
+        first, last = index.get(os.path.basename(path), (first, rotated))
+        if last >= start and first <= stop:
+            selected.append(path)
+    return selected
+
+
+def first_offset(handle, size, start):
+    """Binary search an uncompressed log file for an offset at or before
+    the first record at or after start."""
+    low, high = 0, size
+    while high - low > BISECT_MIN:
+        mid = (low + high) // 2
+        handle.seek(mid)
+        handle.readline()
+        header = None
+        while header is None:
+            line = handle.readline()
+            if not line:
+                break
+            header = record_header(line)
+        if header is None or header[0] >= start:
+            high = mid
+        else:
+            low = mid
+    return low
+
+
+def query_file(path, start, stop, level, thread):
+    """Yield (epoch seconds, text) for each record of a text log file
+    matching the query."""
+    if path.endswith('.gz'):
+        handle = gzip.open(path, 'rb')
+    else:
+        handle = open(path, 'rb')
+        handle.seek(first_offset(handle, os.path.getsize(path), start))
+        # Skip the partial line left by the seek, if any:
+        if handle.tell():
+            handle.readline()
+    try:
+        record = None
+        for line in handle:
+            header = record_header(line)
+            if header is not None:
+                if record is not None:
+                    yield record[0], ''.join(record[1])
+                    record = None
+                stamp, tid, rank = header
+                if stamp > stop:
+                    break
+                if stamp >= start and rank >= level and (thread is None or tid == thread):
+                    record = (stamp, [])
+            if record is not None:
+                record[1].append(line.decode('latin-1'))
+        if record is not None:
+            yield record[0], ''.join(record[1])
+    finally:
+        handle.close()
+
+
+def query_log(paths, order, start, stop, level, thread):
+    """Yield (epoch seconds, order, sequence, text) for each record of the
+    files of one log matching the query, so that the records of several
+    logs can be merged in time order (keeping each log's own order for
+    records with the same time)."""
+    sequence = 0
+    for path in paths:
+        for stamp, text in query_file(path, start, stop, level, thread):
+            yield stamp, order, sequence, text
+            sequence += 1
+
+
+def logviewer_path(logdir, logviewer):
+    """Return the logViewer.sh of the profile owning the logs directory."""
+    if logviewer:
+        return logviewer
+    # <profile>/logs/<server> -> <profile>/bin/logViewer.sh
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(logdir))), 'bin', 'logViewer.sh')
+
+
+def query_hpel(args):
+    """Run the query against an HPEL repository with logViewer.sh."""
+    datefmt = '%m/%d/%y %H:%M:%S:000 %Z'
+    command = [logviewer_path(args.logs, args.logviewer), '-repositoryDir', args.logs,
+               '-minLevel', args.level, '-format', 'basic']
+    if args.start != float('-inf'):
+        command += ['-startDate', time.strftime(datefmt, time.localtime(args.start))]
+    if args.stop != float('inf'):
+        command += ['-stopDate', time.strftime(datefmt, time.localtime(args.stop))]
+    if args.thread is not None:
+        command += ['-thread', '%08x' % args.thread]
+    return subprocess.call(command)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query WAS app server logs by time range, level and thread.')
+    parser.add_argument('--logs', required=True, help='app server log directory or HPEL repository, e.g. <profile>/logs/server1')
+    parser.add_argument('--from', dest='start', type=parse_time, default=float('-inf'), help='start time, YYYY-MM-DD HH:MM[:SS]')
+    parser.add_argument('--to', dest='stop', type=parse_time, default=float('inf'), help='end time, YYYY-MM-DD HH:MM[:SS]')
+    parser.add_argument('--level', default='FINEST', type=str.upper, choices=sorted(LEVELS, key=LEVELS.get), help='minimum level')
+    parser.add_argument('--thread', type=lambda t: int(t, 16), help='thread id (hex), e.g. 0000004a')
+    parser.add_argument('--trace', action='store_true', help='query trace.log instead of SystemOut.log and SystemErr.log')
+    parser.add_argument('--logviewer', help='path to logViewer.sh (HPEL only), default <profile>/bin/logViewer.sh')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.logs):
+        sys.exit('LOG DIRECTORY NOT FOUND: %s' % args.logs)
+    if os.path.isdir(os.path.join(args.logs, 'logdata')):
+        sys.exit(query_hpel(args))
+
+    bases = ['trace'] if args.trace else ['SystemOut', 'SystemErr']
+    logs = []
+    for order, base in enumerate(bases):
+        paths = log_files(args.logs, [base], args.start, args.stop)
+        logs.append(query_log(paths, order, args.start, args.stop, LEVELS[args.level], args.thread))
+    count = 0
+    for record in heapq.merge(*logs):
+        sys.stdout.write(record[3])
+        count += 1
+    sys.stderr.write('%d RECORD(S) FOUND.\n' % count)
+
+
+if __name__ == '__main__':
+    main()
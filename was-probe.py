@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+################################################################################
+#
+# NAME:         was-probe.py
+# VERSION:      1.01
+# DESCRIPTION:  Checks that the end points (ports) of one or more WebSphere
+#               Application Server (WAS) processes are accepting connections,
+#               as a fast alternative to ivt.sh and as a gate after restarts
+#               or port changes.
+#
+#               The end points are read from ports files in the format used
+#               by manageprofiles.sh -portsFile and AppServerPortsProps_J27.py
+#               (NAME=port, one per line), e.g. the files written by
+#               wasnd9-profile-dmgr-rhel7.sh and
+#               AppServerPortsProps_wrapper_rhel7.sh.
+#
+#               The end points are probed on --host or, if it is not given,
+#               on the host named by a '# HOST=' line of the ports file (as
+#               added by AppServerPortsProps_wrapper_rhel7.sh), or else on
+#               localhost.
+#
+#               Every end point of every file is probed at the same time:
+#
+#               - a TCP connection is opened to each end point;
+#               - for end points whose name contains 'secure' or 'SSL' a
+#                 TLS handshake is also made (certificates are not
+#                 verified), except for mutual authentication listeners,
+#                 which need a client certificate;
+#               - UDP end points (names containing 'UDP') are skipped.
+#
+#               The time taken by each end point is reported.  All probes
+#               share one total deadline (--timeout), so the check never
+#               takes longer than that, however many end points there are.
+#
+#               The exit code is 0 if every required end point is up, and 1
+#               otherwise.  By default every end point is required; with
+#               --require only the named ones are, and failures of the
+#               others are reported as warnings.
+#
+#               Example:
+#
+#               was-probe.py --host washost01 --timeout 5 \
+#                   --require BOOTSTRAP_ADDRESS --require SOAP_CONNECTOR_ADDRESS \
+#                   /var/tmp/server1.portdef.props /var/tmp/server2.portdef.props
+#
+#               Runs with Python 2.7 (RHEL 7 system Python) or Python 3.
+#
+################################################################################
+
+from __future__ import print_function
+
+import argparse
+import os
+import socket
+import ssl
+import sys
+import threading
+import time
+
+
+def read_ports(path):
+    """Return the (name, port) pairs of a ports file, in file order."""
+    ports = []
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            name, value = line.split('=', 1)
+            if value.strip().isdigit():
+                ports.append((name.strip(), int(value)))
+    return ports
+
+
+def read_host(path):
+    """Return the host named by the '# HOST=' line of a ports file, if any."""
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line.startswith('#') and line[1:].strip().startswith('HOST='):
+                return line[1:].strip()[len('HOST='):].strip() or None
+    return None
+
+
+def probe_mode(name):
+    """Return how to probe an end point: 'skip', 'tls' or 'tcp'."""
+    upper = name.upper()
+    if 'UDP' in upper:
+        return 'skip'
+    if ('SECURE' in upper or 'SSL' in upper) and 'MUTUALAUTH' not in upper:
+        return 'tls'
+    return 'tcp'
+
+
+class Probe(threading.Thread):
+    """Probe of a single end point, run in its own thread."""
+
+    def __init__(self, label, name, host, port, deadline):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.label = label
+        self.name = name
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.mode = probe_mode(name)
+        self.status = 'TIMEOUT'
+        self.detail = ''
+        self.elapsed = None
+
+    def run(self):
+        began = time.time()
+        sock = None
+        try:
+            sock = socket.create_connection((self.host, self.port), max(self.deadline - began, 0.001))
+            if self.mode == 'tls':
+                sock.settimeout(max(self.deadline - time.time(), 0.001))
+                context = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_CLIENT', ssl.PROTOCOL_SSLv23))
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+                sock = context.wrap_socket(sock)
+                self.detail = '%s %s' % (sock.version(), sock.cipher()[0])
+            self.status = 'UP'
+        except socket.timeout:
+            self.status = 'TIMEOUT'
+        except (socket.error, ssl.SSLError, OSError) as err:
+            self.status = 'DOWN'
+            self.detail = str(err)
+        finally:
+            self.elapsed = time.time() - began
+            if sock is not None:
+                sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Probe the end points of WAS processes in parallel.')
+    parser.add_argument('ports_files', nargs='+', help='ports file(s), NAME=port per line')
+    parser.add_argument('--host', help="host to probe, default the ports file's '# HOST=' line, else localhost")
+    parser.add_argument('--timeout', type=float, default=5.0, help='total deadline in seconds, default 5')
+    parser.add_argument('--require', action='append', help='end point that must be up (repeatable), default all')
+    args = parser.parse_args()
+
+    began = time.time()
+    deadline = began + args.timeout
+    probes = []
+    for path in args.ports_files:
+        if not os.path.isfile(path):
+            sys.exit('PORTS FILE NOT FOUND: %s' % path)
+        label = os.path.basename(path).split('.')[0]
+        host = args.host or read_host(path) or 'localhost'
+        for name, port in read_ports(path):
+            probes.append(Probe(label, name, host, port, deadline))
+    for probe in probes:
+        if probe.mode != 'skip':
+            probe.start()
+    for probe in probes:
+        if probe.mode != 'skip':
+            probe.join(max(deadline - time.time(), 0))
+
+    failed = 0
+    print('%-16s %-40s %6s %-4s %-8s %9s  %s' % ('PROCESS', 'END POINT', 'PORT', 'TYPE', 'STATUS', 'TIME', 'DETAIL'))
+    for probe in probes:
+        required = not args.require or probe.name in args.require
+        if probe.mode == 'skip':
+            status = 'SKIPPED'
+        elif probe.status == 'UP' or required:
+            status = probe.status
+        else:
+            status = 'WARN'
+        if required and probe.mode != 'skip' and probe.status != 'UP':
+            failed += 1
+        elapsed = '-' if probe.elapsed is None else '%.1fms' % (probe.elapsed * 1000)
+        print('%-16s %-40s %6d %-4s %-8s %9s  %s' % (probe.label, probe.name, probe.port, probe.mode.upper(),
+                                                      status, elapsed, probe.detail))
+    print('%d REQUIRED END POINT(S) NOT UP, CHECKED IN %.2fs.' % (failed, time.time() - began))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         was-server-start.sh
+# VERSION:      1.01
+# DESCRIPTION:  Start helper for the templated systemd unit was-server@.service
+#               created by was-systemd-unit-create.sh (WAS_TYPE=AppServers).
+#               It is run by systemd as the unit's main process, with the
+#               profile path and the app server name as arguments:
+#
+#               was-server-start.sh /apps/IBM/WebSphere/AppServer/profiles/AppSrv01 server1
+#
+#               The helper:
+#
+#               - waits for one of MAX_PARALLEL start slots (lock files in
+#                 SLOT_DIR), so that no more than MAX_PARALLEL app servers
+#                 start at the same time on the host (0 = no limit);
+#               - runs startServer.sh, which returns once the app server is
+#                 open for e-business, then frees its slot;
+#               - tells systemd the unit is ready (Type=notify), so units
+#                 ordered after it start only once the app server is really
+#                 up, not merely once its process exists;
+#               - stays running while the app server process is alive, so
+#                 systemd notices if the app server dies: the helper then
+#                 exits with a non-zero exit code, and the unit fails
+#                 (and is restarted, if the unit's Restart= allows it).
+#                 An app server restarted outside systemd (by its node
+#                 agent, e.g. from serverConfig_J27.py) within
+#                 RESTART_GRACE seconds is followed instead.
+#
+#               The unit stops the app server through the helper too, with
+#               a third argument, 'stop':
+#
+#               was-server-start.sh /apps/IBM/WebSphere/AppServer/profiles/AppSrv01 server1 stop
+#
+#               which marks the stop as requested (STOP_MARKER) before
+#               running stopServer.sh, so that the end of the app server
+#               process is then not taken for a failure.
+#
+#               If DIAG_SCRIPT (was-diag-capture.sh) is set, it is run when a
+#               start, or a restart followed by the helper, is not open for
+#               e-business within DIAG_AFTER seconds, to capture javacores
+#               and log tails while the app server is still slow.
+#
+#               If STARTTIMELINE (was-starttimeline.py) is set, it is run
+#               once each start, or followed restart, is open for e-business,
+#               to append where its time went to STARTTIMELINE_LOG.
+#
+#               MAX_PARALLEL and SLOT_DIR are normally set in the unit's
+#               EnvironmentFile, /etc/sysconfig/was-server.
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+PROFILE_PATH=$1
+WAS_JVM=$2
+MAX_PARALLEL=${MAX_PARALLEL:=0}
+SLOT_DIR=${SLOT_DIR:=/var/tmp/was-start-slots}
+# Seconds between checks for a free start slot, and that the app server
+# process is still alive:
+SLOT_WAIT=${SLOT_WAIT:=2}
+WATCH_INTERVAL=${WATCH_INTERVAL:=10}
+# Seconds to wait for an ended app server to be restarted by its node agent:
+RESTART_GRACE=${RESTART_GRACE:=120}
+# Diagnostics script run when a start takes longer than DIAG_AFTER seconds
+# (empty = none):
+DIAG_SCRIPT=${DIAG_SCRIPT:=}
+DIAG_AFTER=${DIAG_AFTER:=300}
+# Startup timeline script run after every start (empty = none):
+STARTTIMELINE=${STARTTIMELINE:=}
+STARTTIMELINE_LOG=${STARTTIMELINE_LOG:=/var/tmp/was-starttimeline.log}
+SYSTEMOUT=${PROFILE_PATH}/logs/${WAS_JVM}/SystemOut.log
+PIDFILE=${PROFILE_PATH}/logs/${WAS_JVM}/${WAS_JVM}.pid
+STOP_MARKER=${PROFILE_PATH}/logs/${WAS_JVM}/.systemd-stop
+# END DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+#
+#
+#
+# BEGIN FUNCTION DEFINITIONS
+
+
+# Send a message to systemd.  The sender stays alive for a moment after
+# sending, so that systemd can always tell which unit the message is from:
+sd_notify() {
+  python -c 'import os, socket, sys, time
+addr = os.environ["NOTIFY_SOCKET"]
+if addr.startswith("@"):
+    addr = "\0" + addr[1:]
+sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+sock.sendto(sys.argv[1].encode(), addr)
+time.sleep(1)' "$1"
+}
+
+
+# Wait for a free start slot, holding its lock on file descriptor SLOT_FD:
+take_slot() {
+  if [ "${MAX_PARALLEL}" -le 0 ] ; then
+    return 0
+  fi
+  mkdir -p ${SLOT_DIR}
+  sd_notify "STATUS=Waiting for one of ${MAX_PARALLEL} start slots"
+  while true ; do
+    for n in `seq 1 ${MAX_PARALLEL}` ; do
+      exec {SLOT_FD}>${SLOT_DIR}/slot.${n}
+      if flock -n ${SLOT_FD} ; then
+        return 0
+      fi
+      exec {SLOT_FD}>&-
+    done
+    sleep ${SLOT_WAIT}
+  done
+}
+
+
+# Free the start slot, if one is held:
+free_slot() {
+  if [ -n "${SLOT_FD}" ] ; then
+    exec {SLOT_FD}>&-
+    SLOT_FD=""
+  fi
+}
+
+
+# Check whether the app server has logged that it is open for e-business
+# (WSVR0001I) in SystemOut.log after byte (offset):
+start_opened() {
+  [ "`stat -c %s ${SYSTEMOUT} 2>/dev/null || echo 0`" -lt "${offset}" ] && offset=0
+  tail -c +$(( ${offset} + 1 )) ${SYSTEMOUT} 2>/dev/null | grep -q WSVR0001I
+}
+
+
+# Start a watcher of a start, in the background, until the app server is
+# open for e-business: it then runs STARTTIMELINE, first running
+# DIAG_SCRIPT if that takes more than DIAG_AFTER seconds.  Its process ID
+# is kept in START_WATCH:
+start_watch() {
+  START_WATCH=""
+  if [ "${DIAG_AFTER}" -le 0 ] ; then
+    DIAG_SCRIPT=""
+  fi
+  if [ -z "${DIAG_SCRIPT}" ] && [ -z "${STARTTIMELINE}" ] ; then
+    return 0
+  fi
+  offset=`stat -c %s ${SYSTEMOUT} 2>/dev/null || echo 0`
+  (
+    # Do not hold the start slot lock while waiting:
+    [ -n "${SLOT_FD}" ] && exec {SLOT_FD}>&-
+    waited=0
+    until start_opened ; do
+      sleep ${WATCH_INTERVAL}
+      waited=$(( ${waited} + ${WATCH_INTERVAL} ))
+      if [ -n "${DIAG_SCRIPT}" ] && [ "${waited}" -ge "${DIAG_AFTER}" ] ; then
+        echo "${WAS_JVM} NOT OPEN FOR E-BUSINESS AFTER ${waited}s, CAPTURING DIAGNOSTICS."
+        WAS_JVM=${WAS_JVM} PROFILE_PATH=${PROFILE_PATH} ${DIAG_SCRIPT}
+        DIAG_SCRIPT=""
+      fi
+    done
+    if [ -n "${STARTTIMELINE}" ] ; then
+      ${STARTTIMELINE} --logs ${PROFILE_PATH}/logs/${WAS_JVM} --record ${STARTTIMELINE_LOG}
+    fi
+  ) &
+  START_WATCH=$!
+}
+
+
+# Cancel the watcher and its sleep, unless it is already capturing
+# diagnostics or recording the timeline:
+watch_cancel() {
+  if [ -n "${START_WATCH}" ] ; then
+    sleeper=`pgrep -P ${START_WATCH} -x sleep`
+    kill ${START_WATCH} ${sleeper} 2>/dev/null
+    START_WATCH=""
+  fi
+}
+
+
+# Wait up to RESTART_GRACE seconds for the app server to be restarted by its
+# node agent, setting WAS_PID to the new process ID.  Returns non-zero if it
+# is not restarted, or if the unit is stopping:
+follow_restart() {
+  waited=0
+  while [ "${waited}" -lt "${RESTART_GRACE}" ] && [ ! -f "${STOP_MARKER}" ] ; do
+    NEW_PID=`cat ${PIDFILE} 2>/dev/null`
+    if [ -n "${NEW_PID}" ] && [ "${NEW_PID}" != "${WAS_PID}" ] && kill -0 ${NEW_PID} 2>/dev/null ; then
+      WAS_PID=${NEW_PID}
+      return 0
+    fi
+    sleep ${WATCH_INTERVAL}
+    waited=$(( ${waited} + ${WATCH_INTERVAL} ))
+  done
+  return 1
+}
+
+
+# END FUNCTION DEFINITIONS
+
+################################################################################
+# MAIN
+################################################################################
+
+if [ -z "${PROFILE_PATH}" ] || [ -z "${WAS_JVM}" ] ; then
+  echo "Usage: `basename $0` profile_path server_name"
+  exit 2
+fi
+
+# Stop the app server, marking the stop as requested:
+if [ "$3" = "stop" ] ; then
+  touch ${STOP_MARKER}
+  exec ${PROFILE_PATH}/bin/stopServer.sh ${WAS_JVM}
+fi
+
+rm -f ${STOP_MARKER}
+take_slot
+
+# Start the app server, without passing it the slot lock (which it would
+# otherwise hold for as long as it runs):
+sd_notify "STATUS=Starting ${WAS_JVM}"
+start_watch
+if [ -n "${SLOT_FD}" ] ; then
+  ${PROFILE_PATH}/bin/startServer.sh ${WAS_JVM} {SLOT_FD}>&-
+else
+  ${PROFILE_PATH}/bin/startServer.sh ${WAS_JVM}
+fi
+RC=$?
+free_slot
+if [ "${RC}" -ne 0 ] || [ ! -f "${PIDFILE}" ] ; then
+  watch_cancel
+  echo "${WAS_JVM} FAILED TO START (startServer.sh exit code ${RC})."
+  exit 1
+fi
+
+WAS_PID=`cat ${PIDFILE}`
+sd_notify "READY=1
+STATUS=${WAS_JVM} open for e-business, process id ${WAS_PID}"
+
+# Stay running while the app server is alive, following any restart:
+while true ; do
+  while kill -0 ${WAS_PID} 2>/dev/null ; do
+    sleep ${WATCH_INTERVAL}
+  done
+  watch_cancel
+  follow_restart || break
+  sd_notify "STATUS=${WAS_JVM} restarted outside systemd, process id ${WAS_PID}"
+  start_watch
+done
+watch_cancel
+
+# The app server has ended; it failed unless it was stopped by the unit:
+if [ -f "${STOP_MARKER}" ] ; then
+  rm -f ${STOP_MARKER}
+  exit 0
+fi
+echo "${WAS_JVM} (PROCESS ID ${WAS_PID}) ENDED WITHOUT A STOP REQUEST."
+exit 1
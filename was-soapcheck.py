@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#
+################################################################################
+#
+# NAME:         was-soapcheck.py
+# VERSION:      1.00
+# DESCRIPTION:  Checks that the login of a WebSphere Application Server (WAS)
+#               SOAP client configuration (soap.client.props, or the cached
+#               wsadmin.soap.client.props written by was-soapclient-update.sh)
+#               is accepted by a SOAP connector, without starting a wsadmin
+#               session (and its JVM).
+#
+#               The user, the password (plain or {xor} encoded) and whether
+#               security is enabled are read from the file, and a single
+#               AdminService request (getDefaultDomain) is sent to the SOAP
+#               connector, over HTTPS if security is enabled (certificates
+#               are not verified).  The login is reported as:
+#
+#               - OK, if the request is answered;
+#               - REJECTED, if the connector refuses the user or password;
+#               - UNREACHABLE, if the connector cannot be reached in time.
+#
+#               The time taken and the request timeout set in the file are
+#               also reported.  The exit code is 0 if the login is OK, 1 if
+#               it is rejected and 2 if the connector is unreachable.
+#
+#               Example (8879 is the SOAP port of the Deployment Manager):
+#
+#               was-soapcheck.py --host centos70 --port 8879 \
+#                   --props /apps/IBM/WebSphere/AppServer/profiles/Dmgr01/properties/wsadmin.soap.client.props
+#
+#               Runs with Python 2.7 (RHEL 7 system Python) or Python 3.
+#
+################################################################################
+
+from __future__ import print_function
+
+import argparse
+import base64
+import os
+import re
+import socket
+import ssl
+import sys
+import time
+
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+
+REQUEST = ('<?xml version="1.0" encoding="UTF-8"?>'
+           '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"'
+           ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+           ' xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+           '<SOAP-ENV:Body>'
+           '<ns1:getDefaultDomain xmlns:ns1="urn:AdminService"'
+           ' SOAP-ENV:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"/>'
+           '</SOAP-ENV:Body>'
+           '</SOAP-ENV:Envelope>')
+
+# Markers of a SOAP fault caused by the login rather than by the request:
+LOGIN_FAULTS = ('ADMN0022E', 'SECJ', 'authenticat', 'LoginException')
+
+
+def read_props(path):
+    """Return the properties of a client configuration file as a dict."""
+    props = {}
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            name, value = line.split('=', 1)
+            props[name.strip()] = value.strip()
+    return props
+
+
+def decode_password(value):
+    """Return a password, decoding it if {xor} encoded."""
+    if not value.startswith('{xor}'):
+        return value
+    raw = bytearray(base64.b64decode(value[len('{xor}'):]))
+    return bytes(bytearray(byte ^ ord('_') for byte in raw)).decode('utf-8')
+
+
+def check_login(host, port, secure, user, password, timeout):
+    """Send one AdminService request, returning (status, detail)."""
+    if secure:
+        context = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_CLIENT', ssl.PROTOCOL_SSLv23))
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        connection = httplib.HTTPSConnection(host, port, timeout=timeout, context=context)
+    else:
+        connection = httplib.HTTPConnection(host, port, timeout=timeout)
+    credentials = base64.b64encode(('%s:%s' % (user, password)).encode('utf-8')).decode('ascii')
+    headers = {'Content-Type': 'text/xml; charset=utf-8',
+               'SOAPAction': '"urn:AdminService"',
+               'Authorization': 'Basic ' + credentials}
+    try:
+        try:
+            connection.request('POST', '/', REQUEST, headers)
+            response = connection.getresponse()
+            body = response.read().decode('utf-8', 'replace')
+        except (socket.error, ssl.SSLError, httplib.HTTPException) as err:
+            return 'UNREACHABLE', str(err) or err.__class__.__name__
+    finally:
+        connection.close()
+    if response.status in (401, 403):
+        return 'REJECTED', 'HTTP %d %s' % (response.status, response.reason)
+    fault = re.search(r'<faultstring[^>]*>(.*?)</faultstring>', body, re.S)
+    if fault:
+        detail = ' '.join(fault.group(1).split())
+        if any(marker in detail for marker in LOGIN_FAULTS):
+            return 'REJECTED', detail
+        return 'OK', 'request fault: ' + detail
+    if response.status != 200:
+        return 'UNREACHABLE', 'HTTP %d %s' % (response.status, response.reason)
+    domain = re.search(r'<return[^>]*>(.*?)</return>', body, re.S)
+    return 'OK', 'default domain ' + domain.group(1) if domain else 'answered'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the login of a WAS SOAP client configuration.')
+    parser.add_argument('--props', required=True, help='soap.client.props or cached client configuration')
+    parser.add_argument('--host', default='localhost', help='host of the SOAP connector, default localhost')
+    parser.add_argument('--port', type=int, default=8879, help='SOAP connector port, default 8879')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for the answer, default 30')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.props):
+        sys.exit('CLIENT CONFIGURATION NOT FOUND: %s' % args.props)
+    props = read_props(args.props)
+    user = props.get('com.ibm.SOAP.loginUserid', '')
+    secure = props.get('com.ibm.SOAP.securityEnabled', 'false').lower() == 'true'
+    if secure and not user:
+        sys.exit('NO com.ibm.SOAP.loginUserid IN %s' % args.props)
+    password = decode_password(props.get('com.ibm.SOAP.loginPassword', ''))
+
+    began = time.time()
+    status, detail = check_login(args.host, args.port, secure, user, password, args.timeout)
+    print('LOGIN %s: user %s at %s:%d (%s) in %.2fs - %s.' % (status, user or '(none)', args.host, args.port,
+                                                              'HTTPS' if secure else 'HTTP',
+                                                              time.time() - began, detail))
+    print('REQUEST TIMEOUT %ss, KEEP-ALIVE %s, LOGIN SOURCE %s.' % (
+        props.get('com.ibm.SOAP.requestTimeout', '180'),
+        props.get('com.ibm.ws.management.connector.soap.keepAlive', 'not set'),
+        props.get('com.ibm.SOAP.loginSource', 'not set')))
+    sys.exit({'OK': 0, 'REJECTED': 1}.get(status, 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,8 @@
 #
 ################################################################################
 #
-# NAME:         was-profile-soap-props.sh
-# VERSION:      1.00
+# NAME:         was-soapclient-update.sh
+# VERSION:      1.01
 # DESCRIPTION:  Modifies the soap.client.props file for a WebSphere Application 
 #               Server (WAS) profile so that a specific internal WAs user 
 #               (WAS_OPS_USER) can be used for unprompted run-time operations.
@@ -22,8 +22,28 @@
 #
 #               PROFILE_PATH=/opt/WAS/profiles/AppSrv01 ./was-init.sh 
 #
+#               The same settings can be written to a separate, cached client
+#               configuration for the admin user, SOAP_PROPS_FILE (created
+#               from soap.client.props if missing, and readable by WAS_USER
+#               only), which was-wsadmin.sh then gives to every wsadmin
+#               session of the profile, so that no wrapper passes -username
+#               and -password on the command line, e.g.:
 #
-#               
+#               SOAP_PROPS_FILE=${PROFILE_PATH}/properties/wsadmin.soap.client.props \
+#               WAS_OPS_USER=wasadmin WAS_OPS_PWD=xxxxxxxx ./was-soapclient-update.sh
+#
+#               In either file, the password is encoded, the login source is
+#               set to the properties (never a prompt), the SOAP request
+#               timeout is raised to SOAP_REQUEST_TIMEOUT seconds (the WAS
+#               default of 180 is too short for long calls such as
+#               extractConfigProperties or syncActiveNodes on a large cell),
+#               and the SOAP connection is kept alive between the calls of a
+#               session (SOAP_KEEPALIVE).
+#
+#               With SOAP_ACTION=check, nothing is changed: the login of
+#               SOAP_PROPS_FILE is checked against the SOAP connector at
+#               SOAP_HOST:SOAP_PORT with was-soapcheck.py, which sends a
+#               single SOAP request instead of starting a wsadmin session.
 #
 ################################################################################
 #
@@ -33,6 +53,13 @@ WAS_USER=${WAS_USER:=wbsadm}
 WAS_OPS_USER=${WAS_OPS_USER:=wasops1}
 WAS_OPS_PWD=${WAS_OPS_PWD:=12345678}
 PROFILE_PATH=${PROFILE_PATH:=/apps/IBM/WebSphere/AppServer/profiles/AppSrv01}
+SOAP_PROPS_FILE=${SOAP_PROPS_FILE:=${PROFILE_PATH}/properties/soap.client.props}
+SOAP_REQUEST_TIMEOUT=${SOAP_REQUEST_TIMEOUT:=1800}
+SOAP_KEEPALIVE=${SOAP_KEEPALIVE:=true}
+SOAP_ACTION=${SOAP_ACTION:=update}
+SOAP_HOST=${SOAP_HOST:=localhost}
+SOAP_PORT=${SOAP_PORT:=8879}
+SOAPCHECK_SCRIPT=${SOAPCHECK_SCRIPT:=/scripts/was9/was-soapcheck.py}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -65,26 +92,49 @@ sudo_check() {
 }
 
 
+# Create a cached client configuration (SOAP_PROPS_FILE), if missing, from
+# the profile's soap.client.props, readable by WAS_USER only:
+soap_file_create () {
+  sourceFile="${PROFILE_PATH}/properties/soap.client.props"
+  if [ ! -f ${SOAP_PROPS_FILE} ] ; then
+    if [ ! -f ${sourceFile} ] ; then
+      abort "${sourceFile} NOT FOUND, ABORTING SCRIPT."
+    fi
+    ${SUDO} su - ${WAS_USER} -c "umask 077 && cp ${sourceFile} ${SOAP_PROPS_FILE}" || \
+      abort "PROBLEM CREATING FILE ${SOAP_PROPS_FILE}, ABORTING SCRIPT."
+    printf "=> FILE ${SOAP_PROPS_FILE} CREATED FROM ${sourceFile}.\n" | tee -a ${LOG}
+  fi
+}
+
+
 # Update soap.client.props file, if found ,with desired changes.
 soap_file_update () {
-  targetFile="${PROFILE_PATH}/properties/soap.client.props"
-  backupFile="${PROFILE_PATH}/properties/soap.client.props_${SCRIPTNAME}.bak"
+  targetFile="${SOAP_PROPS_FILE}"
+  backupFile="${SOAP_PROPS_FILE}_${SCRIPTNAME}.bak"
   # First check file exists and make a backup if found:
   if [ ! -f ${targetFile} ] ; then
     abort "${targetFile} NOT FOUND, ABORTING SCRIPT."
   else
     ${SUDO} su - ${WAS_USER} -c "cp -p ${targetFile} ${backupFile}"
   fi
-  # Now make required changes to file, rollback if any changes fail:
+  # Now make required changes to file, rollback if any changes fail (the
+  # keep-alive property is not in the default file, so is added if missing):
   ${SUDO} su - ${WAS_USER} -c \
   "sed -i -e 's/^com.ibm.SOAP.securityEnabled=.*/com.ibm.SOAP.securityEnabled=true/' \
           -e 's/^com.ibm.SOAP.loginUserid=.*/com.ibm.SOAP.loginUserid=${WAS_OPS_USER}/' \
           -e 's/^com.ibm.SOAP.loginPassword=.*/com.ibm.SOAP.loginPassword=${WAS_OPS_PWD}/' \
-             ${targetFile}"
+          -e 's/^com.ibm.SOAP.loginSource=.*/com.ibm.SOAP.loginSource=properties/' \
+          -e 's/^com.ibm.SOAP.requestTimeout=.*/com.ibm.SOAP.requestTimeout=${SOAP_REQUEST_TIMEOUT}/' \
+          -e 's/^com.ibm.ws.management.connector.soap.keepAlive=.*/com.ibm.ws.management.connector.soap.keepAlive=${SOAP_KEEPALIVE}/' \
+             ${targetFile} && \
+   { grep -q '^com.ibm.ws.management.connector.soap.keepAlive=' ${targetFile} || \
+     echo 'com.ibm.ws.management.connector.soap.keepAlive=${SOAP_KEEPALIVE}' >> ${targetFile} ; }"
   if [ "$?" -eq 0 ] ; then
     ${SUDO} su - ${WAS_USER} -c \
     "${PROFILE_PATH}/bin/PropFilePasswordEncoder.sh ${targetFile} com.ibm.SOAP.loginPassword" > /dev/null 2>&1
     if [ "$?" -eq 0 ] ; then
+      # The encoder's own backup holds the plain text password:
+      ${SUDO} su - ${WAS_USER} -c "rm -f ${targetFile}.bak && chmod go-rwx ${targetFile} ${backupFile}"
       printf "=> FILE ${targetFile} UPDATED SUCCESSFULLY!\n\n" | tee -a ${LOG}
     else
       ${SUDO} su - ${WAS_USER} -c "mv ${backupFile} ${targetFile}"
@@ -97,7 +147,31 @@ soap_file_update () {
 }
 
 
+# Check the login of the client configuration against the SOAP connector,
+# without starting a wsadmin session:
+soap_login_check () {
+  if [ ! -f ${SOAPCHECK_SCRIPT} ] ; then
+    abort "${SOAPCHECK_SCRIPT} NOT FOUND, ABORTING SCRIPT."
+  fi
+  ${SUDO} su - ${WAS_USER} -c "python ${SOAPCHECK_SCRIPT} --props ${SOAP_PROPS_FILE} --host ${SOAP_HOST} --port ${SOAP_PORT}" | tee -a ${LOG}
+  if [ "${PIPESTATUS[0]}" -ne 0 ] ; then
+    abort "LOGIN OF ${SOAP_PROPS_FILE} FAILED AT ${SOAP_HOST}:${SOAP_PORT}."
+  fi
+}
+
+
 # MAIN
 sudo_check
-soap_file_update
+case "${SOAP_ACTION}" in
+  update)
+    soap_file_create
+    soap_file_update
+    ;;
+  check)
+    soap_login_check
+    ;;
+  *)
+    abort "UNKNOWN SOAP_ACTION ${SOAP_ACTION}, USE update OR check."
+    ;;
+esac
 
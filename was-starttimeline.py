@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+#
+################################################################################
+#
+# NAME:         was-starttimeline.py
+# VERSION:      1.00
+# DESCRIPTION:  Shows where the time went during the most recent start of a
+#               WebSphere Application Server (WAS) app server, node agent or
+#               deployment manager.
+#
+#               The most recent start is found by reading the SystemOut.log
+#               backwards from its end, so the size of the log does not
+#               matter.  For a server using High Performance Extensible
+#               Logging (HPEL), the profile's logViewer.sh is asked for the
+#               latest server instance only.
+#
+#               The start is then broken down by message ID into a timeline
+#               of milestones, the duration of each phase:
+#
+#               jvm       process start (server .pid file) to first log record
+#               runtime   first log record (TRAS0017I) to admin service
+#                         (ADMN0015I)
+#               security  admin service to security initialised (SECJ0243I)
+#               apps      first application starting (WSVR0200I) to last
+#                         application started (WSVR0221I)
+#               channels  first to last transport chain started (TCPC0001I,
+#                         CHFW0019I)
+#               total     process start to open for e-business (WSVR0001I)
+#
+#               and the start time of every application (WSVR0200I to
+#               WSVR0221I) and web module (SRVE0169I to SRVE0250I).
+#
+#               With --record, the phase durations are also appended as one
+#               line to a file, so every restart leaves a record of where
+#               its time went.  was-systemd-unit-create.sh can add this
+#               script as an ExecStartPost command for this purpose, or, for
+#               the was-server@ units, have their start helper
+#               (was-server-start.sh) run it after every start, including
+#               restarts by the node agent.
+#
+#               Example:
+#
+#               was-starttimeline.py --logs /apps/IBM/WebSphere/AppServer/profiles/AppSrv01/logs/server1
+#
+#               Runs with Python 2.7 (RHEL 7 system Python) or Python 3.
+#
+################################################################################
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+# Size of each read when searching backwards for the most recent start:
+BLOCK_SIZE = 65536
+
+# Line written at the start of every server start:
+START_MARKER = b'************ Start Display Current Environment ************'
+
+# Text log record, e.g.
+# [10/19/26 13:45:12:345 BST] 00000001 WsServerImpl  A   WSVR0001I: Server server1 open for e-business
+RECORD = re.compile(br'^\[(\d+)/(\d+)/(\d+) (\d+):(\d+):(\d+):(\d+) [^\]]*\] [0-9a-fA-F]+ \S+\s+\S\s+([A-Z]{4}\d{4}[IWE]):?\s*(.*)$')
+
+# Messages naming an application or web module, and how to get the name:
+APP_STARTING = re.compile(r'Starting application: (\S+)')
+APP_STARTED = re.compile(r'Application started: (\S+)')
+MODULE_LOADING = re.compile(r'Loading Web Module: (.+?)\.?$')
+MODULE_BOUND = re.compile(r'Web Module (.+?) has been bound')
+
+# Phases: name, message IDs (or 'pid') of the first and last milestones:
+PHASES = [
+    ('jvm', ['pid'], ['TRAS0017I']),
+    ('runtime', ['TRAS0017I'], ['ADMN0015I']),
+    ('security', ['ADMN0015I'], ['SECJ0243I']),
+    ('apps', ['WSVR0200I'], ['WSVR0221I']),
+    ('channels', ['TCPC0001I', 'CHFW0019I'], ['TCPC0001I', 'CHFW0019I']),
+    ('total', ['pid', 'TRAS0017I'], ['WSVR0001I']),
+]
+
+# Message IDs shown in the timeline:
+MILESTONES = set(m for phase in PHASES for m in phase[1] + phase[2])
+
+
+def latest_start(path):
+    """Return the offset of the most recent start marker in a text log,
+    reading backwards from the end, or 0 if there is none."""
+    handle = open(path, 'rb')
+    try:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        carry = b''
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            handle.seek(position)
+            data = handle.read(size) + carry
+            found = data.rfind(START_MARKER)
+            if found >= 0:
+                return position + found
+            # Keep enough of this block to find a marker split across blocks:
+            carry = data[:len(START_MARKER)]
+        return 0
+    finally:
+        handle.close()
+
+
+def text_records(path):
+    """Yield the records of the most recent start in a text log."""
+    handle = open(path, 'rb')
+    try:
+        handle.seek(latest_start(path))
+        for line in handle:
+            yield line
+    finally:
+        handle.close()
+
+
+def hpel_records(logdir, logviewer):
+    """Yield the records of the latest server instance in an HPEL
+    repository."""
+    if not logviewer:
+        # <profile>/logs/<server> -> <profile>/bin/logViewer.sh
+        logviewer = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(logdir))), 'bin', 'logViewer.sh')
+    process = subprocess.Popen([logviewer, '-repositoryDir', logdir, '-latestInstance', '-format', 'basic'],
+                               stdout=subprocess.PIPE)
+    for line in process.stdout:
+        yield line
+    process.wait()
+
+
+def timeline(records):
+    """Return the milestones (message ID -> [first, last] time), and the
+    application and web module start times, of a server start."""
+    milestones = {}
+    events = []
+    apps = {}
+    modules = {}
+    for line in records:
+        match = RECORD.match(line.rstrip())
+        if not match:
+            continue
+        mon, day, year, hour, mins, secs, msecs = [int(g) for g in match.groups()[:7]]
+        stamp = time.mktime((2000 + year, mon, day, hour, mins, secs, 0, 0, -1)) + msecs / 1000.0
+        msgid = match.group(8).decode('ascii')
+        text = match.group(9).decode('latin-1')
+        if msgid in MILESTONES:
+            if msgid not in milestones:
+                milestones[msgid] = [stamp, stamp]
+                events.append((stamp, msgid, text))
+            milestones[msgid][1] = stamp
+        for pattern, table, index in ((APP_STARTING, apps, 0), (APP_STARTED, apps, 1),
+                                      (MODULE_LOADING, modules, 0), (MODULE_BOUND, modules, 1)):
+            found = pattern.search(text)
+            if found:
+                table.setdefault(found.group(1), [None, None])[index] = stamp
+        if msgid == 'WSVR0001I':
+            break
+    return milestones, events, apps, modules
+
+
+def phases(milestones):
+    """Return the duration in seconds of each phase, or None where a
+    milestone is missing."""
+    result = []
+    for name, firsts, lasts in PHASES:
+        first = [milestones[m][0] for m in firsts if m in milestones]
+        last = [milestones[m][1] for m in lasts if m in milestones]
+        if first and last:
+            result.append((name, round(max(last) - min(first), 3)))
+        else:
+            result.append((name, None))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the startup timeline of the most recent start of a WAS server.')
+    parser.add_argument('--logs', required=True, help='server log directory or HPEL repository, e.g. <profile>/logs/server1')
+    parser.add_argument('--logviewer', help='path to logViewer.sh (HPEL only), default <profile>/bin/logViewer.sh')
+    parser.add_argument('--record', help='append the phase durations to this file')
+    parser.add_argument('--json', action='store_true', help='write the timeline as JSON')
+    args = parser.parse_args()
+
+    server = os.path.basename(os.path.normpath(args.logs))
+    if os.path.isdir(os.path.join(args.logs, 'logdata')):
+        records = hpel_records(args.logs, args.logviewer)
+    elif os.path.isfile(os.path.join(args.logs, 'SystemOut.log')):
+        records = text_records(os.path.join(args.logs, 'SystemOut.log'))
+    else:
+        sys.exit('NO SystemOut.log OR HPEL REPOSITORY FOUND IN %s' % args.logs)
+    milestones, events, apps, modules = timeline(records)
+    if not events:
+        sys.exit('NO SERVER START FOUND IN %s' % args.logs)
+
+    # The .pid file is written when the process starts, before any logging:
+    pidfile = os.path.join(args.logs, server + '.pid')
+    if os.path.isfile(pidfile) and os.path.getmtime(pidfile) <= events[0][0]:
+        milestones['pid'] = [os.path.getmtime(pidfile)] * 2
+        events.insert(0, (milestones['pid'][0], 'pid', 'Process started (%s)' % pidfile))
+    durations = phases(milestones)
+    started = 'WSVR0001I' in milestones
+
+    if args.record:
+        with open(args.record, 'a') as handle:
+            handle.write('%d %s %s %s\n' % (events[0][0], server, 'STARTED' if started else 'INCOMPLETE',
+                                            ' '.join('%s=%s' % (n, '-' if d is None else d) for n, d in durations)))
+
+    if args.json:
+        json.dump({'server': server, 'started': started,
+                   'phases': dict(durations),
+                   'milestones': [{'time': t, 'id': m, 'text': x} for t, m, x in events],
+                   'applications': dict((a, None if None in t else round(t[1] - t[0], 3)) for a, t in apps.items()),
+                   'web_modules': dict((w, None if None in t else round(t[1] - t[0], 3)) for w, t in modules.items())},
+                  sys.stdout, indent=2, sort_keys=True)
+        print()
+        return
+
+    origin = events[0][0]
+    print('STARTUP TIMELINE FOR %s, %s%s' % (server, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(origin)),
+                                              '' if started else ' (NOT OPEN FOR E-BUSINESS)'))
+    for stamp, msgid, text in events:
+        print('  +%8.3fs  %-10s %s' % (stamp - origin, msgid, text[:100]))
+    print('PHASES:')
+    for name, duration in durations:
+        print('  %-10s %s' % (name, '-' if duration is None else '%.3fs' % duration))
+    for title, table in (('APPLICATIONS', apps), ('WEB MODULES', modules)):
+        if table:
+            print('%s:' % title)
+            for name, (first, last) in sorted(table.items(), key=lambda item: -((item[1][1] or 0) - (item[1][0] or 0))):
+                print('  %-40s %s' % (name, '-' if None in (first, last) else '%.3fs' % (last - first)))
+
+
+if __name__ == '__main__':
+    main()
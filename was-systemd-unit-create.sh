@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         was-systemd-unit-create.sh
-# VERSION:      1.00
+# VERSION:      1.05
 # DESCRIPTION:  Creates systemd services for WebSphere 
 #               Application Server (WAS) instances on Red Hat Enterprise 
 #               Linux 7 (RHEL7).
@@ -16,6 +16,8 @@
 #               DeploymentManager
 #               NodeAgent
 #               AppServer
+#               AppServers
+#               LogHousekeep
 #
 #               It will then create service names 'was-dmgr', 'was-nodeagent' or  
 #               'was_appsvr' (where 'appsvr' is the name of the particular WAS 
@@ -28,6 +30,46 @@
 #               Suggested default values for all constants and variables are 
 #               given throughout this script.
 #
+#               AppServers creates a single template unit, was-server@.service,
+#               and enables an instance of it (was-server@appsvr) for every app
+#               server listed in WAS_JVMS, with a single daemon-reload.  The
+#               instances start in parallel once the node agent is up, through
+#               the was-server-start.sh helper (START_HELPER), which limits the
+#               number of app servers starting at the same time to
+#               MAX_PARALLEL (0 = no limit), and reports each one ready to
+#               systemd (Type=notify) only once it is open for e-business.
+#               MAX_PARALLEL can later be changed in /etc/sysconfig/was-server
+#               without recreating the units.  The helper also stops the app
+#               server, so an app server ending without a stop request fails
+#               its unit; set WAS_RESTART=on-failure to have systemd restart
+#               it then (default no).
+#
+#               The helper runs was-diag-capture.sh (DIAG_SCRIPT, empty = not
+#               at all), as WAS_USER, when a start or restart of an app server
+#               is not open for e-business within DIAG_AFTER seconds, to
+#               capture javacores and log tails while it is still hung; keep
+#               DIAG_AFTER well below START_TIMEOUT, after which systemd
+#               kills the app server.  A failed app server unit also starts
+#               was-diag-capture@appsvr.service (OnFailure=), which collects
+#               the log tails.  Both can later be changed in
+#               /etc/sysconfig/was-server.
+#
+#               LogHousekeep creates the service was-log-housekeep, which runs
+#               was-log-housekeep.sh (HOUSEKEEP_SCRIPT) at the lowest CPU and
+#               I/O priority, and a timer running it every HOUSEKEEP_CALENDAR
+#               (a systemd calendar event, default hourly), to compress, index
+#               and expire the rotated logs of every profile on the host.  Its
+#               settings (LOG_RETAIN_DAYS, LOG_MAX_MB, ...) can be changed in
+#               /etc/sysconfig/was-log-housekeep without recreating the units.
+#
+#               OPTIONAL: If STARTTIMELINE is set to the full path of the 
+#               was-starttimeline.py script, the unit runs it after every 
+#               start (ExecStartPost) to append where the start time went 
+#               to the file STARTTIMELINE_LOG.  For the was-server@ units
+#               the helper runs it instead, so that restarts made outside
+#               systemd (by the node agent, e.g. from serverConfig_J27.py)
+#               are recorded too.
+#
 #               NOTE: The systemd unit files created do not use internal WAS 
 #               usernames/passwords for the 'stop' and 'status' commands.  This 
 #               is because these are assumed to be already securely embedded 
@@ -50,6 +92,16 @@
 # BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
 WAS_USER=${WAS_USER:=wbsadm}
 WAS_TYPE=${WAS_TYPE:=AppServer}
+STARTTIMELINE=${STARTTIMELINE:=}
+STARTTIMELINE_LOG=${STARTTIMELINE_LOG:=/var/tmp/was-starttimeline.log}
+START_HELPER=${START_HELPER:=/scripts/was9/was-server-start.sh}
+MAX_PARALLEL=${MAX_PARALLEL:=0}
+START_TIMEOUT=${START_TIMEOUT:=900}
+WAS_RESTART=${WAS_RESTART:=no}
+DIAG_SCRIPT=${DIAG_SCRIPT:=/scripts/was9/was-diag-capture.sh}
+DIAG_AFTER=${DIAG_AFTER:=300}
+HOUSEKEEP_SCRIPT=${HOUSEKEEP_SCRIPT:=/scripts/was9/was-log-housekeep.sh}
+HOUSEKEEP_CALENDAR=${HOUSEKEEP_CALENDAR:=hourly}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -89,6 +141,13 @@ sudo_check() {
 # to start and stop.
 was_systemd_unit_create() {
 #
+# Optionally record the startup timeline after every start ('-' ignores
+# any failure of the timeline script):
+EXECSTARTPOST=""
+if [ -n "${STARTTIMELINE}" ] ; then
+  EXECSTARTPOST="ExecStartPost=-${STARTTIMELINE} --logs ${PROFILE_PATH}/logs/${WAS_JVM} --record ${STARTTIMELINE_LOG}"
+fi
+#
 ${SUDO} touch /etc/systemd/system/${WAS_SERVICE}.service
 ${SUDO} chmod 664 /etc/systemd/system/${WAS_SERVICE}.service
 #
@@ -101,6 +160,7 @@ After=network.target remote-fs.target nss-lookup.target ${WAS_DEPENDENCY}
 Type=forking
 ExecStart=${PROFILE_PATH}/bin/${STARTCMD}
 ExecStop=${PROFILE_PATH}/bin/${STOPCMD}
+${EXECSTARTPOST}
 User=${WAS_USER}
 PIDFile=${PROFILE_PATH}/logs/${WAS_JVM}/${WAS_JVM}.pid
 TimeoutSec=300
@@ -120,6 +180,139 @@ fi
 
 }
 
+# Function to create the systemd template unit for app servers, its
+# environment file and diagnostics capture unit, and enable an instance for
+# each app server in WAS_JVMS.
+# NOTE: The start timeout (START_TIMEOUT) includes any time spent waiting
+# for a start slot.
+was_systemd_template_create() {
+#
+${SUDO} touch /etc/systemd/system/${WAS_SERVICE}@.service
+${SUDO} chmod 664 /etc/systemd/system/${WAS_SERVICE}@.service
+#
+${SUDO} cat > /etc/systemd/system/${WAS_SERVICE}@.service << EOF
+[Unit]
+Description=WebSphere Application Server (WAS) app server %i.
+After=network.target remote-fs.target nss-lookup.target ${WAS_DEPENDENCY}
+Wants=${WAS_DEPENDENCY}
+OnFailure=was-diag-capture@%i.service
+
+[Service]
+Type=notify
+NotifyAccess=all
+Environment=DIAG_SCRIPT=${DIAG_SCRIPT} DIAG_AFTER=${DIAG_AFTER}
+Environment=STARTTIMELINE=${STARTTIMELINE} STARTTIMELINE_LOG=${STARTTIMELINE_LOG}
+EnvironmentFile=-/etc/sysconfig/${WAS_SERVICE}
+ExecStart=${START_HELPER} ${PROFILE_PATH} %i
+ExecStop=${START_HELPER} ${PROFILE_PATH} %i stop
+User=${WAS_USER}
+Restart=${WAS_RESTART}
+RestartSec=30
+TimeoutStartSec=${START_TIMEOUT}
+TimeoutStopSec=300
+
+[Install]
+WantedBy=default.target
+EOF
+#
+${SUDO} touch /etc/systemd/system/was-diag-capture@.service
+${SUDO} chmod 664 /etc/systemd/system/was-diag-capture@.service
+#
+${SUDO} cat > /etc/systemd/system/was-diag-capture@.service << EOF
+[Unit]
+Description=Capture diagnostics of WebSphere Application Server (WAS) app server %i.
+
+[Service]
+Type=oneshot
+Environment=DIAG_SCRIPT=${DIAG_SCRIPT}
+EnvironmentFile=-/etc/sysconfig/${WAS_SERVICE}
+Environment=WAS_USER=${WAS_USER} PROFILE_PATH=${PROFILE_PATH} WAS_JVM=%i WAS_SERVICE=${WAS_SERVICE}@%i
+ExecStart=/bin/sh -c '[ -z "\${DIAG_SCRIPT}" ] || exec \${DIAG_SCRIPT}'
+User=${WAS_USER}
+Nice=10
+EOF
+#
+if [ ! -f /etc/sysconfig/${WAS_SERVICE} ] ; then
+${SUDO} cat > /etc/sysconfig/${WAS_SERVICE} << EOF
+# Maximum number of WAS app servers starting at the same time (0 = no limit):
+MAX_PARALLEL=${MAX_PARALLEL}
+# Diagnostics script run when an app server start is not open for e-business
+# within DIAG_AFTER seconds, or its unit fails (empty = none):
+DIAG_SCRIPT=${DIAG_SCRIPT}
+DIAG_AFTER=${DIAG_AFTER}
+EOF
+fi
+#
+${SUDO} systemctl daemon-reload
+INSTANCES=""
+for jvm in ${WAS_JVMS} ; do
+  INSTANCES="${INSTANCES} ${WAS_SERVICE}@${jvm}.service"
+done
+${SUDO} systemctl enable ${INSTANCES}
+if [ "$?" -eq 0 ] ; then
+  printf "\n\n=> WAS SYSTEMD SERVICES${INSTANCES} CREATED SUCCESSFULLY.\n\n" | tee -a ${LOG}
+else
+  abort "A PROBLEM OCCURRED CREATING THE SYSTEMD SERVICES${INSTANCES}."
+fi
+
+}
+
+# Function to create the log housekeeping service, run at the lowest CPU and
+# I/O priority, its environment file, and the timer that runs it.
+was_systemd_timer_create() {
+#
+${SUDO} touch /etc/systemd/system/${WAS_SERVICE}.service /etc/systemd/system/${WAS_SERVICE}.timer
+${SUDO} chmod 664 /etc/systemd/system/${WAS_SERVICE}.service /etc/systemd/system/${WAS_SERVICE}.timer
+#
+${SUDO} cat > /etc/systemd/system/${WAS_SERVICE}.service << EOF
+[Unit]
+Description=WebSphere Application Server (WAS) log housekeeping.
+After=local-fs.target remote-fs.target
+
+[Service]
+Type=oneshot
+EnvironmentFile=-/etc/sysconfig/${WAS_SERVICE}
+ExecStart=${HOUSEKEEP_SCRIPT}
+User=${WAS_USER}
+Nice=19
+IOSchedulingClass=idle
+EOF
+#
+${SUDO} cat > /etc/systemd/system/${WAS_SERVICE}.timer << EOF
+[Unit]
+Description=Run WebSphere Application Server (WAS) log housekeeping ${HOUSEKEEP_CALENDAR}.
+
+[Timer]
+OnCalendar=${HOUSEKEEP_CALENDAR}
+AccuracySec=5min
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+EOF
+#
+if [ ! -f /etc/sysconfig/${WAS_SERVICE} ] ; then
+${SUDO} cat > /etc/sysconfig/${WAS_SERVICE} << EOF
+# Settings of ${HOUSEKEEP_SCRIPT} (see its DESCRIPTION):
+PROFILES_DIR=${PROFILES_DIR}
+# Retention of logs without a --retainlogs setting, in days:
+LOG_RETAIN_DAYS=14
+# Maximum size of the rotated logs of each server, in MB (0 = no limit):
+LOG_MAX_MB=2048
+FFDC_RETAIN_DAYS=14
+EOF
+fi
+#
+${SUDO} systemctl daemon-reload
+${SUDO} systemctl enable ${WAS_SERVICE}.timer && ${SUDO} systemctl start ${WAS_SERVICE}.timer
+if [ "$?" -eq 0 ] ; then
+  printf "\n\n=> WAS SYSTEMD TIMER ${WAS_SERVICE}.timer CREATED SUCCESSFULLY.\n\n" | tee -a ${LOG}
+else
+  abort "A PROBLEM OCCURRED CREATING THE SYSTEMD TIMER, ${WAS_SERVICE}.timer."
+fi
+
+}
+
 #### MAIN ####
  
 sudo_check
@@ -161,6 +354,22 @@ case "${WAS_TYPE}" in
     # Execute function:
     was_systemd_unit_create
     ;;
+  AppServers)
+    # Specify settings for all the app servers of a node here:
+    PROFILE_PATH=${PROFILE_PATH:=/apps/IBM/WebSphere/AppServer/profiles/AppSrv01}
+    WAS_JVMS=${WAS_JVMS:=server1}
+    WAS_SERVICE=was-server
+    WAS_DEPENDENCY=was-nodeagent.service
+    # Execute function:
+    was_systemd_template_create
+    ;;
+  LogHousekeep)
+    # Specify log housekeeping settings here:
+    PROFILES_DIR=${PROFILES_DIR:=/apps/IBM/WebSphere/AppServer/profiles}
+    WAS_SERVICE=was-log-housekeep
+    # Execute function:
+    was_systemd_timer_create
+    ;;
   *)
     abort "WAS_TYPE not correctly set."
 esac
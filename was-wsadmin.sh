@@ -0,0 +1,140 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         was-wsadmin.sh
+# VERSION:      1.00
+# DESCRIPTION:  Runs a WebSphere Application Server (WAS) wsadmin Jython
+#               session as WAS_USER, logging in with the cached, encoded
+#               client configuration of the profile (WSADMIN_PROPS) rather
+#               than with -username and -password on the command line.  It is
+#               used by the *_wrapper.sh scripts, and takes the same options
+#               as wsadmin.sh, e.g.:
+#
+#               was-wsadmin.sh -f /scripts/was9/clusterWeights_J27.py --cluster Cluster01
+#
+#               The cached client configuration is created, once per profile,
+#               with was-soapclient-update.sh, for the WAS admin user:
+#
+#               SOAP_PROPS_FILE=${PROFILE_PATH}/properties/wsadmin.soap.client.props \
+#               WAS_OPS_USER=wasadmin WAS_OPS_PWD=xxxxxxxx ./was-soapclient-update.sh
+#
+#               It also sets the SOAP request timeout and keep-alive, so long
+#               calls such as extractConfigProperties or syncActiveNodes no
+#               longer time out.  The password never appears in the process
+#               list or in the wrappers.
+#
+#               By default wsadmin connects to the Deployment Manager of the
+#               profile.  To run from another machine, set PROFILE_NAME to the
+#               local profile holding the cached client configuration, and
+#               WSADMIN_HOST and WSADMIN_PORT to the Deployment Manager's host
+#               and SOAP port, e.g.:
+#
+#               PROFILE_NAME=AppSrv01 WSADMIN_HOST=centos70 WSADMIN_PORT=8879 \
+#               ./was-wsadmin.sh -f /scripts/was9/createClusterMember_J27.py ...
+#
+#               Set WSADMIN_ACTION=check to only check that the cached login
+#               is accepted, with was-soapcheck.py, without starting a
+#               wsadmin session.
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+WAS_USER=${WAS_USER:=wbsadm}
+WAS_ROOT=${WAS_ROOT:=/apps/IBM/WebSphere/AppServer}
+PROFILE_NAME=${PROFILE_NAME:=Dmgr01}
+PROFILE_PATH=${PROFILE_PATH:=${WAS_ROOT}/profiles/${PROFILE_NAME}}
+WSADMIN_PROPS=${WSADMIN_PROPS:=${PROFILE_PATH}/properties/wsadmin.soap.client.props}
+WSADMIN_HOST=${WSADMIN_HOST:=}
+WSADMIN_PORT=${WSADMIN_PORT:=8879}
+WSADMIN_ACTION=${WSADMIN_ACTION:=run}
+SOAPCHECK_SCRIPT=${SOAPCHECK_SCRIPT:=/scripts/was9/was-soapcheck.py}
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+
+
+# BEGIN FUNCTION DEFINITIONS
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Check if sudo required:
+sudo_check() {
+  uid=`id | /bin/sed -e 's;^.*uid=;;' -e 's;\([0-9]\)(.*;\1;'`
+  if [ "$uid" = "0" ] ; then
+    SUDO=" "
+  else
+    SUDO=`which sudo 2>/dev/null`
+    if [ -z "${SUDO}" ] ; then
+      abort "SUDO NOT FOUND."
+    fi
+  fi
+}
+
+
+# Run a command (given as arguments) as WAS_USER, quoting each argument:
+run_as_was_user() {
+  if [ "`id -un`" = "${WAS_USER}" ] ; then
+    "$@"
+  else
+    sudo_check
+    ${SUDO} su - ${WAS_USER} -c "`printf '%q ' "$@"`"
+  fi
+}
+
+
+# Check the cached client configuration exists:
+props_check() {
+  if [ ! -f "${WSADMIN_PROPS}" ] ; then
+    abort "${WSADMIN_PROPS} NOT FOUND, CREATE IT WITH was-soapclient-update.sh."
+  fi
+}
+
+
+# Run wsadmin with the cached client configuration and the given options:
+wsadmin_run() {
+  CONNECTION="-conntype SOAP"
+  if [ -n "${WSADMIN_HOST}" ] ; then
+    CONNECTION="${CONNECTION} -host ${WSADMIN_HOST} -port ${WSADMIN_PORT}"
+  fi
+  run_as_was_user ${PROFILE_PATH}/bin/wsadmin.sh -lang jython ${CONNECTION} \
+    -profileName ${PROFILE_NAME} -javaoption "-Dcom.ibm.SOAP.ConfigURL=file:${WSADMIN_PROPS}" "$@"
+}
+
+
+# Check the cached login without starting a wsadmin session:
+wsadmin_check() {
+  run_as_was_user python ${SOAPCHECK_SCRIPT} --props ${WSADMIN_PROPS} \
+    --host ${WSADMIN_HOST:-localhost} --port ${WSADMIN_PORT}
+}
+
+
+# END FUNCTION DEFINITIONS
+
+
+########################################################################
+# MAIN
+########################################################################
+
+props_check
+case "${WSADMIN_ACTION}" in
+  run)
+    wsadmin_run "$@"
+    ;;
+  check)
+    wsadmin_check
+    ;;
+  *)
+    abort "UNKNOWN WSADMIN_ACTION ${WSADMIN_ACTION}, USE run OR check."
+    ;;
+esac
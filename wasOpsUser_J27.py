@@ -4,7 +4,7 @@
 #          exclusively for managing run-time operations. Using such an
 #          account, with the bare-minimum of required privileges, is considered
 #          more secure than using an account with higher-level privileges.
-# VERSION: 1.0
+# VERSION: 1.1
 #   NOTES: This script first creates a group and user in the default
 #          o=defaultWIMFileBasedRealm internal file repository. The user is
 #          added to the group, before the group itself is assigned the 
@@ -14,8 +14,34 @@
 #          found under the section  "Global constants used in this script".
 #          The user parameters, on the other hand, must be specified
 #          on the script's command line.  These are: the username (--id), 
-#          password (-password), common name (--commoname) and surname 
-#          (--surname) of the user you wish to create. 
+#          common name (--commoname) and surname (--surname) of the user you
+#          wish to create.  Its password is read with --credentials (see
+#          below), from a file or from standard input, so that it does not
+#          appear in the process list.  --passphrase password, on the
+#          command line, is kept only as a fallback.
+#
+#          BULK MODE:
+#          ----------
+#          Many users can be set up in one wsadmin session with --file,
+#          naming a CSV or JSON (*.json) list of users.  A CSV file has one
+#          user per line, as: uid,common_name,surname[,group;group...]
+#          (lines starting with # are ignored), and a JSON file holds a list
+#          of objects with the keys uid, cn, sn and optionally groups.  Users
+#          without groups are added to the group above.
+#
+#          Passwords are not given on the command line in bulk mode; they are
+#          read with --credentials from a file, or from standard input if
+#          given as '-', with one uid:password line per user.  A line
+#          *:password gives the initial password of any user not listed.
+#          The same --credentials option gives the password of a single
+#          --id user.
+#
+#          The existing users and groups are each read with one search, and
+#          the members of each group and the groups of the role with one call
+#          each.  Only the missing users and groups are then created, the
+#          missing members added, and the unmapped groups mapped to the role
+#          in one call, so the script can be rerun safely.  The configuration
+#          is saved once, and only if something changed.
 #
 #          NOTE:
 #          -----
@@ -26,11 +52,9 @@
 #          CAVEAT:
 #          -------
 #          Currently, only basic exception handling is built into this script, 
-#          e.g. it will simply exit if an exception is encountered. This might 
-#          be because a user, group, etc, may already exist. However, this 
-#          script is only really intended for use during the initial build 
-#          phase of a WAS installation, so such groups/users are not 
-#          anticipated to exist anyway.
+#          e.g. it will simply exit if an exception is encountered.  Users,
+#          groups, members and role mappings that already exist are skipped,
+#          but existing users are not updated (e.g. their passwords).
 #
 # 
 #          After changes are made, the configuration is saved and any active 
@@ -53,12 +77,17 @@
 import getopt
 import sys
 import os
+import csv
+import re
 
 
 # Global constants used in this script:
 groupcn = 'wasops'
 groupdesc = 'WAS Operators Group'
 adminrole = 'operator'
+realm = 'defaultWIMFileBasedRealm'
+# Maximum number of users or groups returned by a search:
+searchLimit = '100000'
 
 
 
@@ -67,8 +96,15 @@ def usage():
     print
     print """This script must be used with the command-line syntax: 
   
-    wasOpsUser.py --id username --passphrase password --commoname first_name --surname surname
+    wasOpsUser.py --id username --commoname first_name --surname surname --credentials credentials_file|-
 
+    or, to set up many users, with their passwords read from a file (or from
+    standard input, with '-'):
+
+    wasOpsUser.py --file users.csv|users.json --credentials credentials_file|-
+
+    (--passphrase password may replace --credentials for a single user, but
+    shows the password in the process list.)
     """
 #endDef
 
@@ -76,17 +112,17 @@ def usage():
 # Function gets required command-line arguments & processes accordingly:
 def get_args() :
     # Make args parameters global for use outside of this function:
-    global userid, passwd, cname, sname
+    global userid, passwd, cname, sname, usersfile, credfile
     # Some parameters require initial defaults:
+    userid = ''
+    passwd = ''
+    cname = ''
+    sname = ''
+    usersfile = ''
+    credfile = ''
     try:
         shortForm = ""
-        longForm = ["id=", "passphrase=", "commoname=", "surname="]
-        argCount = len( sys.argv[0:])
-        if ( argCount < 8 ) :
-            print "ERROR - Minimum no. of required command-line options have not been specified."
-            usage()
-            os._exit(2)
-        #endIf
+        longForm = ["id=", "passphrase=", "commoname=", "surname=", "file=", "credentials="]
         opts, args = getopt.getopt(sys.argv[0:], shortForm, longForm)
     except getopt.GetoptError,  err:
         # Print usage before exiting:
@@ -105,17 +141,158 @@ def get_args() :
             cname  = val
         elif flag == '--surname':
             sname = val
+        elif flag == '--file':
+            usersfile = val
+        elif flag == '--credentials':
+            credfile = val
         else:
             usage()
             os._exit(2)
         #endIf
     #endFor
+    if usersfile:
+        if userid or passwd or not credfile:
+            print "ERROR - --file requires --credentials, and cannot be used with --id or --passphrase."
+            usage()
+            os._exit(2)
+        #endIf
+    elif not ( userid and cname and sname and ( passwd or credfile ) ):
+        print "ERROR - Minimum no. of required command-line options have not been specified."
+        usage()
+        os._exit(2)
+    #endIf
+#endDef
+
+
+# Function to read the list of users from a CSV or JSON file, as a list of
+# dictionaries with the keys uid, cn, sn and groups:
+def readUsers( path ):
+    try:
+        f = open( path )
+        try:
+            if path.lower().endswith( '.json' ):
+                import json
+                entries = json.load( f )
+            else:
+                entries = []
+                for row in csv.reader( f ):
+                    if not row or not row[0].strip() or row[0].strip().startswith( '#' ):
+                        continue
+                    #endIf
+                    row = row + [ '', '', '' ]
+                    entries.append( { 'uid': row[0], 'cn': row[1], 'sn': row[2], 'groups': row[3].split( ';' ) } )
+                #endFor
+            #endIf
+        finally:
+            f.close()
+        #endTry
+    except:
+        # Report exception type and exception message if exception raised:
+        print
+        print "\nUNEXPECTED ERROR READING", path, ":", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    #endTry
+    users = []
+    seen = {}
+    for entry in entries:
+        uid = str( entry.get( 'uid', '' ) ).strip()
+        cn = str( entry.get( 'cn', '' ) ).strip()
+        sn = str( entry.get( 'sn', '' ) ).strip()
+        groups = [ str( g ).strip() for g in entry.get( 'groups' ) or [] if str( g ).strip() ] or [ groupcn ]
+        if not uid or not cn or not sn:
+            print "ERROR - USER ENTRY WITHOUT uid, cn OR sn IN", path, ":", entry
+            os._exit(1)
+        #endIf
+        if seen.has_key( uid.lower() ):
+            print "ERROR - USER", uid, "LISTED TWICE IN", path
+            os._exit(1)
+        #endIf
+        seen[ uid.lower() ] = 1
+        users.append( { 'uid': uid, 'cn': cn, 'sn': sn, 'groups': groups } )
+    #endFor
+    print "USERS READ FROM", path, ":", len( users )
+    return users
+#endDef
+
+
+# Function to read uid:password lines from a file, or standard input ('-'):
+def readCredentials( path ):
+    creds = {}
+    try:
+        if path == '-':
+            lines = sys.stdin.readlines()
+        else:
+            f = open( path )
+            lines = f.readlines()
+            f.close()
+        #endIf
+    except:
+        print
+        print "\nUNEXPECTED ERROR READING CREDENTIALS:", sys.exc_info()[0], sys.exc_info()[1]
+        os._exit(1)
+    #endTry
+    lineNo = 0
+    for line in lines:
+        lineNo = lineNo + 1
+        line = line.rstrip( '\r\n' )
+        if not line.strip() or line.startswith( '#' ):
+            continue
+        #endIf
+        if line.find( ':' ) < 1:
+            # Do not print the line, it may hold a password:
+            print "ERROR - CREDENTIALS LINE", lineNo, "NOT IN uid:password FORMAT."
+            os._exit(1)
+        #endIf
+        uid, password = line.split( ':', 1 )
+        creds[ uid.strip().lower() ] = password
+    #endFor
+    return creds
+#endDef
+
+
+# Function to read the existing users, as a dictionary of unique names keyed
+# by lower-case uid, with one search:
+def existingUsers():
+    found = {}
+    for name in AdminTask.searchUsers( ['-uid', '*', '-limit', searchLimit] ).splitlines():
+        match = re.match( r'(?i)uid=([^,]+),', name.strip() )
+        if match:
+            found[ match.group(1).lower() ] = name.strip()
+        #endIf
+    #endFor
+    return found
+#endDef
+
+
+# Function to read the existing groups, as a dictionary of unique names
+# keyed by lower-case cn, with one search:
+def existingGroups():
+    found = {}
+    for name in AdminTask.searchGroups( ['-cn', '*', '-limit', searchLimit] ).splitlines():
+        match = re.match( r'(?i)cn=([^,]+),', name.strip() )
+        if match:
+            found[ match.group(1).lower() ] = name.strip()
+        #endIf
+    #endFor
+    return found
+#endDef
+
+
+# Function to read the members of a group, as a dictionary keyed by
+# lower-case unique name:
+def groupMembers( group ):
+    members = {}
+    for name in AdminTask.getMembersOfGroup( ['-groupUniqueName', group] ).splitlines():
+        if name.strip():
+            members[ name.strip().lower() ] = 1
+        #endIf
+    #endFor
+    return members
 #endDef
 
 
 # Function to create group.
 def createGroup( grpcn, grpdesc ):
-    global grpfqdn
     try:
         grpfqdn = AdminTask.createGroup(['-cn', grpcn, '-description', grpdesc])
     except:
@@ -126,12 +303,12 @@ def createGroup( grpcn, grpdesc ):
     else:
         print "GROUP CREATED:", grpfqdn
     #endTry
+    return grpfqdn
 #endDef
 
 
 # Function to create user.
 def createUser( username, password, commonname, surname ):
-    global userfqdn
     try:
         userfqdn = AdminTask.createUser(['-uid', username, '-password', password, '-cn', commonname, '-sn', surname ])
     except:
@@ -142,6 +319,7 @@ def createUser( username, password, commonname, surname ):
     else:
         print "USER CREATED:", userfqdn
     #endTry
+    return userfqdn
 #endDef
 
 
@@ -155,15 +333,28 @@ def addToGroup( user, group ):
         print "\nUNEXPECTED ERROR: ", sys.exc_info()[0], sys.exc_info()[1]
         os._exit(1)
     else:
-        print "USER ADDED TO GROUP", group, ":", addResult 
+        print "USER", user, "ADDED TO GROUP", group, ":", addResult 
     #endTry
 #endDef
 
 
-# Function to assign role to group.
-def groupRoleMap( group, realm = 'defaultWIMFileBasedRealm' ):
+# Function to check whether a group (cn) is mapped to the role, given the
+# groups listed for the role:
+def roleMapped( grpcn, roleGroups ):
+    return re.search( r'(?i)(^|[\[\s,=])' + re.escape( grpcn ) + r'([\]\s,]|$)', roleGroups ) != None
+#endDef
+
+
+# Function to assign role to a list of groups, in one call.
+def groupRoleMap( groups ):
     # First construct string for configuration:
-    roleConfig = '[-roleName ' + adminrole + ' -accessids [group:' + realm + '/' + group + ' ] -groupids [' + group[3:] + ' ]]'
+    accessids = ''
+    groupids = ''
+    for group in groups:
+        accessids = accessids + 'group:' + realm + '/' + group + ' '
+        groupids = groupids + group[3:] + ' '
+    #endFor
+    roleConfig = '[-roleName ' + adminrole + ' -accessids [' + accessids + '] -groupids [' + groupids + ']]'
     try:
         roleResult = AdminTask.mapGroupsToAdminRole( roleConfig )
     except:
@@ -173,7 +364,7 @@ def groupRoleMap( group, realm = 'defaultWIMFileBasedRealm' ):
         os._exit(1)
     else:
         if roleResult:
-            print "GROUP", group, "ASSIGNED TO ROLE:", adminrole
+            print "GROUP(S)", ', '.join( groups ), "ASSIGNED TO ROLE:", adminrole
         else:
             print "ROLE ASSIGNMENT FAILED, EXITING...."
             os._exit(1)
@@ -213,20 +404,115 @@ def main():
     # First get command-line arguments: 
     get_args()
 
-    # Create Group:
-    createGroup( groupcn, groupdesc ) 
+    # Users to set up, and their passwords:
+    if usersfile:
+        users = readUsers( usersfile )
+    else:
+        users = [ { 'uid': userid, 'cn': cname, 'sn': sname, 'groups': [ groupcn ] } ]
+    #endIf
+    creds = {}
+    if credfile:
+        creds = readCredentials( credfile )
+    #endIf
+    if passwd:
+        creds[ userid.lower() ] = passwd
+    #endIf
+
+    # Existing users and groups, one search each:
+    userNames = existingUsers()
+    groupNames = existingGroups()
 
-    # Create User:
-    createUser( userid, passwd, cname, sname )
+    # Every new user needs a password before anything is changed:
+    missing = []
+    for user in users:
+        uid = user['uid'].lower()
+        if not userNames.has_key( uid ) and not creds.has_key( uid ) and not creds.has_key( '*' ):
+            missing.append( user['uid'] )
+        #endIf
+    #endFor
+    if missing:
+        print "ERROR - NO PASSWORD FOR NEW USER(S):", ', '.join( missing )
+        os._exit(1)
+    #endIf
+
+    changes = 0
 
-    # Add User to Group:
-    addToGroup( userfqdn, grpfqdn )
+    # Create Groups:
+    groups = []
+    for user in users:
+        for grp in user['groups']:
+            if grp not in groups:
+                groups.append( grp )
+            #endIf
+        #endFor
+    #endFor
+    newGroups = {}
+    for grp in groups:
+        if groupNames.has_key( grp.lower() ):
+            print "GROUP EXISTS:", groupNames[ grp.lower() ]
+        else:
+            groupNames[ grp.lower() ] = createGroup( grp, groupdesc )
+            newGroups[ grp.lower() ] = 1
+            changes = changes + 1
+        #endIf
+    #endFor
+
+    # Create Users:
+    created = 0
+    for user in users:
+        uid = user['uid'].lower()
+        if userNames.has_key( uid ):
+            print "USER EXISTS:", userNames[ uid ]
+        else:
+            password = creds.get( uid, creds.get( '*' ) )
+            userNames[ uid ] = createUser( user['uid'], password, user['cn'], user['sn'] )
+            created = created + 1
+        #endIf
+    #endFor
+    changes = changes + created
+
+    # Add Users to Groups, reading the members of each group once:
+    added = 0
+    for grp in groups:
+        grpfqdn = groupNames[ grp.lower() ]
+        if newGroups.has_key( grp.lower() ):
+            members = {}
+        else:
+            members = groupMembers( grpfqdn )
+        #endIf
+        for user in users:
+            userfqdn = userNames[ user['uid'].lower() ]
+            if grp in user['groups'] and not members.has_key( userfqdn.lower() ):
+                addToGroup( userfqdn, grpfqdn )
+                added = added + 1
+            #endIf
+        #endFor
+    #endFor
+    changes = changes + added
+
+    # Assign Role to the Groups not yet mapped to it:
+    roleGroups = AdminTask.listGroupsForAdminRole( '[-roleName ' + adminrole + ']' )
+    unmapped = []
+    for grp in groups:
+        if roleMapped( grp, roleGroups ):
+            print "GROUP", grp, "ALREADY ASSIGNED TO ROLE:", adminrole
+        else:
+            unmapped.append( groupNames[ grp.lower() ] )
+        #endIf
+    #endFor
+    if unmapped:
+        groupRoleMap( unmapped )
+        changes = changes + 1
+    #endIf
 
-    # Assign Role to Group:
-    groupRoleMap( grpfqdn )
+    print "USERS:", created, "CREATED,", len( users ) - created, "EXISTING;", added, "GROUP MEMBERSHIP(S) ADDED."
 
-    # Save configuration:
-    saveConfig()  
+    # Save configuration, once, if anything changed:
+    if changes:
+        saveConfig()  
+    else:
+        print "NO CHANGES MADE."
+    #endIf
 
     # Sync any active nodes:
     # No need, as no nodes exist at this stage!
@@ -1,12 +1,24 @@
 #!/bin/bash
 
-# Run wsadmin Jython script:
+# Run wsadmin Jython script (logged in by was-wsadmin.sh with the cached
+# client configuration of the Dmgr01 profile):
 
-/apps/IBM/WebSphere/AppServer/profiles/Dmgr01/bin/wsadmin.sh -lang jython -profileName Dmgr01 -username wasadmin -password 12345678 -f /scripts/was9/wasOpsUser_J27.py --id wasops1 --passphrase 12345678  --commoname was --surname ops1
+# The password is read from standard input (a wasops1:password line), not
+# from the command line:
+/scripts/was9/was-wsadmin.sh -f /scripts/was9/wasOpsUser_J27.py --id wasops1 --commoname was --surname ops1 --credentials - < /scripts/was9/opsusers.cred
 
+# Or, to set up all the users listed in a CSV or JSON file in one session,
+# with their passwords (uid:password lines) read from standard input:
+#/scripts/was9/was-wsadmin.sh -f /scripts/was9/wasOpsUser_J27.py --file /scripts/was9/opsusers.csv --credentials - < /scripts/was9/opsusers.cred
 
-# Restart of DMGR required:
-/apps/IBM/WebSphere/AppServer/profiles/Dmgr01/bin/stopManager.sh -username wasadmin -password 12345678
-sleep 5
+
+# Restart of DMGR required.  It is stopped through was-wsadmin.sh, so no
+# password is passed on the command line, then started once its process has
+# ended:
+/scripts/was9/was-wsadmin.sh -c "AdminControl.invoke(AdminControl.queryNames('WebSphere:type=Server,processType=DeploymentManager,*'), 'stop')"
+PIDFILE=/apps/IBM/WebSphere/AppServer/profiles/Dmgr01/logs/dmgr/dmgr.pid
+while [ -f ${PIDFILE} ] && kill -0 `cat ${PIDFILE}` 2>/dev/null ; do
+  sleep 2
+done
 /apps/IBM/WebSphere/AppServer/profiles/Dmgr01/bin/startManager.sh
 
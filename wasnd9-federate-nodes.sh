@@ -0,0 +1,209 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         wasnd9-federate-nodes.sh
+# VERSION:      1.01
+# DESCRIPTION:  Script to create the custom profiles of many nodes in parallel
+#               and federate them into a WAS 9 cell, as fast as the Deployment
+#               Manager allows.
+#
+#               The nodes are listed in NODES_FILE, one per line, as the host
+#               name followed optionally by the profile name and port offset,
+#               e.g.:
+#
+#               # host       profile    port_offset
+#               washost01    AppSrv01   0
+#               washost02    AppSrv01   0
+#
+#               For each node, at the same time, the script runs
+#               wasnd9-profile-custom-rhel7.sh (CUSTOM_SCRIPT) on the host with
+#               FEDERATE=defer, which creates the profile without federating
+#               it.  As each profile is created, the node is federated by
+#               running the same script with FEDERATE=only.  Federation is
+#               gated, because the Deployment Manager federates nodes one at a
+#               time, and times out if too many queue up:
+#
+#               - at most FED_PARALLEL nodes are federated at the same time;
+#               - a failed federation is retried up to FED_RETRIES times,
+#                 waiting FED_BACKOFF seconds before the first retry and twice
+#                 as long before each further one (plus a random delay, so
+#                 that the retries of several nodes do not coincide).
+#
+#               If PROFILE_ARCHIVE is set, the profiles are cloned from that
+#               golden profile archive (see wasnd9-profile-golden.sh), which
+#               must be present at the same path on each host.
+#
+#               The commands are run on each host by RUN_ON (ssh by default,
+#               which requires key-based access to the hosts), or locally if
+#               RUN_ON=local, e.g. for testing.  The output of each node is
+#               kept in WORK_DIR/<host>.<profile>.log, and the create and federation
+#               durations of every node are reported at the end (the
+#               federation duration includes any wait for a slot).
+#
+#               The exit code is the number of nodes not federated.
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment,
+#               for example:
+#
+#               NODES_FILE=/scripts/was9/nodes.txt FED_PARALLEL=3 ./wasnd9-federate-nodes.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+NODES_FILE=${NODES_FILE:=/scripts/was9/nodes.txt}
+CUSTOM_SCRIPT=${CUSTOM_SCRIPT:=/scripts/was9/wasnd9-profile-custom-rhel7.sh}
+DMGR_HOSTNAME=${DMGR_HOSTNAME:=centos70}
+DMGR_IPADDRESS=${DMGR_IPADDRESS:=192.168.99.19}
+DMGR_PORT=${DMGR_PORT:=8879}
+RUN_ON=${RUN_ON:=ssh -o BatchMode=yes}
+PROFILE_ARCHIVE=${PROFILE_ARCHIVE:=}
+FED_PARALLEL=${FED_PARALLEL:=2}
+FED_RETRIES=${FED_RETRIES:=3}
+FED_BACKOFF=${FED_BACKOFF:=30}
+WORK_DIR=${WORK_DIR:=/var/tmp/wasnd9-federate-nodes}
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+#
+#
+#
+# BEGIN FUNCTION DEFINITIONS
+
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Run the custom profile script on a host ($1) with the given FEDERATE
+# mode ($2), profile name ($3) and port offset ($4):
+run_custom() {
+  command="FEDERATE=$2 PROFILE_NAME=$3 PORT_OFFSET=$4 PROFILE_ARCHIVE=${PROFILE_ARCHIVE} DMGR_HOSTNAME=${DMGR_HOSTNAME} DMGR_IPADDRESS=${DMGR_IPADDRESS} DMGR_PORT=${DMGR_PORT} ${CUSTOM_SCRIPT}"
+  if [ "${RUN_ON}" = "local" ] ; then
+    bash -c "${command}"
+  else
+    ${RUN_ON} $1 "${command}"
+  fi
+}
+
+
+# Wait for one of FED_PARALLEL federation slots, holding its lock on file
+# descriptor SLOT_FD:
+take_slot() {
+  while true ; do
+    for n in `seq 1 ${FED_PARALLEL}` ; do
+      exec {SLOT_FD}>${WORK_DIR}/slot.${n}
+      if flock -n ${SLOT_FD} ; then
+        return 0
+      fi
+      exec {SLOT_FD}>&-
+    done
+    sleep 2
+  done
+}
+
+
+# Create and federate one node (host $1, profile $2, port offset $3), and
+# record the result in WORK_DIR/<host>.<profile>.result as:
+# host create_secs create_rc federate_secs federate_rc attempts
+node_onboard() {
+  host=$1
+  nodelog=${WORK_DIR}/$1.$2.log
+  began=`date +%s`
+  run_custom ${host} defer $2 $3 > ${nodelog} 2>&1
+  createRc=$?
+  createSecs=$(( `date +%s` - began ))
+  fedSecs=0
+  fedRc=1
+  attempt=0
+  if [ "${createRc}" -eq 0 ] ; then
+    backoff=${FED_BACKOFF}
+    began=`date +%s`
+    while [ "${attempt}" -le "${FED_RETRIES}" ] ; do
+      attempt=$(( ${attempt} + 1 ))
+      take_slot
+      echo "=== FEDERATION ATTEMPT ${attempt} `date` ===" >> ${nodelog}
+      run_custom ${host} only $2 $3 >> ${nodelog} 2>&1 {SLOT_FD}>&-
+      fedRc=$?
+      exec {SLOT_FD}>&-
+      if [ "${fedRc}" -eq 0 ] || [ "${attempt}" -gt "${FED_RETRIES}" ] ; then
+        break
+      fi
+      sleep $(( ${backoff} + ${RANDOM} % (${backoff} / 2 + 1) ))
+      backoff=$(( ${backoff} * 2 ))
+    done
+    fedSecs=$(( `date +%s` - began ))
+  fi
+  echo "${host} ${createSecs} ${createRc} ${fedSecs} ${fedRc} ${attempt}" > ${WORK_DIR}/$1.$2.result
+}
+
+
+# Print the create and federation results of every node:
+report() {
+  failed=0
+  printf "\n%-24s %-12s %10s %-8s %10s %-8s %8s\n" NODE PROFILE CREATE_SECS CREATE FED_SECS FEDERATE ATTEMPTS | tee -a ${LOG}
+  while read host profile offset ; do
+    if [ -f ${WORK_DIR}/${host}.${profile}.result ] ; then
+      read h createSecs createRc fedSecs fedRc attempts < ${WORK_DIR}/${host}.${profile}.result
+    else
+      createSecs=- ; createRc=1 ; fedSecs=- ; fedRc=1 ; attempts=0
+    fi
+    [ "${createRc}" -eq 0 ] && createStatus=OK || createStatus=FAILED
+    if [ "${createRc}" -ne 0 ] ; then
+      fedStatus=SKIPPED
+    elif [ "${fedRc}" -eq 0 ] ; then
+      fedStatus=OK
+    else
+      fedStatus=FAILED
+    fi
+    [ "${fedRc}" -eq 0 ] || failed=$(( ${failed} + 1 ))
+    printf "%-24s %-12s %10s %-8s %10s %-8s %8s\n" ${host} ${profile} ${createSecs} ${createStatus} ${fedSecs} ${fedStatus} ${attempts} | tee -a ${LOG}
+  done < ${WORK_DIR}/nodes
+  printf "\n=> ${failed} node(s) not federated, see the logs in ${WORK_DIR}.\n\n" | tee -a ${LOG}
+  return ${failed}
+}
+
+
+# END FUNCTION DEFINITIONS
+
+################################################################################
+# MAIN
+################################################################################
+echo STARTING SCRIPT ON: | tee ${LOG}
+date | tee -a ${LOG}
+echo "============================" | tee -a ${LOG}
+echo "" | tee -a ${LOG}
+
+if [ ! -f "${NODES_FILE}" ] ; then
+  abort "Nodes file ${NODES_FILE} not found."
+fi
+mkdir -p ${WORK_DIR} || abort "Cannot create ${WORK_DIR}."
+rm -f ${WORK_DIR}/*.result ${WORK_DIR}/*.log
+
+# Nodes, without comments and blank lines, with defaults filled in:
+sed -e 's/#.*//' ${NODES_FILE} | awk 'NF { print $1, ($2 ? $2 : "AppSrv01"), ($3 ? $3 : 0) }' > ${WORK_DIR}/nodes
+
+while read host profile offset ; do
+  printf "=> Onboarding node ${host} (profile ${profile}, port offset ${offset}).\n" | tee -a ${LOG}
+  node_onboard ${host} ${profile} ${offset} < /dev/null &
+done < ${WORK_DIR}/nodes
+wait
+
+report
+RC=$?
+
+echo "============================" | tee -a ${LOG}
+echo ENDING SCRIPT ON: | tee -a ${LOG}
+date | tee -a ${LOG}
+
+exit ${RC}
@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         wasnd9-install-rhel7.sh
-# VERSION:      1.00
+# VERSION:      1.04
 # DESCRIPTION:	Script to silently install IBM WebSphere Application Server
 #               Network Deployment 9.0 binaries on RHEL 7.x platform.
 #               Also includes necessary preparation of the platform prior to 
@@ -20,6 +20,30 @@
 #               conjunction withe the master password file specified by the
 #               IIM_MASTER constant.
 #
+#               The installation runs as a sequence of phases (checks, hosts,
+#               user settings, repository checks, parent directory, install
+#               and verify).  Each completed phase is recorded in the state
+#               file STATE_FILE, so if the script fails (e.g. the repository
+#               is unreachable or imcl fails part way), rerunning it resumes
+#               at the first incomplete phase instead of starting again.  A
+#               recorded phase is only skipped if its result is still in
+#               place (e.g. the hosts entry exists, the packages are
+#               installed), otherwise it is run again.  Every phase can be
+#               safely rerun.  The state file is discarded if IIM_MODE,
+#               WAS_ROOT or the package IDs change, and RESET=1 forces a full
+#               rerun.  The time taken by each phase is printed at the end.
+#
+#               The package listings of the repository and of the installed
+#               packages are each fetched from imcl once, and saved under
+#               IMCL_CACHE_DIR, where all the package checks read them.  A
+#               saved listing is reused (including by later scripts and
+#               reruns on the same host) for IMCL_CACHE_AGE minutes, and the
+#               installed package listing is discarded before installing.
+#
+#               If IIM_MIRRORS lists one or more local mirrors of the
+#               repository (HTTP URLs or directories, see iim-repo-mirror.sh),
+#               the first that can be reached is used instead of WAS_REPO.
+#
 ################################################################################
 #
 #
@@ -29,7 +53,7 @@ IIM_MODE=${IIM_MODE:=nonAdmin}
 IIM_GROUP=${IIM_GROUP:=wbsadm}
 IIM_USER=${IIM_USER:=wbsadm}
 IIM_MASTER=${IIM_MASTER:=/scripts/was9/master_password.txt}
-IIM_SECURE_STORAGE:=${IIM_SECURE_STORAGE:=/scripts/was9/credential.store}
+IIM_SECURE_STORAGE=${IIM_SECURE_STORAGE:=/scripts/was9/credential.store}
 WAS_GROUP=${IIM_GROUP}
 WAS_USER=${IIM_USER}
 WAS_SHELL=${WAS_SHELL:=/bin/bash}
@@ -37,15 +61,21 @@ WAS_FILES_SOFT=${WAS_FILES_SOFT:=8192}
 WAS_FILES_HARD=${WAS_FILES_HARD:=16384}
 WAS_CORE_SOFT=${WAS_CORE_SOFT:=unlimited}
 WAS_CORE_HARD=${WAS_CORE_HARD:=unlimited}
+WAS_LIMITS=/etc/security/limits.d/90-was-${WAS_USER}.conf
 WAS_FS=${WAS_FS:=/apps}
 WAS_SPACE=${WAS_SPACE:=2}
 WAS_NIC=${WAS_NIC:=enp0s3}
 WAS_REPO=${WAS_REPO:=https://repo.iim.test/repo/composite/}
+IIM_MIRRORS=${IIM_MIRRORS:=/apps/IBM/iim-mirror}
 WAS_PKGID=${WAS_PKGID:=com.ibm.websphere.ND.v90_9.0.4.20170523_1327}
 SDK_PKGID=${SDK_PKGID:=com.ibm.java.jdk.v8_8.0.4070.20170629_1222}
 WAS_ROOT=${WAS_ROOT:=/apps/IBM/WebSphere/AppServer}
 WAS_RESPONSE=${WAS_RESPONSE:=/scripts/was9/was9nd-sdk8_install_response_v1.01.xml}
 WAS_LOG=${WAS_LOG:=/var/tmp/was9-install_log.xml}
+STATE_FILE=${STATE_FILE:=/var/tmp/wasnd9-install.state}
+RESET=${RESET:=0}
+IMCL_CACHE_DIR=${IMCL_CACHE_DIR:=/var/tmp/imcl-cache}
+IMCL_CACHE_AGE=${IMCL_CACHE_AGE:=60}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -79,16 +109,27 @@ sudo_check() {
 }
 
 
+# Check whether /etc/hosts maps the host name to its IPv4 address:
+hosts_done() {
+  hostName=`hostname`
+  ip4Address=`ip -4 -o addr show ${WAS_NIC} | awk '{print $4}' | cut -d/ -f1`
+  grep "^${ip4Address} ${hostName}$" /etc/hosts > /dev/null 2>&1
+}
+
+
 # Ensure valid entry exists in /etc/hosts
 hosts_check() {
+  # Nothing to do if the entry already exists (e.g. on a rerun):
+  if hosts_done ; then
+    printf "=> Entry ${ip4Address} ${hostName} already in /etc/hosts.\n\n" | tee -a ${LOG}
+    return 0
+  fi
   # Backup /etc/hosts file:
   ${SUDO} /bin/cp -p /etc/hosts /etc/hosts.`date +%F_%H_%M_%S`
   # First remove any possible hostname mappings to loopback addresses:
-  hostName=`hostname`
   ${SUDO} sed -i -e "/^127/ s/${hostName}//g" /etc/hosts
   ${SUDO} sed -i -e "/^::1/ s/${hostName}//g" /etc/hosts
   # Add entry after any detected loopback addresses, else beginning of file:
-  ip4Address=`ip -4 -o addr show ${WAS_NIC} | awk '{print $4}' | cut -d/ -f1`
   if grep ^::1 /etc/hosts > /dev/null 2>&1 
   then
     ${SUDO} sed -i -e "/^::1/ a ${ip4Address} ${hostName}" /etc/hosts
@@ -172,6 +213,14 @@ user_check() {
 }
 
 
+# Append a line (specified by $1) to a file ($2), unless already there:
+line_add() {
+  if ! ${SUDO} grep -qxF "$1" "$2" 2>/dev/null ; then
+    echo "$1" | ${SUDO} tee -a "$2"
+  fi
+}
+
+
 # Define properties for WAS user.
 user_settings() {
   # First determine home directory of WAS user.
@@ -180,17 +229,18 @@ user_settings() {
   then
     # Set recommended umask 022, except for IIM Group mode:
     if [ ! ${IIM_MODE} = "Group" ] ; then
-      echo "umask 022" | ${SUDO} tee -a "${WAS_HOME}/.bashrc"
+      line_add "umask 022" "${WAS_HOME}/.bashrc"
     fi
     # Define Firefox browser location if exists:
     if [ -f /usr/bin/firefox ] ; then
-      echo "export BROWSER=/usr/bin/firefox" | ${SUDO} tee -a "${WAS_HOME}/.bashrc"
+      line_add "export BROWSER=/usr/bin/firefox" "${WAS_HOME}/.bashrc"
     fi
-    # Set recommended resource limits for user:
-    ${SUDO} sed -i -e "/End of file/ i ${WAS_USER} soft nofile ${WAS_FILES_SOFT}" /etc/security/limits.conf
-    ${SUDO} sed -i -e "/End of file/ i ${WAS_USER} hard nofile ${WAS_FILES_HARD}" /etc/security/limits.conf
-    ${SUDO} sed -i -e "/End of file/ i ${WAS_USER} soft core ${WAS_CORE_SOFT}" /etc/security/limits.conf
-    ${SUDO} sed -i -e "/End of file/ i ${WAS_USER} hard core ${WAS_CORE_HARD}" /etc/security/limits.conf
+    # Set recommended resource limits for user in a drop-in file, removing
+    # any set in limits.conf by earlier versions of this script (higher limits
+    # for busy hosts are set by wasnd9-tune-rhel7.sh):
+    ${SUDO} sed -i -r -e "/^${WAS_USER} (soft|hard) (nofile|core) /d" /etc/security/limits.conf
+    printf "%s\n" "${WAS_USER} soft nofile ${WAS_FILES_SOFT}" "${WAS_USER} hard nofile ${WAS_FILES_HARD}" \
+      "${WAS_USER} soft core ${WAS_CORE_SOFT}" "${WAS_USER} hard core ${WAS_CORE_HARD}" | ${SUDO} tee ${WAS_LIMITS} > /dev/null
     printf "=> WAS user settings updated.\n\n" | tee -a ${LOG}
   else
     abort "WAS user home directory not found.\n\n"
@@ -222,14 +272,63 @@ xdgmenus_reset() {
 }
 
 
+# Save the output of an imcl command (the arguments) as a listing named
+# IMCL_LISTING in IMCL_CACHE_DIR, unless one less than IMCL_CACHE_AGE
+# minutes old is already there.  Listings are named after the first
+# argument and a checksum of the whole command, e.g.
+# listInstalledPackages.1234567890, so that each repository and IIM
+# installation has its own:
+imcl_listing() {
+  listKey=`echo "${IIM_USER} ${IIM_PATH} $*" | cksum | cut -d' ' -f1`
+  IMCL_LISTING=${IMCL_CACHE_DIR}/$1.${listKey}
+  if [ -n "`find ${IMCL_LISTING} -mmin -${IMCL_CACHE_AGE} 2>/dev/null`" ] ; then
+    return 0
+  fi
+  mkdir -p ${IMCL_CACHE_DIR} || return 1
+  ${SUDO} su - ${IIM_USER} -c "${IIM_PATH}/eclipse/tools/imcl $*" > ${IMCL_LISTING}.$$ 2>/dev/null
+  if [ "$?" -eq 0 ] ; then
+    mv -f ${IMCL_LISTING}.$$ ${IMCL_LISTING}
+  else
+    rm -f ${IMCL_LISTING}.$$
+    return 1
+  fi
+}
+
+
+# Discard the saved installed package listings (before installing):
+imcl_listing_clear() {
+  rm -f ${IMCL_CACHE_DIR}/listInstalledPackages.*
+}
+
+
+# Use the first reachable repository mirror in IIM_MIRRORS, if any, as WAS_REPO:
+repo_select() {
+  for mirror in ${IIM_MIRRORS} ; do
+    case "${mirror}" in
+      http://*|https://*)
+        curl -s -f -k -o /dev/null --max-time 5 "${mirror%/}/repository.config" ;;
+      *)
+        [ -f "${mirror}/repository.config" ] ;;
+    esac
+    if [ "$?" -eq 0 ] ; then
+      WAS_REPO=${mirror}
+      printf "=> Installing from repository mirror ${WAS_REPO}.\n\n" | tee -a ${LOG}
+      return 0
+    fi
+  done
+  printf "=> Installing from repository ${WAS_REPO}.\n\n" | tee -a ${LOG}
+}
+
+
 # Check package (specified by $1) is available for installation from IIM Repository WAS_REPO:
 repo_check() {
   if [ "$1" == "" ] ; then
     printf "ERROR: Package name not specified, please specify a package name as first argument.\n\n"  | tee -a ${LOG}
     #return 1
   else
-    ${SUDO} su - ${IIM_USER} -c \
-    "${IIM_PATH}/eclipse/tools/imcl listAvailablePackages -repositories ${WAS_REPO} -secureStorageFile ${IIM_SECURE_STORAGE} -masterPasswordFile ${IIM_MASTER} -preferences com.ibm.cic.common.core.preferences.ssl.nonsecureMode=true | grep $1" > /dev/null 2>&1
+    imcl_listing listAvailablePackages -repositories ${WAS_REPO} -secureStorageFile ${IIM_SECURE_STORAGE} -masterPasswordFile ${IIM_MASTER} -preferences com.ibm.cic.common.core.preferences.ssl.nonsecureMode=true ||
+    abort "Cannot list the packages in repository ${WAS_REPO}, installation cannot proceed. Aborting.\n\n"
+    grep -F "$1" ${IMCL_LISTING} > /dev/null 2>&1
     if [ "$?" -eq 0 ] ; then
       printf "=> Package $1 available.\n\n" | tee -a ${LOG}
       #return 0
@@ -267,6 +366,7 @@ wasinstall_admin() {
       printf "\n=> Installation of WAS binaries completed.\n\n" | tee -a ${LOG}
     else
       printf "\n=> ERROR A problem occurred with the installation.\n\n" | tee -a ${LOG}
+      return 1
     fi
   else
     abort "Response file ${WAS_RESPONSE} not found.\n\n"
@@ -285,6 +385,7 @@ wasinstall_nonadmin() {
       printf "\n=> Installation of WAS binaries completed.\n\n" | tee -a ${LOG}
     else
       printf "\n=> ERROR A problem occurred with the installation.\n\n" | tee -a ${LOG}
+      return 1
     fi
   else
     abort "Response file ${WAS_RESPONSE} not found.\n\n"
@@ -303,6 +404,7 @@ wasinstall_group() {
       printf "\n=> Installation of WAS binaries completed.\n\n" | tee -a ${LOG}
     else
       printf "\n=> ERROR A problem occurred with the installation.\n\n" | tee -a ${LOG}
+      return 1
     fi
   else
     abort "Response file ${WAS_RESPONSE} not found.\n\n"
@@ -316,19 +418,94 @@ package_check() {
     printf "ERROR: Package name not specified, please specify a package name as first argument.\n\n"  | tee -a ${LOG}
     #return 1
   else
-    ${SUDO} su - ${IIM_USER} -c \
-    "${IIM_PATH}/eclipse/tools/imcl listInstalledPackages | grep $1" > /dev/null 2>&1
+    imcl_listing listInstalledPackages && grep -F "$1" ${IMCL_LISTING} > /dev/null 2>&1
     if [ "$?" -eq 0 ] ; then
       printf "=> Package $1 installed successfully.\n\n" | tee -a ${LOG}
       #return 0
     else
       printf "=> ERROR Package $1 not installed.\n\n" | tee -a ${LOG}
-      #return 2
+      return 2
     fi
   fi
 }
 
 
+# Check both packages are installed (used to verify the install phases):
+packages_done() {
+  imcl_listing listInstalledPackages || return 1
+  for pkg in ${WAS_PKGID} ${SDK_PKGID} ; do
+    grep -F "${pkg}" ${IMCL_LISTING} > /dev/null 2>&1 || return 1
+  done
+}
+
+
+# Start a new state file, unless the existing one is for the same installation:
+state_init() {
+  stateKey="# ${IIM_MODE} ${WAS_ROOT} ${WAS_PKGID} ${SDK_PKGID}"
+  if [ "${RESET}" != "1" ] && [ "`head -1 ${STATE_FILE} 2>/dev/null`" = "${stateKey}" ] ; then
+    printf "=> Resuming installation recorded in ${STATE_FILE}.\n\n" | tee -a ${LOG}
+  else
+    echo "${stateKey}" > ${STATE_FILE} || abort "Cannot write state file ${STATE_FILE}."
+  fi
+  PHASE_TIMES=""
+  trap phase_summary EXIT
+}
+
+
+# Check that the result of a completed phase (specified by $1) is still in place:
+phase_verify() {
+  case "$1" in
+    hosts)
+      hosts_done ;;
+    user)
+      ${SUDO} getent passwd ${WAS_USER} > /dev/null 2>&1 ;;
+    user_settings)
+      grep "^${WAS_USER} soft nofile ${WAS_FILES_SOFT}$" ${WAS_LIMITS} > /dev/null 2>&1 ;;
+    parent_dir)
+      [ -d "`dirname ${WAS_ROOT}`" ] ;;
+    install|verify)
+      packages_done ;;
+    *)
+      return 0 ;;
+  esac
+}
+
+
+# Run a phase (named by $1) made up of one or more steps (the remaining
+# arguments), unless already completed, and record it in the state file:
+phase_run() {
+  phase=$1
+  shift
+  if grep "^${phase} " ${STATE_FILE} > /dev/null 2>&1 && phase_verify ${phase} ; then
+    printf "=> Phase ${phase} already completed, skipping.\n\n" | tee -a ${LOG}
+    PHASE_TIMES="${PHASE_TIMES} ${phase} skipped"
+    return 0
+  fi
+  sed -i -e "/^${phase} /d" ${STATE_FILE}
+  printf "=> Phase ${phase} starting.\n\n" | tee -a ${LOG}
+  phaseStart=`date +%s`
+  for step in "$@" ; do
+    if ! ${step} ; then
+      PHASE_TIMES="${PHASE_TIMES} ${phase} FAILED"
+      abort "Phase ${phase} failed, fix the cause and rerun this script to resume from this phase."
+    fi
+  done
+  phaseSecs=$(( `date +%s` - phaseStart ))
+  echo "${phase} `date +%F_%H:%M:%S` ${phaseSecs}" >> ${STATE_FILE}
+  PHASE_TIMES="${PHASE_TIMES} ${phase} ${phaseSecs}"
+}
+
+
+# Print the time taken by each phase run so far:
+phase_summary() {
+  if [ -n "${PHASE_TIMES}" ] ; then
+    printf "\n%-16s %8s\n" PHASE SECONDS | tee -a ${LOG}
+    printf "%-16s %8s\n" ${PHASE_TIMES} | tee -a ${LOG}
+    printf "\n" | tee -a ${LOG}
+  fi
+}
+
+
 # Placeholder: for function to run chutils if required in the future.
 #was_chutils() {
 #
@@ -358,13 +535,6 @@ echo "" | tee -a ${LOG}
 ################################################################################
 
 sudo_check
-fs_check
-shell_check
-hosts_check
-
-################################################################################
-# Installation
-################################################################################
 
 case "${IIM_MODE}" in
   Admin)
@@ -372,41 +542,14 @@ case "${IIM_MODE}" in
     IIM_USER=root
     WAS_GROUP=${IIM_GROUP}
     WAS_USER=${IIM_USER}
-    user_settings
-    cp_check
-    repo_check ${WAS_PKGID}
-    repo_check ${SDK_PKGID}
-    xdgmenus_set
-    parent_dir
-    wasinstall_admin
-    package_check ${WAS_PKGID}
-    package_check ${SDK_PKGID}
+    WAS_LIMITS=/etc/security/limits.d/90-was-${WAS_USER}.conf
+    WAS_INSTALL=wasinstall_admin
     ;;
   nonAdmin)
-    group_check
-    user_check
-    user_settings
-    cp_check
-    repo_check ${WAS_PKGID}
-    repo_check ${SDK_PKGID}
-    xdgmenus_set
-    parent_dir
-    wasinstall_nonadmin
-    package_check ${WAS_PKGID}
-    package_check ${SDK_PKGID}
+    WAS_INSTALL=wasinstall_nonadmin
     ;;
   Group)
-    group_check
-    user_check
-    user_settings
-    cp_check
-    repo_check ${WAS_PKGID}
-    repo_check ${SDK_PKGID}
-    xdgmenus_set
-    parent_dir
-    wasinstall_group
-    package_check ${WAS_PKGID}
-    package_check ${SDK_PKGID}
+    WAS_INSTALL=wasinstall_group
     ;;
   *)
     printf "Please first set IIM_MODE constant to either:\n"
@@ -414,12 +557,34 @@ case "${IIM_MODE}" in
     abort
 esac
 
+state_init
+phase_run prereqs fs_check shell_check
+phase_run hosts hosts_check
+if [ ! ${IIM_MODE} = "Admin" ] ; then
+  phase_run user group_check user_check
+fi
+phase_run user_settings user_settings cp_check
+
+################################################################################
+# Installation
+################################################################################
+
+repo_select
+phase_run repo "repo_check ${WAS_PKGID}" "repo_check ${SDK_PKGID}"
+xdgmenus_set
+# Restore the menu permissions even if a phase below fails:
+trap "xdgmenus_reset ; phase_summary" EXIT
+phase_run parent_dir parent_dir
+phase_run install imcl_listing_clear ${WAS_INSTALL}
+phase_run verify "package_check ${WAS_PKGID}" "package_check ${SDK_PKGID}"
+
 ################################################################################
 # Post-Installation Tasks
 ################################################################################
 
 #was_chutils
 xdgmenus_reset
+trap phase_summary EXIT
 
 ################################################################################
 
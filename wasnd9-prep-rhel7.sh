@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         wasnd9-prep-rhel7.sh
-# VERSION:      1.00
+# VERSION:      1.01
 # DESCRIPTION:  Script to prepare RHEL 7 platform for installation of IBM
 #               WebSphere Application Server (WAS) Network Deployment V9.0.
 #
@@ -14,11 +14,49 @@
 #               valid public or private yum server that contains all the pre-
 #               requisite .rpm packages.
 #
+#               The prerequisites are listed in PREREQS below (or the file
+#               PREREQS_FILE, if set), one package or "@group" per line.  The
+#               packages missing from the host are found with a single query
+#               of the rpm database, and installed in a single yum
+#               transaction, so yum is not run at all if nothing is missing.
+#               Set PREREQS_UPDATE=1 to also update the packages already
+#               installed (in the same transaction).
 #
 ################################################################################
 #
 #
 # BEGIN DECLARE CONSTANTS & ENV VARS
+PREREQS_FILE=${PREREQS_FILE:=}
+PREREQS_UPDATE=${PREREQS_UPDATE:=0}
+# IBM WAS 9.0 prerequisite .rpms (only 64-bit installed):
+PREREQS="
+# Kernel and C runtime libraries:
+glibc.x86_64
+#glibc.i686
+libgcc.x86_64
+#libgcc.i686
+kernel-headers.x86_64
+# Current and all compatibility versions of the C++ runtime library:
+libstdc++.x86_64
+#libstdc++.i686
+compat-libstdc++-33.x86_64
+#compat-libstdc++-33.i686
+#compat-libstdc++-296.i686
+# X Windows libraries and runtime group install:
+@X Window System
+# GTK runtime libraries:
+gtk2.x86_64
+#gtk2.i686
+#gtk2-engines.x86_64
+#gtk2-engines.i686
+# Required .rpms for RHEL 7 platforms (some of these may have been provided
+# already by the general Linux prerequisites above):
+libXtst
+xorg-x11-fonts-Type1
+psmisc
+# Mozilla Firefox web browser:
+firefox.x86_64
+"
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -51,18 +89,79 @@ sudo_check() {
 }
 
 
-# Function to install .rpms specified by $1 using yum
-pkg_install() {
-  if [ "$1" == "" ] ; then
-    printf "=> Package name not specified, please specify a package name as first argument.\n\n"  | tee -a ${LOG}
+# Read the prerequisites, ignoring comments and blank lines, into PACKAGES
+# (one per line) and PKG_GROUPS (one per line, without the "@"):
+prereqs_read() {
+  if [ -n "${PREREQS_FILE}" ] ; then
+    [ -f "${PREREQS_FILE}" ] || abort "Prerequisites file ${PREREQS_FILE} not found."
+    PREREQS=`cat ${PREREQS_FILE}`
+  fi
+  PACKAGES=`echo "${PREREQS}" | sed -e 's/^[ \t]*//' -e 's/[ \t]*$//' | grep -v -e '^#' -e '^$' -e '^@'`
+  PKG_GROUPS=`echo "${PREREQS}" | sed -e 's/^[ \t]*//' -e 's/[ \t]*$//' | sed -n 's/^@//p'`
+}
+
+
+# Find the packages and groups not installed, with one query of the rpm
+# database (and of the yum groups installed, from the yum cache only), into
+# MISSING_PACKAGES and MISSING_GROUPS:
+prereqs_missing() {
+  MISSING_PACKAGES=`echo "${PACKAGES}" | tr '\n' '\0' | xargs -0 rpm -q 2>/dev/null | sed -n 's/^package \(.*\) is not installed$/\1/p'`
+  MISSING_GROUPS=""
+  if [ -n "${PKG_GROUPS}" ] ; then
+    installedGroups=`${SUDO} yum -C -q group list installed 2>/dev/null | sed -e 's/^[ \t]*//' -e 's/[ \t]*$//'`
+    MISSING_GROUPS=`echo "${PKG_GROUPS}" | while read group ; do
+      echo "${installedGroups}" | grep -x -F "${group}" > /dev/null 2>&1 || echo "${group}"
+    done`
+  fi
+}
+
+
+# Install the missing packages and groups (or, with PREREQS_UPDATE=1, all of
+# them) in a single yum transaction:
+prereqs_install() {
+  if [ "${PREREQS_UPDATE}" = "1" ] ; then
+    installPackages="${PACKAGES}"
+    installGroups="${PKG_GROUPS}"
   else
-    # Run yum in quiet mode.
-    ${SUDO} yum -y -q install "$1"
-    if [ "$?" -eq 0 ] ; then
-      printf "=> $1 installed, updated, or already up-to-date: PASS.\n"  | tee -a ${LOG}
+    installPackages="${MISSING_PACKAGES}"
+    installGroups="${MISSING_GROUPS}"
+  fi
+  if [ -z "${installPackages}" ] && [ -z "${installGroups}" ] ; then
+    printf "\n=> All prerequisites already installed, yum not run.\n\n" | tee -a ${LOG}
+    YUM_RC=0
+    return 0
+  fi
+  printf "\n=> Installing in a single yum transaction:\n%s\n%s\n\n" "${installPackages}" "`echo "${installGroups}" | sed -n 's/^./@&/p'`" | tee -a ${LOG}
+  # Run yum in quiet mode.
+  ( echo "${installPackages}" ; echo "${installGroups}" | sed -n 's/^./@&/p' ) | grep -v '^$' | tr '\n' '\0' |
+  ${SUDO} xargs -0 yum -y -q install
+  YUM_RC=$?
+}
+
+
+# Report PASS/FAIL for each prerequisite, by querying the rpm database again:
+prereqs_report() {
+  prereqs_missing
+  failed=0
+  printf "\n" | tee -a ${LOG}
+  for pkg in ${PACKAGES} ; do
+    if echo "${MISSING_PACKAGES}" | grep -x -F "${pkg}" > /dev/null 2>&1 ; then
+      printf "=> ${pkg} failed installation, updating, or checking: FAIL.\n" | tee -a ${LOG}
+      failed=1
+    else
+      printf "=> ${pkg} installed, updated, or already up-to-date: PASS.\n" | tee -a ${LOG}
+    fi
+  done
+  echo "${PKG_GROUPS}" | grep -v '^$' | while read group ; do
+    # Groups are only known to yum, so use its result where the cache has none:
+    if echo "${MISSING_GROUPS}" | grep -x -F "${group}" > /dev/null 2>&1 && [ "${YUM_RC}" -ne 0 ] ; then
+      printf "=> @${group} failed installation, updating, or checking: FAIL.\n" | tee -a ${LOG}
     else
-      abort "$1 failed installation, updating, or checking: FAIL.\n"
+      printf "=> @${group} installed, updated, or already up-to-date: PASS.\n" | tee -a ${LOG}
     fi
+  done
+  if [ "${failed}" -ne 0 ] || [ "${YUM_RC}" -ne 0 ] ; then
+    abort "Prerequisite .rpm installation failed (yum exit code ${YUM_RC})."
   fi
 }
 
@@ -81,80 +180,13 @@ date | tee -a ${LOG}
 sudo_check
 #
 ########################################################################
-# IBM WAS 9.0 : GENERAL LINUX PREREQUISITE .RPM UPDATES
-########################################################################
-#
-########################################################################
-# Kernel and C runtime library
-# (only 64-bit installed)
+# IBM WAS 9.0 : PREREQUISITE .RPM UPDATES
 ########################################################################
 
-printf "\nKernel and C runtime libraries:\n" | tee -a ${LOG}
-
-pkg_install glibc.x86_64
-#pkg_install glibc.i686
-
-pkg_install libgcc.x86_64
-#pkg_install libgcc.i686
-
-pkg_install kernel-headers.x86_64
-
-#########################################################################
-# Current and all compatibility versions of the C++ runtime library
-# (only 64-bit installed)
-#########################################################################
-
-printf "\nC++ runtime libraries:\n" | tee -a ${LOG}
-
-pkg_install libstdc++.x86_64
-#pkg_install libstdc++.i686
-
-pkg_install compat-libstdc++-33.x86_64
-#pkg_install compat-libstdc++-33.i686
-#pkg_install compat-libstdc++-296.i686
-
-##########################################################################
-# X Windows libraries and runtime
-##########################################################################
-
-printf "\nX Windows libraries and runtime group install:\n" | tee -a ${LOG}
-
-pkg_install "@X Window System"
-
-##########################################################################
-# GTK runtime libraries
-# (only 64-bit installed)
-##########################################################################
-
-printf "\nGTK runtime libraries:\n" | tee -a ${LOG}
-
-pkg_install gtk2.x86_64
-#pkg_install gtk2.i686
-
-#pkg_install gtk2-engines.x86_64
-#pkg_install gtk2-engines.i686 
-
-##########################################################################
-# IBM WAS 9.0 : RHEL 7 SPECIFIC PREREQUISITE .RPMs
-# (some of these may have been provided already by general Linux prereqs.
-#  See above)
-##########################################################################
-
-printf "\nRequired .rpms for RHEL 7 platforms:\n" | tee -a ${LOG}
-
-pkg_install gtk2
-pkg_install libXtst
-pkg_install xorg-x11-fonts-Type1
-pkg_install psmisc
-
-##########################################################################
-# GENERAL LINUX PREREQUISITES - OTHER
-##########################################################################
-
-printf "\nMozilla Firefox:\n" | tee -a ${LOG}
-
-# Install Mozilla Firefox web browser.
-pkg_install firefox.x86_64
+prereqs_read
+prereqs_missing
+prereqs_install
+prereqs_report
 
 ##########################################################################
 # END OF .RPM UPDATES
@@ -3,7 +3,7 @@
 ################################################################################
 #
 # NAME:         wasnd9-profile-custom-rhel7.sh
-# VERSION:      1.00
+# VERSION:      1.02
 # DESCRIPTION:  Script to create an custom profile for a WAS 9 installation
 #               on a RHEL7-based platforms, including federating it an existing
 #               cell specified by a Dmgr. The constants and port definitions 
@@ -15,6 +15,29 @@
 #               by the WAS_USER constant and group defined by the WAS_GROUP
 #               constant.  Please verify these first before running the script.
 #
+#               FEDERATE controls when the node is federated into the cell:
+#
+#               during  The profile is federated as it is created (default).
+#               defer   The profile is created, and its firewall ports opened,
+#                       but it is not federated.
+#               only    An existing profile, created with FEDERATE=defer, is
+#                       federated with addNode.sh (unless already federated).
+#
+#               With defer and only, profiles can be created on many hosts at
+#               the same time, and the federation steps, which the Deployment
+#               Manager runs one at a time, scheduled separately, as done by
+#               wasnd9-federate-nodes.sh.
+#
+#               If PROFILE_ARCHIVE names a golden profile archive built by
+#               wasnd9-profile-golden.sh for the installed WAS level, the
+#               profile is cloned from it rather than created from the
+#               template, which skips generating its key stores: the archive
+#               is restored, the placeholder node and cell names replaced, and
+#               the host name and personal certificate changed by
+#               profileIdentity_J27.py (IDENTITY_SCRIPT).  The node agent
+#               ports are given to addNode.sh when the node is federated.  The
+#               time taken is reported against the time the template took
+#               when the archive was built.
 #
 ################################################################################
 #
@@ -44,6 +67,9 @@ KEYSTORE_PASSWORD=${KEYSTORE_PASSWORD:=12345678}
 PORT_OFFSET=${PORT_OFFSET:=0}
 NODE_PORTS_FILE=/tmp/${PROFILE_NAME}.portdef.props
 WAS_NIC=${WAS_NIC:=enp0s3}
+FEDERATE=${FEDERATE:=during}
+PROFILE_ARCHIVE=${PROFILE_ARCHIVE:=}
+IDENTITY_SCRIPT=${IDENTITY_SCRIPT:=/scripts/was9/profileIdentity_J27.py}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
 LOG=/dev/null
@@ -180,6 +206,12 @@ EOF
 
 # Create App Server profile - without ports validation.
 create_profile_custom() {
+  began=`date +%s`
+  if [ "${FEDERATE}" = "defer" ] ; then
+    FEDERATE_OPTIONS="-federateLater true"
+  else
+    FEDERATE_OPTIONS="-dmgrHost ${DMGR_HOSTNAME} -dmgrPort ${DMGR_PORT} -dmgrAdminUserName ${DMGR_ADMIN_USER} -dmgrAdminPassword ${DMGR_ADMIN_PASSWORD}"
+  fi
   printf "\nPlease wait while profile ${PROFILE_NAME} is created...\n\n" | tee -a ${LOG}
   ${SUDO} su - ${WAS_USER} -c "${WAS_ROOT}/bin/manageprofiles.sh -create -portsFile ${NODE_PORTS_FILE} \
     -validatePorts \
@@ -188,10 +220,7 @@ create_profile_custom() {
     -profilePath ${PROFILE_PATH} \
     -nodeName ${NODE_NAME} \
     -hostName ${HOSTNAME} \
-    -dmgrHost ${DMGR_HOSTNAME} \
-    -dmgrPort ${DMGR_PORT} \
-    -dmgrAdminUserName ${DMGR_ADMIN_USER} \
-    -dmgrAdminPassword ${DMGR_ADMIN_PASSWORD} \
+    ${FEDERATE_OPTIONS} \
     -personalCertDN "${PERSONAL_CERT_DN}" \
     -personalCertValidityPeriod ${PERSONAL_CERT_EXPIRY} \
     -signingCertDN "${SIGN_CERT_DN}" \
@@ -202,6 +231,85 @@ create_profile_custom() {
   else
     abort "A problem may have occurred with ${PROFILE_NAME} profile creation, aborting.\n\n"
   fi
+  PROFILE_SECS=$(( `date +%s` - began ))
+}
+
+
+# Clone App Server profile from the golden profile archive PROFILE_ARCHIVE,
+# giving it the node and cell names, host name and personal certificate of
+# this host:
+clone_profile_custom() {
+  began=`date +%s`
+  if [ ! -f "${PROFILE_ARCHIVE}" ] || [ ! -f "${PROFILE_ARCHIVE}.meta" ] ; then
+    abort "Profile archive ${PROFILE_ARCHIVE} or its description ${PROFILE_ARCHIVE}.meta not found."
+  fi
+  . ${PROFILE_ARCHIVE}.meta
+  wasLevel=`${WAS_ROOT}/bin/versionInfo.sh 2>/dev/null | awk '$1 == "Version" { print $2 ; exit }'`
+  if [ "${wasLevel}" != "${GOLDEN_LEVEL}" ] ; then
+    abort "Profile archive ${PROFILE_ARCHIVE} was built for WAS ${GOLDEN_LEVEL}, not ${wasLevel}."
+  fi
+  if [ "${GOLDEN_PROFILE_PATH}" != "${PROFILE_PATH}" ] ; then
+    abort "Profile archive ${PROFILE_ARCHIVE} holds profile ${GOLDEN_PROFILE_PATH}, not ${PROFILE_PATH}."
+  fi
+  if [ -d "${PROFILE_PATH}" ] ; then
+    abort "Profile ${PROFILE_PATH} already exists."
+  fi
+  ( cd `dirname ${PROFILE_ARCHIVE}` && sha256sum -c --quiet `basename ${PROFILE_ARCHIVE}`.sha256 ) ||
+  abort "Profile archive ${PROFILE_ARCHIVE} does not match its checksum."
+  printf "\nPlease wait while profile ${PROFILE_NAME} is restored from ${PROFILE_ARCHIVE}...\n\n" | tee -a ${LOG}
+  ${SUDO} su - ${WAS_USER} -c "${WAS_ROOT}/bin/manageprofiles.sh -restoreProfile -backupFile ${PROFILE_ARCHIVE}" ||
+  abort "A problem may have occurred restoring ${PROFILE_NAME} from ${PROFILE_ARCHIVE}, aborting."
+  # Rename the node and cell, replacing the cell name first, as it holds the
+  # node name:
+  cells=${PROFILE_PATH}/config/cells
+  ${SUDO} mv ${cells}/${GOLDEN_CELL}/nodes/${GOLDEN_NODE} ${cells}/${GOLDEN_CELL}/nodes/${NODE_NAME} &&
+  ${SUDO} mv ${cells}/${GOLDEN_CELL} ${cells}/${CELL_NAME} ||
+  abort "Failed to rename node ${GOLDEN_NODE} of profile ${PROFILE_NAME}."
+  ${SUDO} grep -rlI -e ${GOLDEN_CELL} -e ${GOLDEN_NODE} ${PROFILE_PATH}/bin ${PROFILE_PATH}/config ${PROFILE_PATH}/properties |
+  xargs -r ${SUDO} sed -i -e "s/${GOLDEN_CELL}/${CELL_NAME}/g" -e "s/${GOLDEN_NODE}/${NODE_NAME}/g" ||
+  abort "Failed to replace node ${GOLDEN_NODE} in the files of profile ${PROFILE_NAME}."
+  ${SUDO} chown -R ${WAS_USER}:${WAS_GROUP} ${PROFILE_PATH}
+  printf "=> Node ${GOLDEN_NODE} renamed ${NODE_NAME}, cell ${GOLDEN_CELL} renamed ${CELL_NAME}.\n\n" | tee -a ${LOG}
+  ${SUDO} su - ${WAS_USER} -c "${PROFILE_PATH}/bin/wsadmin.sh -conntype NONE -lang jython \
+    -f ${IDENTITY_SCRIPT} --node ${NODE_NAME} --host ${HOSTNAME} \
+    --certOU ${NODE_NAME} --certO ${ORG_NAME} --certC ${ORG_COUNTRY} \
+    --certDays $(( ${PERSONAL_CERT_EXPIRY} * 365 ))" ||
+  abort "Failed to change the host name and personal certificate of ${PROFILE_NAME}."
+  PROFILE_SECS=$(( `date +%s` - began ))
+  printf "\n=> ${PROFILE_NAME} profile clone appears to have been successful.\n\n" | tee -a ${LOG}
+}
+
+
+# Report the time taken to create or clone the profile:
+profile_time_report() {
+  if [ -n "${PROFILE_ARCHIVE}" ] ; then
+    printf "=> Profile ${PROFILE_NAME} cloned in ${PROFILE_SECS}s (created from the template in ${GOLDEN_SECS}s when the archive was built).\n\n" | tee -a ${LOG}
+  else
+    printf "=> Profile ${PROFILE_NAME} created from the template in ${PROFILE_SECS}s.\n\n" | tee -a ${LOG}
+  fi
+}
+
+
+# Federate an existing profile into the cell, unless already federated (its
+# configuration then includes the Deployment Manager's node).  The node agent
+# is given the ports of NODE_PORTS_FILE:
+federate_node() {
+  if [ ! -d "${PROFILE_PATH}" ] ; then
+    abort "Profile ${PROFILE_PATH} not found, create it first with FEDERATE=defer."
+  fi
+  if grep -l 'serverType="DEPLOYMENT_MANAGER"' ${PROFILE_PATH}/config/cells/*/nodes/*/serverindex.xml > /dev/null 2>&1 ; then
+    printf "=> ${PROFILE_NAME} is already federated.\n\n" | tee -a ${LOG}
+    return 0
+  fi
+  printf "\nPlease wait while ${PROFILE_NAME} is federated to ${DMGR_HOSTNAME}:${DMGR_PORT}...\n\n" | tee -a ${LOG}
+  ${SUDO} su - ${WAS_USER} -c "${PROFILE_PATH}/bin/addNode.sh ${DMGR_HOSTNAME} ${DMGR_PORT} \
+    -portprops ${NODE_PORTS_FILE} \
+    -username ${DMGR_ADMIN_USER} -password ${DMGR_ADMIN_PASSWORD}"
+  if [ "$?" -eq 0 ] ; then
+    printf "\n=> ${PROFILE_NAME} federation appears to have been successful.\n\n" | tee -a ${LOG}
+  else
+    abort "A problem may have occurred federating ${PROFILE_NAME}, aborting.\n\n"
+  fi
 }
 
 
@@ -267,6 +375,24 @@ sudo_check
 was_check
 hosts_dmgr_check
 
+case "${FEDERATE}" in
+  during|defer)
+    ;;
+  only)
+    assign_appsvr_ports
+    create_ports_file ${NODE_PORTS_FILE}
+    populate_node_ports_file
+    federate_node
+    cleanup
+    echo "============================" | tee -a ${LOG}
+    echo ENDING SCRIPT ON: | tee -a ${LOG}
+    date | tee -a ${LOG}
+    exit 0
+    ;;
+  *)
+    abort "FEDERATE not correctly set, use during, defer or only."
+esac
+
 # Define ports used by node agent for custom profile:
 assign_appsvr_ports
 create_ports_file ${NODE_PORTS_FILE}
@@ -301,8 +427,17 @@ printf "\n=> Reloading firewalld: " | tee -a ${LOG}
 ${SUDO} firewall-cmd --reload
 
 ################################################################################
-# Create custom profile:
-create_profile_custom
+# Create custom profile, or clone it from the golden profile archive (which
+# is not federated as it is restored):
+if [ -n "${PROFILE_ARCHIVE}" ] ; then
+  clone_profile_custom
+  if [ "${FEDERATE}" = "during" ] ; then
+    federate_node
+  fi
+else
+  create_profile_custom
+fi
+profile_time_report
 
 ################################################################################
 # Remove temporary files used for profile creation:
@@ -14,6 +14,11 @@
 #               by the WAS_USER constant and group defined by the WAS_GROUP
 #               constant.  Please verify these first before running the script.
 #
+#               The new profile is verified by IBM's ivt.sh by default.  Set
+#               VERIFY_MODE=probe to instead start the Deployment Manager and
+#               check all of its end points in parallel with was-probe.py
+#               (PROBE_SCRIPT), which takes seconds rather than minutes.
+#
 #
 ################################################################################
 #
@@ -41,6 +46,9 @@ SIGN_CERT_EXPIRY=${SIGN_CERT_EXPIRY:=15}
 KEYSTORE_PASSWORD=${KEYSTORE_PASSWORD:=12345678}
 PORT_OFFSET=${PORT_OFFSET:=0}
 PORTS_FILE=/tmp/${PROFILE_NAME}.portdef.props
+VERIFY_MODE=${VERIFY_MODE:=ivt}
+PROBE_SCRIPT=${PROBE_SCRIPT:=/scripts/was9/was-probe.py}
+PROBE_TIMEOUT=${PROBE_TIMEOUT:=10}
 WAS_NIC=${WAS_NIC:=enp0s3}
 SCRIPTNAME=`basename $0`
 #LOG=/var/tmp/${SCRIPTNAME}.log
@@ -200,6 +208,26 @@ run_ivt_dmgr() {
 }
 
 
+# Start the Deployment Manager and probe its end points in parallel.
+# Only the end points a new Deployment Manager always listens on are
+# required; the others are reported as warnings.
+run_probe_dmgr() {
+  printf "Starting ${SERVER_NAME} for ${PROFILE_NAME} profile:\n" | tee -a ${LOG}
+  ${SUDO} su - ${WAS_USER} -c "${PROFILE_PATH}/bin/startManager.sh" | tee -a ${LOG}
+  printf "Probing end points of ${PROFILE_NAME} profile:\n" | tee -a ${LOG}
+  ${SUDO} su - ${WAS_USER} -c "${PROBE_SCRIPT} --host ${HOSTNAME} --timeout ${PROBE_TIMEOUT} \
+    --require WC_adminhost --require WC_adminhost_secure \
+    --require BOOTSTRAP_ADDRESS --require SOAP_CONNECTOR_ADDRESS ${PORTS_FILE}" | tee -a ${LOG}
+  if [ "${PIPESTATUS[0]}" -eq 0 ] ; then
+    printf " Probe completed successfully.\n\n" | tee -a ${LOG}
+    return 0
+  else
+    printf "ERROR one or more end points are not up.\n\n" | tee -a ${LOG}
+    return 1
+  fi
+}
+
+
 # Create new firewalld service with name specified by $1.
 firewalld_service_create() {
   if [ "$1" == "" ] ; then
@@ -265,7 +293,11 @@ was_check
 assign_appsvr_ports
 create_ports_file
 create_profile_dmgr
-run_ivt_dmgr
+if [ "${VERIFY_MODE}" == "probe" ] ; then
+  run_probe_dmgr
+else
+  run_ivt_dmgr
+fi
 
 
 ################### Configure firewall service for new profile ##################
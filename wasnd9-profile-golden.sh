@@ -0,0 +1,304 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         wasnd9-profile-golden.sh
+# VERSION:      1.00
+# DESCRIPTION:  Script to build a golden custom profile archive for the WAS 9
+#               level installed on a RHEL7-based platform, from which
+#               wasnd9-profile-custom-rhel7.sh clones the custom profiles of new
+#               nodes (PROFILE_ARCHIVE), and to validate such clones.
+#
+#               Creating a profile from the template, which generates its key
+#               stores and certificates, takes minutes per node.  A clone is
+#               the archive restored, with only the identity of the node
+#               rewritten: its node and cell names, host name and personal
+#               certificate (and its ports, given to addNode.sh when it is
+#               federated).
+#
+#               The script runs one of the following actions, specified by
+#               GOLDEN_ACTION:
+#
+#               build     Creates the profile PROFILE_NAME, unfederated, with
+#                         the placeholder host, node and cell names GOLDEN_HOST,
+#                         GOLDEN_NODE and GOLDEN_CELL, and backs it up to the
+#                         archive ARCHIVE_DIR/<profile>-managed-<WAS level>.zip,
+#                         with its SHA256 checksum (.sha256) and a description
+#                         (.meta) read by the clones, which records how long
+#                         the profile took to create.  The profile is then
+#                         deleted, unless GOLDEN_KEEP=1.  Run it on a host
+#                         without the profile, once per WAS level; an archive
+#                         already built for the level is kept.
+#               validate  Checks a clone PROFILE_NAME against a profile created
+#                         from the template on the same host (REFERENCE_NAME,
+#                         created if missing, and deleted afterwards unless
+#                         GOLDEN_KEEP=1):
+#                         - both hold the same files, once their node and cell
+#                           names are normalised;
+#                         - no placeholder name is left in the clone;
+#                         - the clone has the host name of this host;
+#                         - its personal certificate is issued to this host.
+#                         Each check is reported as PASS or FAIL.  Run it on a
+#                         cloned host before the node is federated.
+#
+#               Note: the profile path, and therefore the profile name and
+#               WAS_ROOT, of the clones must be the same as the golden
+#               profile's.  The clones share the root (signer) certificate of
+#               the golden profile; it can be renewed after federation.
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment,
+#               for example:
+#
+#               GOLDEN_ACTION=validate PROFILE_NAME=AppSrv01 ./wasnd9-profile-golden.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+GOLDEN_ACTION=${GOLDEN_ACTION:=build}
+WAS_USER=${WAS_USER:=wbsadm}
+WAS_GROUP=${WAS_GROUP:=wbsadm}
+WAS_ROOT=${WAS_ROOT:=/apps/IBM/WebSphere/AppServer}
+PROFILE_TEMPLATE=${WAS_ROOT}/profileTemplates/managed
+PROFILE_NAME=${PROFILE_NAME:=AppSrv01}
+PROFILE_PATH=${WAS_ROOT}/profiles/${PROFILE_NAME}
+REFERENCE_NAME=${REFERENCE_NAME:=AppSrvRef}
+REFERENCE_PATH=${WAS_ROOT}/profiles/${REFERENCE_NAME}
+GOLDEN_HOST=${GOLDEN_HOST:=wasgoldenhost}
+GOLDEN_NODE=${GOLDEN_NODE:=wasGoldenNode01}
+GOLDEN_CELL=${GOLDEN_NODE}Cell
+GOLDEN_KEEP=${GOLDEN_KEEP:=0}
+ARCHIVE_DIR=${ARCHIVE_DIR:=/apps/IBM/profile-archives}
+HOSTNAME=`hostname`
+ORG_NAME=${ORG_NAME:=testcompany}
+ORG_COUNTRY=${ORG_COUNTRY:=GB}
+PERSONAL_CERT_EXPIRY=${PERSONAL_CERT_EXPIRY:=1}
+SIGN_CERT_EXPIRY=${SIGN_CERT_EXPIRY:=15}
+KEYSTORE_PASSWORD=${KEYSTORE_PASSWORD:=12345678}
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENVIRONMENT VARIABLES
+#
+#
+#
+# BEGIN FUNCTION DEFINITIONS
+
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Check if sudo required:
+sudo_check() {
+  uid=`id | /bin/sed -e 's;^.*uid=;;' -e 's;\([0-9]\)(.*;\1;'`
+  if [ "$uid" = "0" ] ; then
+    SUDO=" "
+  else
+    SUDO=`which sudo 2>/dev/null`
+    if [ -z "${SUDO}" ] ; then
+      abort "SUDO NOT FOUND."
+    fi
+  fi
+}
+
+
+# Read the level of the WAS installation into WAS_LEVEL:
+was_level() {
+  if [ ! -x "${WAS_ROOT}/bin/versionInfo.sh" ] ; then
+    abort "WAS installation not found in ${WAS_ROOT}."
+  fi
+  WAS_LEVEL=`${WAS_ROOT}/bin/versionInfo.sh 2>/dev/null | awk '$1 == "Version" { print $2 ; exit }'`
+  [ -n "${WAS_LEVEL}" ] || abort "Cannot read the WAS level from versionInfo.sh."
+}
+
+
+# Create an unfederated custom profile ($1, at path $2) from the template,
+# for node $3 on host $4, and set PROFILE_SECS to the time it took:
+profile_create() {
+  printf "\nPlease wait while profile $1 is created from the template...\n\n" | tee -a ${LOG}
+  began=`date +%s`
+  ${SUDO} su - ${WAS_USER} -c "${WAS_ROOT}/bin/manageprofiles.sh -create \
+    -templatePath ${PROFILE_TEMPLATE} \
+    -profileName $1 \
+    -profilePath $2 \
+    -nodeName $3 \
+    -hostName $4 \
+    -federateLater true \
+    -personalCertDN \"cn=$4,ou=$3Cell,ou=$3,o=${ORG_NAME},c=${ORG_COUNTRY}\" \
+    -personalCertValidityPeriod ${PERSONAL_CERT_EXPIRY} \
+    -signingCertDN \"cn=$4,ou=Root Certificate,ou=$3Cell,ou=$3,o=${ORG_NAME},c=${ORG_COUNTRY}\" \
+    -signingCertValidityPeriod ${SIGN_CERT_EXPIRY} \
+    -keyStorePassword ${KEYSTORE_PASSWORD}" || abort "A problem may have occurred with $1 profile creation, aborting."
+  PROFILE_SECS=$(( `date +%s` - began ))
+  printf "\n=> Profile $1 created in ${PROFILE_SECS}s.\n\n" | tee -a ${LOG}
+}
+
+
+# Delete a profile ($1, at path $2):
+profile_delete() {
+  ${SUDO} su - ${WAS_USER} -c "${WAS_ROOT}/bin/manageprofiles.sh -delete -profileName $1" > /dev/null 2>&1
+  ${SUDO} rm -rf "$2"
+  printf "=> Profile $1 deleted.\n\n" | tee -a ${LOG}
+}
+
+
+# Build the golden profile archive for the WAS level:
+golden_build() {
+  ARCHIVE=${ARCHIVE_DIR}/${PROFILE_NAME}-managed-${WAS_LEVEL}.zip
+  if [ -f "${ARCHIVE}.meta" ] && ( cd ${ARCHIVE_DIR} && sha256sum -c --quiet `basename ${ARCHIVE}`.sha256 ) ; then
+    printf "=> UNCHANGED: archive ${ARCHIVE} already built for WAS ${WAS_LEVEL}.\n\n" | tee -a ${LOG}
+    return 0
+  fi
+  if [ -d "${PROFILE_PATH}" ] ; then
+    abort "Profile ${PROFILE_PATH} already exists, build the archive on a host without it."
+  fi
+  if [ ! -d "${ARCHIVE_DIR}" ] ; then
+    ${SUDO} mkdir -p -m 0755 "${ARCHIVE_DIR}"
+    ${SUDO} chown ${WAS_USER}:${WAS_GROUP} "${ARCHIVE_DIR}"
+  fi
+  profile_create ${PROFILE_NAME} ${PROFILE_PATH} ${GOLDEN_NODE} ${GOLDEN_HOST}
+  printf "Please wait while profile ${PROFILE_NAME} is backed up to ${ARCHIVE}...\n\n" | tee -a ${LOG}
+  ${SUDO} rm -f ${ARCHIVE} ${ARCHIVE}.sha256 ${ARCHIVE}.meta
+  ${SUDO} su - ${WAS_USER} -c "${WAS_ROOT}/bin/manageprofiles.sh -backupProfile -profileName ${PROFILE_NAME} -backupFile ${ARCHIVE}" ||
+  abort "Failed to back up profile ${PROFILE_NAME} to ${ARCHIVE}."
+  ( cd ${ARCHIVE_DIR} && sha256sum `basename ${ARCHIVE}` ) > /tmp/${SCRIPTNAME}.$$
+  cat > /tmp/${SCRIPTNAME}.$$.meta << EOF
+# Golden profile archive, written by ${SCRIPTNAME} on `date`.
+GOLDEN_LEVEL=${WAS_LEVEL}
+GOLDEN_PROFILE_NAME=${PROFILE_NAME}
+GOLDEN_PROFILE_PATH=${PROFILE_PATH}
+GOLDEN_HOST=${GOLDEN_HOST}
+GOLDEN_NODE=${GOLDEN_NODE}
+GOLDEN_CELL=${GOLDEN_CELL}
+GOLDEN_SECS=${PROFILE_SECS}
+EOF
+  ${SUDO} cp /tmp/${SCRIPTNAME}.$$ ${ARCHIVE}.sha256 &&
+  ${SUDO} cp /tmp/${SCRIPTNAME}.$$.meta ${ARCHIVE}.meta &&
+  ${SUDO} chmod 644 ${ARCHIVE} ${ARCHIVE}.sha256 ${ARCHIVE}.meta ||
+  abort "Failed to write ${ARCHIVE}.sha256 and ${ARCHIVE}.meta."
+  rm -f /tmp/${SCRIPTNAME}.$$ /tmp/${SCRIPTNAME}.$$.meta
+  printf "=> CHANGED: archive ${ARCHIVE} built for WAS ${WAS_LEVEL} (`du -h ${ARCHIVE} | cut -f1`).\n\n" | tee -a ${LOG}
+  if [ "${GOLDEN_KEEP}" != "1" ] ; then
+    profile_delete ${PROFILE_NAME} ${PROFILE_PATH}
+  fi
+}
+
+
+# Read the cell and node names of a profile ($1) into CELL and NODE:
+profile_names() {
+  CELL=`sed -n 's/^ *WAS_CELL=//p' $1/bin/setupCmdLine.sh 2>/dev/null`
+  NODE=`sed -n 's/^ *WAS_NODE=//p' $1/bin/setupCmdLine.sh 2>/dev/null`
+  [ -n "${CELL}" ] && [ -n "${NODE}" ] || abort "Cannot read the cell and node names of profile $1."
+}
+
+
+# List the files of a profile ($1), with its cell and node names
+# normalised, leaving out temporary files and backups:
+profile_files() {
+  profile_names $1
+  ( cd $1 && ${SUDO} find bin config properties -type f ) |
+  grep -v -e '^config/temp/' -e '^config/backup/' -e '/wstemp/' |
+  sed -e "s/${CELL}/@CELL@/g" -e "s/${NODE}/@NODE@/g" | sort
+}
+
+
+# Report a check (named by $1) as PASS if $2 is empty, or FAIL with the
+# details in $2:
+check_report() {
+  if [ -z "$2" ] ; then
+    printf "=> %-44s PASS\n" "$1" | tee -a ${LOG}
+  else
+    printf "=> %-44s FAIL\n%s\n" "$1" "$2" | tee -a ${LOG}
+    FAILED=$(( ${FAILED} + 1 ))
+  fi
+}
+
+
+# Validate the clone against a profile created from the template:
+golden_validate() {
+  FAILED=0
+  if [ ! -d "${PROFILE_PATH}" ] ; then
+    abort "Profile ${PROFILE_PATH} not found."
+  fi
+  if ${SUDO} grep -l 'serverType="DEPLOYMENT_MANAGER"' ${PROFILE_PATH}/config/cells/*/nodes/*/serverindex.xml > /dev/null 2>&1 ; then
+    abort "Profile ${PROFILE_NAME} is federated, validate clones before federating them."
+  fi
+  referenceCreated=0
+  if [ ! -d "${REFERENCE_PATH}" ] ; then
+    profile_create ${REFERENCE_NAME} ${REFERENCE_PATH} ${HOSTNAME}RefNode01 ${HOSTNAME}
+    referenceCreated=1
+  fi
+  profile_files ${REFERENCE_PATH} > /tmp/${SCRIPTNAME}.$$.ref
+  profile_files ${PROFILE_PATH} > /tmp/${SCRIPTNAME}.$$.clone
+  printf "\nChecks of clone ${PROFILE_NAME} (node ${NODE}, cell ${CELL}):\n" | tee -a ${LOG}
+  check_report "Same files as ${REFERENCE_NAME}" \
+    "`diff /tmp/${SCRIPTNAME}.$$.ref /tmp/${SCRIPTNAME}.$$.clone | sed -n -e 's/^</   only in reference:/p' -e 's/^>/   only in clone:/p'`"
+  rm -f /tmp/${SCRIPTNAME}.$$.ref /tmp/${SCRIPTNAME}.$$.clone
+  check_report "No placeholder names left" \
+    "`${SUDO} grep -rlI -e ${GOLDEN_HOST} -e ${GOLDEN_NODE} -e ${GOLDEN_CELL} ${PROFILE_PATH}/bin ${PROFILE_PATH}/config ${PROFILE_PATH}/properties | sed 's/^/   /'`"
+  nodeDir=${PROFILE_PATH}/config/cells/${CELL}/nodes/${NODE}
+  if [ -d "${nodeDir}" ] ; then
+    check_report "Node directory ${NODE}" ""
+  else
+    check_report "Node directory ${NODE}" "   ${nodeDir} not found"
+  fi
+  hostName=`${SUDO} sed -n 's/.* hostName="\([^"]*\)".*/\1/p' ${nodeDir}/serverindex.xml 2>/dev/null | head -1`
+  if [ "${hostName}" = "${HOSTNAME}" ] ; then
+    check_report "Host name ${HOSTNAME}" ""
+  else
+    check_report "Host name ${HOSTNAME}" "   serverindex.xml has ${hostName}"
+  fi
+  owners=`${SUDO} ${WAS_ROOT}/java/8.0/bin/keytool -list -v -storetype PKCS12 -keystore ${nodeDir}/key.p12 -storepass ${KEYSTORE_PASSWORD} 2>/dev/null | grep '^Owner:'`
+  if echo "${owners}" | grep -i "^Owner: CN=${HOSTNAME}," | grep -v -i "OU=Root Certificate" > /dev/null 2>&1 ; then
+    check_report "Personal certificate for ${HOSTNAME}" ""
+  else
+    check_report "Personal certificate for ${HOSTNAME}" "`echo "${owners}" | sed 's/^/   /'`"
+  fi
+  if [ "${referenceCreated}" -eq 1 ] && [ "${GOLDEN_KEEP}" != "1" ] ; then
+    printf "\n" ; profile_delete ${REFERENCE_NAME} ${REFERENCE_PATH}
+  fi
+  if [ "${FAILED}" -ne 0 ] ; then
+    abort "${FAILED} check(s) of clone ${PROFILE_NAME} failed."
+  fi
+  printf "\n=> Clone ${PROFILE_NAME} matches a profile created from the template.\n\n" | tee -a ${LOG}
+}
+
+
+# END FUNCTION DEFINITIONS
+
+################################################################################
+# MAIN
+################################################################################
+echo STARTING SCRIPT ON: | tee ${LOG}
+date | tee -a ${LOG}
+echo "============================" | tee -a ${LOG}
+echo "" | tee -a ${LOG}
+
+sudo_check
+was_level
+
+case "${GOLDEN_ACTION}" in
+  build)
+    golden_build
+    ;;
+  validate)
+    golden_validate
+    ;;
+  *)
+    abort "GOLDEN_ACTION not correctly set, use build or validate."
+esac
+
+echo "============================" | tee -a ${LOG}
+echo ENDING SCRIPT ON: | tee -a ${LOG}
+date | tee -a ${LOG}
+
+exit 0
@@ -0,0 +1,236 @@
+#!/bin/bash
+#
+################################################################################
+#
+# NAME:         wasnd9-tune-rhel7.sh
+# VERSION:      1.00
+# DESCRIPTION:  Script to tune the kernel, network and resource limits of a
+#               RHEL 7 host running busy IBM WebSphere Application Server (WAS)
+#               Network Deployment V9.0 app servers, after the WAS binaries
+#               have been installed (wasnd9-install-rhel7.sh).
+#
+#               The settings are written as drop-in files, which are created
+#               whole each time, so the script can be rerun safely (e.g. after
+#               changing a value below); a file is only replaced, and reported
+#               as CHANGED, if its content differs:
+#
+#               /etc/sysctl.d/90-was.conf
+#                 - listen and SYN backlogs (SOMAXCONN, SYN_BACKLOG).  The
+#                   listen backlog of the WAS TCP channels is capped by
+#                   net.core.somaxconn, so too low a value causes connection
+#                   refused errors at peaks of load;
+#                 - ephemeral port range (PORT_RANGE), which starts above the
+#                   WAS ports, and any ports reserved from it (RESERVED_PORTS);
+#                 - TCP FIN timeout and keepalive settings, to free sockets
+#                   of closed and dead connections sooner;
+#                 - optionally, huge pages sized for the total Java heap of
+#                   the app servers on the host (HEAP_MB, 0 = none).  The
+#                   app servers must then be given the generic JVM argument
+#                   -Xlp to use them.
+#
+#               /etc/security/limits.d/95-was-${WAS_USER}.conf
+#                 - open files (nofile), derived from the planned maximum
+#                   number of connections of the channels of an app server
+#                   (CHANNEL_CONNECTIONS) plus FD_OVERHEAD for its jars, logs
+#                   and outbound connections;
+#                 - processes/threads (nproc) and, with huge pages, locked
+#                   memory (memlock) for WAS_USER.
+#
+#               The settings are then applied, and the effective values read
+#               back and reported as PASS or FAIL.  (The resource limits take
+#               effect for new sessions of WAS_USER, so the WAS processes must
+#               be restarted to use them.)
+#
+#               Set the constants below appropriate to the target environment.
+#               The values given below are examples and can be overriden by
+#               feeding alternative values to the script from the environment,
+#               for example:
+#
+#               CHANNEL_CONNECTIONS=20000 HEAP_MB=8192 ./wasnd9-tune-rhel7.sh
+#
+################################################################################
+#
+#
+# BEGIN DECLARE CONSTANTS & ENV VARS
+WAS_USER=${WAS_USER:=wbsadm}
+WAS_GROUP=${WAS_GROUP:=wbsadm}
+SOMAXCONN=${SOMAXCONN:=4096}
+SYN_BACKLOG=${SYN_BACKLOG:=8192}
+NETDEV_BACKLOG=${NETDEV_BACKLOG:=5000}
+PORT_RANGE=${PORT_RANGE:=15000 64999}
+RESERVED_PORTS=${RESERVED_PORTS:=}
+FIN_TIMEOUT=${FIN_TIMEOUT:=30}
+KEEPALIVE_TIME=${KEEPALIVE_TIME:=600}
+KEEPALIVE_INTVL=${KEEPALIVE_INTVL:=15}
+KEEPALIVE_PROBES=${KEEPALIVE_PROBES:=5}
+CHANNEL_CONNECTIONS=${CHANNEL_CONNECTIONS:=10000}
+FD_OVERHEAD=${FD_OVERHEAD:=4096}
+NPROC=${NPROC:=16384}
+HEAP_MB=${HEAP_MB:=0}
+SYSCTL_FILE=/etc/sysctl.d/90-was.conf
+LIMITS_FILE=/etc/security/limits.d/95-was-${WAS_USER}.conf
+SCRIPTNAME=`basename $0`
+#LOG=/var/tmp/${SCRIPTNAME}.log
+LOG=/dev/null
+export PATH=$PATH:/sbin:/usr/sbin
+# END DECLARE CONSTANTS & ENV VARS
+
+
+# BEGIN FUNCTION DEFINITIONS
+
+# Function to handle premature script termination:
+abort() {
+  printf "========================================================\n" | tee -a ${LOG}
+  printf "ERROR: %s\n" "$1" | tee -a ${LOG}
+  printf "SCRIPT ENDED ABNORMALLY ON: %s\n" "`date`" | tee -a ${LOG}
+  exit 1
+}
+
+
+# Check if sudo required:
+sudo_check() {
+  uid=`id | /bin/sed -e 's;^.*uid=;;' -e 's;\([0-9]\)(.*;\1;'`
+  if [ "$uid" = "0" ] ; then
+    SUDO=" "
+  else
+    SUDO=`which sudo 2>/dev/null`
+    if [ -z "${SUDO}" ] ; then
+      abort "SUDO NOT FOUND."
+    fi
+  fi
+}
+
+
+# Derive the open file limits, and the huge pages for HEAP_MB (plus 5% for
+# rounding and the JIT code cache):
+derive_values() {
+  NOFILE_SOFT=$(( ${CHANNEL_CONNECTIONS} + ${FD_OVERHEAD} ))
+  NOFILE_HARD=$(( ${NOFILE_SOFT} * 2 ))
+  HUGEPAGES=0
+  if [ "${HEAP_MB}" -gt 0 ] ; then
+    hugePageKB=`awk '/^Hugepagesize:/ { print $2 }' /proc/meminfo`
+    [ -n "${hugePageKB}" ] || abort "Huge pages not supported by this kernel."
+    HUGEPAGES=$(( (${HEAP_MB} * 1024 * 105 / 100 + ${hugePageKB} - 1) / ${hugePageKB} ))
+    MEMLOCK_KB=$(( ${HUGEPAGES} * ${hugePageKB} ))
+    WAS_GID=`getent group ${WAS_GROUP} | cut -d : -f 3`
+    [ -n "${WAS_GID}" ] || abort "Group ${WAS_GROUP} not found."
+  fi
+}
+
+
+# Replace a drop-in file ($1) with the content of a temporary file ($2) if
+# they differ:
+dropin_write() {
+  if ${SUDO} cmp -s "$2" "$1" ; then
+    printf "=> UNCHANGED: $1\n" | tee -a ${LOG}
+    rm -f "$2"
+  else
+    ${SUDO} cp "$2" "$1" && ${SUDO} chmod 644 "$1" || abort "Failed to write $1."
+    rm -f "$2"
+    printf "=> CHANGED: $1\n" | tee -a ${LOG}
+  fi
+}
+
+
+# Write the kernel and network settings:
+sysctl_settings() {
+  cat > /tmp/${SCRIPTNAME}.$$ << EOF
+# WAS host tuning, written by ${SCRIPTNAME}; do not edit, rerun the script.
+net.core.somaxconn = ${SOMAXCONN}
+net.ipv4.tcp_max_syn_backlog = ${SYN_BACKLOG}
+net.core.netdev_max_backlog = ${NETDEV_BACKLOG}
+net.ipv4.ip_local_port_range = ${PORT_RANGE}
+net.ipv4.tcp_fin_timeout = ${FIN_TIMEOUT}
+net.ipv4.tcp_keepalive_time = ${KEEPALIVE_TIME}
+net.ipv4.tcp_keepalive_intvl = ${KEEPALIVE_INTVL}
+net.ipv4.tcp_keepalive_probes = ${KEEPALIVE_PROBES}
+EOF
+  if [ -n "${RESERVED_PORTS}" ] ; then
+    echo "net.ipv4.ip_local_reserved_ports = ${RESERVED_PORTS}" >> /tmp/${SCRIPTNAME}.$$
+  fi
+  if [ "${HUGEPAGES}" -gt 0 ] ; then
+    echo "vm.nr_hugepages = ${HUGEPAGES}" >> /tmp/${SCRIPTNAME}.$$
+    echo "vm.hugetlb_shm_group = ${WAS_GID}" >> /tmp/${SCRIPTNAME}.$$
+  fi
+  dropin_write ${SYSCTL_FILE} /tmp/${SCRIPTNAME}.$$
+  ${SUDO} sysctl -q -p ${SYSCTL_FILE} || abort "Failed to apply ${SYSCTL_FILE}."
+}
+
+
+# Write the resource limits of WAS_USER:
+limits_settings() {
+  cat > /tmp/${SCRIPTNAME}.$$ << EOF
+# WAS host tuning, written by ${SCRIPTNAME}; do not edit, rerun the script.
+${WAS_USER} soft nofile ${NOFILE_SOFT}
+${WAS_USER} hard nofile ${NOFILE_HARD}
+${WAS_USER} soft nproc ${NPROC}
+${WAS_USER} hard nproc ${NPROC}
+EOF
+  if [ "${HUGEPAGES}" -gt 0 ] ; then
+    echo "${WAS_USER} soft memlock ${MEMLOCK_KB}" >> /tmp/${SCRIPTNAME}.$$
+    echo "${WAS_USER} hard memlock ${MEMLOCK_KB}" >> /tmp/${SCRIPTNAME}.$$
+  fi
+  dropin_write ${LIMITS_FILE} /tmp/${SCRIPTNAME}.$$
+}
+
+
+# Compare an effective value ($2) with the value wanted ($3), ignoring
+# differences in white space, and report it (named by $1):
+value_check() {
+  effective=`echo $2`
+  wanted=`echo $3`
+  if [ "${effective}" = "${wanted}" ] ; then
+    printf "=> %-36s %-14s PASS\n" "$1" "${effective}" | tee -a ${LOG}
+  else
+    printf "=> %-36s %-14s FAIL (wanted ${wanted})\n" "$1" "${effective}" | tee -a ${LOG}
+    FAILED=$(( ${FAILED} + 1 ))
+  fi
+}
+
+
+# Read back and check the effective values:
+verify_settings() {
+  FAILED=0
+  printf "\nEffective values:\n" | tee -a ${LOG}
+  grep -v -e '^#' -e '^$' ${SYSCTL_FILE} | while IFS='=' read key value ; do
+    echo "${key} ${value}"
+  done > /tmp/${SCRIPTNAME}.$$
+  while read key value ; do
+    value_check ${key} "`${SUDO} sysctl -n ${key} 2>/dev/null`" "${value}"
+  done < /tmp/${SCRIPTNAME}.$$
+  rm -f /tmp/${SCRIPTNAME}.$$
+  # Limits, as seen by a new session of WAS_USER:
+  limits=`${SUDO} su - ${WAS_USER} -c 'ulimit -Sn ; ulimit -Hn ; ulimit -Su ; ulimit -Hu' 2>/dev/null`
+  value_check "${WAS_USER} nofile (soft hard)" "`echo ${limits} | cut -d' ' -f1,2`" "${NOFILE_SOFT} ${NOFILE_HARD}"
+  value_check "${WAS_USER} nproc (soft hard)" "`echo ${limits} | cut -d' ' -f3,4`" "${NPROC} ${NPROC}"
+  if [ "${HUGEPAGES}" -gt 0 ] ; then
+    # The kernel may not find enough free memory for all the huge pages
+    # until the host is rebooted:
+    value_check "HugePages_Total" "`awk '/^HugePages_Total:/ { print $2 }' /proc/meminfo`" "${HUGEPAGES}"
+  fi
+  if [ "${FAILED}" -ne 0 ] ; then
+    abort "${FAILED} setting(s) not in effect."
+  fi
+}
+
+
+# END FUNCTION DEFINITIONS
+
+
+########################################################################
+# MAIN
+########################################################################
+
+printf "\nSTARTING SCRIPT ON:\n" | tee ${LOG}
+date | tee -a ${LOG}
+printf "\n"
+sudo_check
+derive_values
+sysctl_settings
+limits_settings
+verify_settings
+
+printf "\nENDING SCRIPT ON:\n" | tee -a ${LOG}
+date | tee -a ${LOG}
+
+exit 0